@@ -1,22 +1,64 @@
+import argparse
+import bisect
+import copy
+import cProfile
 import csv
+import functools
+import gzip
+import heapq
+import io
+import json
+import lzma
+import mmap
 import os
+import pstats
+import shutil
+import sqlite3
+import struct
+import sys
+import tempfile
+import threading
 import time
+import tracemalloc
+from array import array
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack, contextmanager, nullcontext
+from itertools import chain, islice
 from datetime import datetime
 import hashlib
 
+try:
+    import fcntl
+except ImportError:   # not on Windows: writes stay atomic but are not serialized across processes
+    fcntl = None
+
 #BASE/ENTITY Classes
+# Entities use __slots__ (no per-instance __dict__), and low-cardinality
+# fields such as course_id, grade, rank and role are interned so every
+# record shares one string object per distinct value.
+def _intern(value):
+    """sys.intern for strings, anything else passes through"""
+    return sys.intern(value) if type(value) is str else value
+
+
 class Student:
+    __slots__ = ('email_address', 'first_name', 'last_name', 'course_id', 'grade', 'marks')
+
     def __init__(self, email_address, first_name, last_name, course_id="", grade="", marks=0):
         self.email_address = email_address
         self.first_name = first_name
         self.last_name = last_name
-        self.course_id = course_id
-        self.grade = grade
+        self.course_id = _intern(course_id)
+        self.grade = _intern(grade)
         self.marks = marks
 
+    def __str__(self):
+        return (f"Email: {self.email_address}, Name: {self.first_name} {self.last_name}, "
+                f"Course: {self.course_id}, Grade: {self.grade}, Marks: {self.marks}")
+
     def display_record(self):
-        print(f"Email: {self.email_address}, Name: {self.first_name} {self.last_name}, "
-            f"Course: {self.course_id}, Grade: {self.grade}, Marks: {self.marks}")
+        print(self)
       
     def to_dict(self):
         return {
@@ -30,13 +72,18 @@ class Student:
 
 
 class Course:
+    __slots__ = ('course_id', 'course_name', 'description')
+
     def __init__(self, course_id, course_name, description=""):
-        self.course_id = course_id
+        self.course_id = _intern(course_id)
         self.course_name = course_name
         self.description = description
     
+    def __str__(self):
+        return f"Course ID: {self.course_id}, Name: {self.course_name}, Description: {self.description}"
+
     def display_course(self):
-        print(f"Course ID: {self.course_id}, Name: {self.course_name}, Description: {self.description}")
+        print(self)
 
     def to_dict(self):
         return {
@@ -47,15 +94,20 @@ class Course:
 
 
 class Professor:
+    __slots__ = ('professor_id', 'professor_name', 'rank', 'course_id')
+
     def __init__(self, professor_id, professor_name, rank, course_id):
         self.professor_id = professor_id
         self.professor_name = professor_name
-        self.rank = rank
-        self.course_id = course_id
+        self.rank = _intern(rank)
+        self.course_id = _intern(course_id)
+
+    def __str__(self):
+        return (f"Professor ID: {self.professor_id}, Name: {self.professor_name}, "
+                f"Rank: {self.rank}, Course: {self.course_id}")
 
     def display_professor(self):
-        print(f"Professor ID: {self.professor_id}, Name: {self.professor_name}, "
-              f"Rank: {self.rank}, Course: {self.course_id}")
+        print(self)
 
     def to_dict(self):
         return {
@@ -67,9 +119,11 @@ class Professor:
 
 class Grade:
     """Grade class defines grade scale (A, B, C with mark ranges)"""
+    __slots__ = ('grade_id', 'grade_letter', 'min_marks', 'max_marks')
+
     def __init__(self, grade_id, grade_letter, min_marks, max_marks):
         self.grade_id = grade_id
-        self.grade_letter = grade_letter
+        self.grade_letter = _intern(grade_letter)
         self.min_marks = min_marks
         self.max_marks = max_marks
     
@@ -89,10 +143,12 @@ class Grade:
         }
 
 class LoginUser: 
+    __slots__ = ('email_id', 'password', 'role')
+
     def __init__(self, email_id, password, role):
         self.email_id = email_id
         self.password = password # Stored as encrypted hash
-        self.role = role   
+        self.role = _intern(role)
 
     def encrypt_password(self, password):
         """
@@ -116,204 +172,2752 @@ class LoginUser:
         }
 
 
-# Manager Classes
-class StudentManager:
-    """Manages all student operations"""
-    def __init__(self, csv_file='students.csv'):
+# Metrics
+class LatencyHistogram:
+    """
+    Count, total, min and max of one operation's latency, plus counts in
+    power-of-two microsecond buckets (bucket i holds [2**(i-1), 2**i) us),
+    from which percentiles are estimated to within a factor of two.
+    """
+    __slots__ = ('count', 'total', 'min', 'max', 'buckets')
+    BUCKETS = 40   # the last bucket holds everything from about 6 days up
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = 0.0
+        self.buckets = [0] * self.BUCKETS
+
+    def observe(self, seconds):
+        self.count += 1
+        self.total += seconds
+        if self.min is None or seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.buckets[min(int(seconds * 1e6).bit_length(), self.BUCKETS - 1)] += 1
+
+    def percentile(self, pct):
+        """Upper bound of the bucket holding the pct-th percentile, in seconds (None if empty)"""
+        if not self.count:
+            return None
+        rank = max(1, -(-self.count * pct // 100))
+        seen = 0
+        for i, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank:
+                return min(2 ** i / 1e6, self.max)
+        return self.max
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'total': self.total,
+            'mean': self.total / self.count if self.count else None,
+            'min': self.min,
+            'max': self.max,
+            'p50': self.percentile(50),
+            'p90': self.percentile(90),
+            'p99': self.percentile(99),
+            # upper bound in microseconds -> calls, empty buckets left out
+            'buckets': {str(2 ** i): count for i, count in enumerate(self.buckets) if count},
+        }
+
+
+class Metrics:
+    """
+    Registry of operation latencies and counters. Every read_locked and
+    write_locked manager method reports its duration here as
+    "<Class>.<method>", and CSV loads and saves add the file size to
+    "<Class>.load_bytes" / "<Class>.save_bytes". While disabled a call
+    costs one attribute check.
+    """
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.timings = {}
+        self.counters = Counter()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self.timings = {}
+            self.counters = Counter()
+
+    def observe(self, name, seconds):
+        """Record one duration for name"""
+        with self._lock:
+            histogram = self.timings.get(name)
+            if histogram is None:
+                histogram = self.timings[name] = LatencyHistogram()
+            histogram.observe(seconds)
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self.counters[name] += amount
+
+    @contextmanager
+    def timed(self, name):
+        """Record the duration of the with-block under name (when enabled)"""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def snapshot(self):
+        """All metrics as a JSON-serializable dict"""
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'timestamp': datetime.now().isoformat(timespec='seconds'),
+                'timings': {name: histogram.to_dict() for name, histogram in sorted(self.timings.items())},
+                'counters': dict(sorted(self.counters.items())),
+            }
+
+    def dump(self, path):
+        """Write snapshot() to path as JSON"""
+        with atomic_write(path) as file:
+            json.dump(self.snapshot(), file, indent=2)
+        print(f"✓ Metrics written to {path}")
+
+    def report(self):
+        """Print the timings, slowest total first, and the counters"""
+        snapshot = self.snapshot()
+        if not snapshot['timings'] and not snapshot['counters']:
+            print("No metrics recorded" + ("" if self.enabled else " (metrics are disabled)"))
+            return
+        print(f"\n{'Operation':40s} {'Calls':>8s} {'Total ms':>10s} {'Mean us':>10s} "
+              f"{'p50 us':>9s} {'p99 us':>9s} {'Max us':>10s}")
+        print("-" * 102)
+        for name, t in sorted(snapshot['timings'].items(), key=lambda item: -item[1]['total']):
+            print(f"{name:40s} {t['count']:8d} {t['total'] * 1e3:10.2f} {t['mean'] * 1e6:10.1f} "
+                  f"{t['p50'] * 1e6:9.1f} {t['p99'] * 1e6:9.1f} {t['max'] * 1e6:10.1f}")
+        for name, value in snapshot['counters'].items():
+            print(f"{name:40s} {value:>12,d}")
+
+
+# Module-wide registry used by the managers; CHECKMYGRADE_METRICS=1 turns it on at startup
+METRICS = Metrics(enabled=os.environ.get('CHECKMYGRADE_METRICS', '') not in ('', '0'))
+
+
+# Profiling
+class Profiler:
+    """
+    Opt-in cProfile + tracemalloc sessions around app actions. Each session
+    writes <n>-<name>.prof (load it with pstats or snakeviz) and <n>-<name>.txt
+    with the wall time, peak traced memory, the lines whose allocations grew
+    most during the action and the slowest functions. A session that starts another one (a menu choice that
+    opens a submenu) is only navigation and is dropped in favour of the
+    inner one. Timings include tracemalloc's own overhead.
+    """
+    def __init__(self, directory, top=20):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.top = top
+        self._sequence = 0
+        self._sessions = []   # open sessions, innermost last
+
+    def _path(self, name):
+        self._sequence += 1
+        slug = ''.join(c if c.isalnum() else '-' for c in name.lower()).strip('-')
+        return os.path.join(self.directory, f"{self._sequence:04d}-{slug}")
+
+    @contextmanager
+    def session(self, name):
+        if self._sessions:
+            outer = self._sessions[-1]
+            outer['profile'].disable()
+            outer['superseded'] = True
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        session = {'profile': cProfile.Profile(), 'superseded': False, 'before': tracemalloc.take_snapshot()}
+        self._sessions.append(session)
+        start = time.perf_counter()
+        session['profile'].enable()
+        try:
+            yield
+        finally:
+            session['profile'].disable()
+            elapsed = time.perf_counter() - start
+            self._sessions.pop()
+            if not session['superseded']:
+                peak = tracemalloc.get_traced_memory()[1]
+                allocations = tracemalloc.take_snapshot().compare_to(session['before'], 'lineno')
+                self._write(name, session['profile'], elapsed, peak, allocations)
+            if started_tracing:
+                tracemalloc.stop()
+
+    def _write(self, name, profile, elapsed, peak, allocations):
+        path = self._path(name)
+        profile.dump_stats(path + '.prof')
+        with open(path + '.txt', 'w') as file:
+            file.write(f"{name}\nwall time: {elapsed:.6f} s\npeak traced memory: {peak / 1024:.1f} KiB\n")
+            file.write(f"\nTop {self.top} allocation sites (growth during the action):\n")
+            for stat in allocations[:self.top]:
+                file.write(f"  {stat}\n")
+            file.write("\n")
+            pstats.Stats(profile, stream=file).sort_stats('cumulative').print_stats(self.top)
+        print(f"[profile] {name}: {elapsed:.3f} s, written to {path}.prof")
+
+
+# Thread safety
+class ReadWriteLock:
+    """
+    Many readers or one writer. Once a writer is waiting new readers queue
+    behind it, so a steady stream of reads cannot starve writes. The writer
+    may re-enter reading() and writing(), and a reader may re-enter
+    reading(); upgrading from read to write raises instead of deadlocking.
+    """
+    def __init__(self):
+        self._mutex = threading.Lock()
+        self._condition = threading.Condition(self._mutex)
+        self._readers = 0
+        self._writer = None          # ident of the thread holding the write lock
+        self._write_depth = 0
+        self._waiting_writers = 0
+        self._local = threading.local()
+
+    def acquire_read(self):
+        if self._writer == threading.get_ident():
+            return   # the writer already excludes everyone else
+        local = self._local
+        depth = getattr(local, 'read_depth', 0)
+        if not depth:
+            with self._mutex:
+                while self._writer is not None or self._waiting_writers:
+                    self._condition.wait()
+                self._readers += 1
+        local.read_depth = depth + 1
+
+    def release_read(self):
+        if self._writer == threading.get_ident():
+            return
+        local = self._local
+        local.read_depth -= 1
+        if not local.read_depth:
+            with self._mutex:
+                self._readers -= 1
+                if not self._readers and self._waiting_writers:
+                    self._condition.notify_all()
+
+    def acquire_write(self):
+        me = threading.get_ident()
+        if self._writer == me:
+            self._write_depth += 1
+            return
+        if getattr(self._local, 'read_depth', 0):
+            raise RuntimeError("cannot take the write lock while holding the read lock")
+        with self._mutex:
+            self._waiting_writers += 1
+            while self._writer is not None or self._readers:
+                self._condition.wait()
+            self._waiting_writers -= 1
+            self._writer = me
+            self._write_depth = 1
+
+    def release_write(self):
+        self._write_depth -= 1
+        if not self._write_depth:
+            with self._mutex:
+                self._writer = None
+                self._condition.notify_all()
+
+    @contextmanager
+    def reading(self):
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def writing(self):
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+
+def read_locked(method):
+    """Run a manager method under its lock's shared (read) side, timed into METRICS"""
+    @functools.wraps(method)
+    def locked(self, *args, **kwargs):
+        start = time.perf_counter() if METRICS.enabled else None
+        lock = self.lock
+        lock.acquire_read()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            lock.release_read()
+            if start is not None:
+                METRICS.observe(f"{type(self).__name__}.{method.__name__}", time.perf_counter() - start)
+    return locked
+
+
+def write_locked(method):
+    """Run a manager method under its lock's exclusive (write) side, timed into METRICS"""
+    @functools.wraps(method)
+    def locked(self, *args, **kwargs):
+        start = time.perf_counter() if METRICS.enabled else None
+        lock = self.lock
+        lock.acquire_write()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            lock.release_write()
+            if start is not None:
+                METRICS.observe(f"{type(self).__name__}.{method.__name__}", time.perf_counter() - start)
+    return locked
+
+
+# Persistence
+@contextmanager
+def atomic_write(path):
+    """
+    Open a temporary file next to path for writing; on success it is
+    fsynced and renamed over path, so readers and crashes see either the old
+    file or the complete new one, never a truncated mix.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        try:
+            os.chmod(tmp_path, os.stat(path).st_mode & 0o777)
+        except OSError:
+            os.chmod(tmp_path, 0o644)
+        with os.fdopen(fd, 'w', newline='') as file:
+            yield file
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    if hasattr(os, 'O_DIRECTORY'):
+        # make the rename itself durable
+        dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+@contextmanager
+def file_lock(path):
+    """Exclusive fcntl advisory lock on <path>.lock, held across processes for the block"""
+    if fcntl is None:
+        yield
+        return
+    with open(path + '.lock', 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class ChangeJournal:
+    """Append-only log of changes, stored as one JSON object per line"""
+    def __init__(self, path):
+        self.path = path
+
+    def append(self, op, key, row=None):
+        """Append one change; op is 'put' (insert/replace) or 'delete'"""
+        self.extend([(op, key, row)])
+
+    def extend(self, changes):
+        """Append several (op, key, row) changes with a single write"""
+        data = ''.join(json.dumps({'op': op, 'key': key, 'row': row}) + "\n"
+                       for op, key, row in changes).encode()
+        with open(self.path, 'a+b') as file:
+            if file.seek(0, os.SEEK_END):
+                file.seek(-1, os.SEEK_END)
+                if file.read(1) != b"\n":
+                    # a crash tore the last line: end it so our entries start on their own line
+                    data = b"\n" + data
+            file.write(data)
+
+    def replay(self):
+        """Yield (op, key, row) for every complete entry in the journal"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb') as file:
+            for line in file:
+                try:
+                    entry = json.loads(line)
+                    change = entry['op'], entry['key'], entry['row']
+                except (ValueError, TypeError, KeyError):
+                    # torn write from a crash: skip just that line, later entries are still valid
+                    continue
+                yield change
+
+    def size(self):
+        """Journal size in bytes"""
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+
+    def clear(self):
+        """Drop all entries (after they have been folded into the CSV)"""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class PersistentManager:
+    """
+    Shared persistence for the CSV-backed managers.
+
+    By default every change rewrites the whole CSV, as before. With
+    journal=True changes are appended to <csv_file>.journal instead; the
+    journal is replayed over the CSV on startup and folded back into it by
+    compact(), either explicitly or once it grows past journal_max_bytes.
+
+    Inside "with manager.batch():" changes are only collected and persisted
+    once when the block exits; if an exception escapes, the in-memory
+    records are rolled back instead.
+
+    With storage=SQLiteStorage(...) the records are loaded from the
+    manager's table instead, and each change (or batch) is written to it as
+    one transaction of single-row upserts and deletes; the CSV is not used.
+
+    Managers are safe to share between threads: every public method takes
+    the manager's ReadWriteLock (self.lock), shared for queries and
+    exclusive for changes, and a batch holds it exclusively throughout.
+    Iterating with iter_students() while other threads write needs
+    "with manager.lock.reading():" around the loop.
+
+    Several processes may share the same files. CSVs are replaced
+    atomically (atomic_write), and loads and writes hold an fcntl lock on
+    <csv_file>.lock. Before writing, a manager compares the CSV and journal
+    (inode, mtime, size) with what it last read or wrote; if another process
+    has written since, it reloads and re-applies its own changes first, so
+    concurrent writers serialize instead of overwriting each other.
+    """
+    journal_max_bytes = 4 * 1024 * 1024
+    journal_max_changes = 10000   # bigger change sets rewrite the CSV instead
+    records_attr = None   # name of the attribute holding the record list
+    table = None          # SQLiteStorage table holding the records
+
+    def _init_persistence(self, csv_file, journal, storage=None):
         self.csv_file = csv_file
-        self.students = []
+        self.storage = storage
+        self.lock = ReadWriteLock()
+        self.journal = ChangeJournal(csv_file + '.journal') if journal and storage is None else None
+        self._batch_depth = 0
+        self._pending = {}
+        self._disk_lock_depth = 0
+        self._version = None   # _disk_version() as of our last load or write
+
+    def _load(self):
+        """Load the records from storage, or from the CSV plus journal"""
+        if self.storage is None:
+            with self._disk_lock():
+                self.load_from_csv()
+                self.replay_journal()
+                self._version = self._disk_version()
+            return
+        rows = self.storage.rows(self.table)
+        setattr(self, self.records_attr, [self._record_from_row(row) for row in rows])
+        print(f"Loaded {len(rows)} {self.table} from {self.storage.path}")
+
+    def _count_csv_bytes(self, operation):
+        """Add csv_file's size to the <Class>.<operation>_bytes counter when metrics are on"""
+        if METRICS.enabled and os.path.exists(self.csv_file):
+            METRICS.count(f"{type(self).__name__}.{operation}_bytes", os.path.getsize(self.csv_file))
+
+    @contextmanager
+    def _disk_lock(self):
+        """Hold the cross-process lock on csv_file; re-entrant within this manager"""
+        if self._disk_lock_depth or self.storage is not None:
+            self._disk_lock_depth += 1
+            try:
+                yield
+            finally:
+                self._disk_lock_depth -= 1
+            return
+        with file_lock(self.csv_file):
+            self._disk_lock_depth = 1
+            try:
+                yield
+            finally:
+                self._disk_lock_depth = 0
+
+    def _disk_version(self):
+        """(inode, mtime, size) of the CSV and journal, None for a missing file"""
+        version = []
+        for path in (self.csv_file, self.journal.path if self.journal is not None else None):
+            try:
+                st = os.stat(path)
+                version.append((st.st_ino, st.st_mtime_ns, st.st_size))
+            except (OSError, TypeError):
+                version.append(None)
+        return tuple(version)
+
+    def _refresh(self):
+        """Reload if another process has written since our last load or write (under _disk_lock)"""
+        version = self._disk_version()
+        # the CSV or the journal alone may have changed (a journal with no CSV yet counts);
+        # with neither on disk there is nothing to reload from
+        if version == self._version or version == (None, None):
+            return False
+        setattr(self, self.records_attr, [])
         self.load_from_csv()
-    
+        self.replay_journal()
+        self._version = self._disk_version()
+        return True
+
+    def _key(self, record):
+        """Primary key of a record"""
+        raise NotImplementedError
+
+    def _record_from_row(self, row):
+        """Build a record from a CSV/journal row"""
+        raise NotImplementedError
+
+    def _apply_change(self, op, key, record):
+        """Apply a replayed change to the in-memory records"""
+        raise NotImplementedError
+
+    def _record_change(self, op, key, record=None):
+        """Persist one change made to the in-memory records"""
+        if self._batch_depth:
+            # only the last change per key matters, each 'put' is a full row
+            self._pending.pop(key, None)
+            self._pending[key] = (op, record)
+            return
+        self._persist_changes([(op, key, record)])
+
+    def _record_changes(self, changes):
+        """Persist a list of (op, key, record) changes as one write"""
+        if self._batch_depth:
+            for op, key, record in changes:
+                self._record_change(op, key, record)
+        elif changes:
+            self._persist_changes(changes)
+
+    def _persist_changes(self, changes):
+        """Write out a list of (op, key, record) changes"""
+        if self.storage is not None:
+            self.storage.write(self.table, [(op, key, record.to_dict() if record is not None else None)
+                                            for op, key, record in changes])
+            return
+        with self._disk_lock():
+            if self._refresh():
+                # another process wrote first: redo our changes on top of its records
+                for op, key, record in changes:
+                    self._apply_change(op, key, record)
+            if self.journal is None:
+                self.save_to_csv()
+            elif len(changes) >= self.journal_max_changes:
+                # cheaper to rewrite the snapshot than to journal every row
+                self.compact()
+            else:
+                self.journal.extend([(op, key, record.to_dict() if record is not None else None)
+                                     for op, key, record in changes])
+                if self.journal.size() >= self.journal_max_bytes:
+                    self.compact()
+            self._version = self._disk_version()
+
+    def _snapshot(self):
+        """Copy of the records, taken when a batch starts"""
+        return [copy.copy(r) for r in getattr(self, self.records_attr)]
+
+    def _restore(self, snapshot):
+        """Put back the records saved by _snapshot()"""
+        setattr(self, self.records_attr, snapshot)
+
+    @contextmanager
+    def batch(self):
+        """Group changes: persist once on exit, roll back on exception"""
+        with self.lock.writing():
+            if self._batch_depth:
+                # nested batch joins the outer one
+                self._batch_depth += 1
+                try:
+                    yield self
+                finally:
+                    self._batch_depth -= 1
+                return
+
+            snapshot = self._snapshot()
+            self._batch_depth = 1
+            try:
+                yield self
+            except BaseException:
+                self._batch_depth = 0
+                self._pending = {}
+                self._restore(snapshot)
+                raise
+            self._batch_depth = 0
+            pending, self._pending = self._pending, {}
+            if pending:
+                self._persist_changes([(op, key, record) for key, (op, record) in pending.items()])
+
+    @write_locked
+    def replay_journal(self):
+        """Apply journaled changes on top of the records loaded from CSV"""
+        if self.journal is None:
+            return 0
+        count = 0
+        for op, key, row in self.journal.replay():
+            record = self._record_from_row(row) if op == 'put' else None
+            self._apply_change(op, key, record)
+            count += 1
+        if count:
+            print(f"Replayed {count} journaled change(s) onto {self.csv_file}")
+        return count
+
+    @write_locked
+    def compact(self):
+        """Fold the journal into the CSV snapshot and truncate it"""
+        if self.journal is None:
+            return
+        with self._disk_lock():
+            self._refresh()
+            self.save_to_csv()
+            self.journal.clear()
+            self._version = self._disk_version()
+
+
+@contextmanager
+def batch(*managers):
+    """
+    Batch changes across several managers, e.g.
+        with batch(app.student_manager, app.course_manager): ...
+    Each manager persists once on exit; all are rolled back on exception.
+    Locks are taken in a fixed order so concurrent batches cannot deadlock.
+    """
+    with ExitStack() as stack:
+        for manager in sorted(managers, key=id):
+            stack.enter_context(manager.batch())
+        yield managers
+
+
+class SQLiteStorage:
+    """
+    SQLite database holding all five tables, used by managers created with
+    storage=... instead of their CSV files. Columns match the CSV headers.
+    Every write is its own transaction unless it runs inside transaction().
+    """
+    TABLES = {
+        'students': ['email_address', 'first_name', 'last_name', 'course_id', 'grade', 'marks'],
+        'courses': ['course_id', 'course_name', 'description'],
+        'professors': ['professor_id', 'professor_name', 'rank', 'course_id'],
+        'grades': ['grade_id', 'grade_letter', 'min_marks', 'max_marks'],
+        'users': ['user_id', 'password', 'role'],
+    }
+    CSV_FILES = {'students': 'students.csv', 'courses': 'courses.csv', 'professors': 'professors.csv',
+                 'grades': 'grades.csv', 'users': 'login.csv'}
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS students (
+            email_address TEXT PRIMARY KEY, first_name TEXT NOT NULL, last_name TEXT NOT NULL,
+            course_id TEXT NOT NULL DEFAULT '', grade TEXT NOT NULL DEFAULT '', marks INTEGER NOT NULL);
+        CREATE INDEX IF NOT EXISTS students_course_marks ON students (course_id, marks);
+        CREATE INDEX IF NOT EXISTS students_marks ON students (marks, email_address);
+        CREATE INDEX IF NOT EXISTS students_name ON students (last_name, first_name, email_address);
+        CREATE TABLE IF NOT EXISTS courses (
+            course_id TEXT PRIMARY KEY, course_name TEXT, description TEXT);
+        CREATE TABLE IF NOT EXISTS professors (
+            professor_id TEXT PRIMARY KEY, professor_name TEXT, rank TEXT, course_id TEXT);
+        CREATE INDEX IF NOT EXISTS professors_course ON professors (course_id);
+        CREATE TABLE IF NOT EXISTS grades (
+            grade_id TEXT PRIMARY KEY, grade_letter TEXT, min_marks INTEGER, max_marks INTEGER);
+        CREATE TABLE IF NOT EXISTS users (
+            user_id TEXT PRIMARY KEY, password TEXT, role TEXT);
+    """
+
+    def __init__(self, path='checkmygrade.db'):
+        self.path = path
+        # autocommit; transactions are opened explicitly by transaction()
+        self.connection = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.executescript(self.SCHEMA)
+        self._depth = 0
+        self._transaction_lock = threading.RLock()   # one transaction at a time on the shared connection
+
+    @contextmanager
+    def transaction(self):
+        """BEGIN/COMMIT around the block, ROLLBACK on exception; nests"""
+        with self._transaction_lock:
+            if self._depth:
+                self._depth += 1
+                try:
+                    yield self.connection
+                finally:
+                    self._depth -= 1
+                return
+            self.connection.execute("BEGIN")
+            self._depth = 1
+            try:
+                yield self.connection
+            except BaseException:
+                self._depth = 0
+                self.connection.execute("ROLLBACK")
+                raise
+            self._depth = 0
+            self.connection.execute("COMMIT")
+
+    def count(self, table):
+        return self.connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    def rows(self, table):
+        """All rows of a table as dicts, in insertion order"""
+        return [dict(row) for row in self.connection.execute(f"SELECT * FROM {table} ORDER BY rowid")]
+
+    def _upsert_sql(self, table):
+        columns = self.TABLES[table]
+        updates = ', '.join(f"{c} = excluded.{c}" for c in columns[1:])
+        return (f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+                f"ON CONFLICT({columns[0]}) DO UPDATE SET {updates}")
+
+    def write(self, table, changes):
+        """Apply (op, key, row) changes, as produced by the managers, in one transaction"""
+        columns = self.TABLES[table]
+        upsert = self._upsert_sql(table)
+        delete = f"DELETE FROM {table} WHERE {columns[0]} = ?"
+        with self.transaction() as connection:
+            for op, key, row in changes:
+                if op == 'put':
+                    connection.execute(upsert, [row[c] for c in columns])
+                else:
+                    connection.execute(delete, (key,))
+
+    def import_csv(self, table, csv_file):
+        """Load a CSV in the managers' format into table; returns the row count"""
+        columns = self.TABLES[table]
+        if table == 'students':
+            # same rules as StudentManager.load_from_csv: first row per email wins, bad marks skipped
+            rows = (row for row in read_student_rows(csv_file) if 0 <= row[5] <= 100)
+        else:
+            with open(csv_file, 'r', newline='') as file:
+                rows = [[row[c] for c in columns] for row in csv.DictReader(file)]
+        insert = (f"INSERT OR IGNORE INTO {table} ({', '.join(columns)}) "
+                  f"VALUES ({', '.join('?' * len(columns))})")
+        with self.transaction() as connection:
+            before = connection.total_changes
+            connection.executemany(insert, rows)
+            count = connection.total_changes - before
+        print(f"Imported {count} rows from {csv_file} into {table}")
+        return count
+
+    def import_all(self, directory='.'):
+        """Import whichever of the app's CSV files exist in directory"""
+        for table, name in self.CSV_FILES.items():
+            path = os.path.join(directory, name)
+            if os.path.exists(path):
+                self.import_csv(table, path)
+
+    def close(self):
+        self.connection.close()
+
+
+class MarksHistogram:
+    """
+    Number of students at each mark 0-100 plus a running total, so the
+    average is O(1) and the median or any percentile is a 101-bucket scan.
+    """
+    __slots__ = ('counts', 'count', 'total')
+
+    def __init__(self, counts=None):
+        self.counts = list(counts) if counts is not None else [0] * 101
+        self.count = sum(self.counts)
+        self.total = sum(mark * n for mark, n in enumerate(self.counts))
+
+    @classmethod
+    def merged(cls, histograms):
+        """One histogram counting everything in histograms"""
+        return cls([sum(column) for column in zip(*(h.counts for h in histograms))] or None)
+
+    def add(self, marks):
+        if not 0 <= marks <= 100:
+            raise ValueError(f"marks out of range: {marks}")
+        self.counts[marks] += 1
+        self.count += 1
+        self.total += marks
+
+    def remove(self, marks):
+        self.counts[marks] -= 1
+        self.count -= 1
+        self.total -= marks
+
+    def nth(self, rank):
+        """Mark at 0-based position rank in sorted order"""
+        seen = 0
+        for mark, n in enumerate(self.counts):
+            seen += n
+            if seen > rank:
+                return mark
+        raise IndexError(rank)
+
+    def average(self):
+        return self.total / self.count if self.count else None
+
+    def median(self):
+        n = self.count
+        if not n:
+            return None
+        if n % 2 == 1:
+            return self.nth(n // 2)
+        return (self.nth(n // 2 - 1) + self.nth(n // 2)) / 2
+
+    def percentile(self, p):
+        """Nearest-rank p-th percentile (0-100), or None when empty"""
+        if not self.count:
+            return None
+        rank = -(-p * self.count // 100) - 1
+        return self.nth(max(0, min(self.count - 1, rank)))
+
+
+class NameIndex:
+    """
+    Prefix and fuzzy lookup of students by first or last name. Each distinct
+    lower-cased name maps to the emails carrying it (an ordered set), the
+    distinct names are kept sorted so a prefix is a bisect plus a contiguous
+    run (a trie flattened into a sorted array), and a trigram map over the
+    distinct names finds near misses for typos. Adding or removing a student
+    is O(1) unless it introduces or retires a name, which costs one insort
+    into the much shorter list of distinct names.
+    """
+    __slots__ = ('postings', 'names', 'trigrams')
+
+    def __init__(self):
+        self.postings = {}   # name -> {email: None}
+        self.names = []      # sorted distinct names
+        self.trigrams = {}   # trigram -> set of names containing it
+
+    @staticmethod
+    def _trigrams(name):
+        padded = f"  {name} "
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+    def add(self, email, *names):
+        for name in {n.lower() for n in names if n}:
+            postings = self.postings.get(name)
+            if postings is None:
+                postings = self.postings[name] = {}
+                bisect.insort(self.names, name)
+                for gram in self._trigrams(name):
+                    self.trigrams.setdefault(gram, set()).add(name)
+            postings[email] = None
+
+    def remove(self, email, *names):
+        for name in {n.lower() for n in names if n}:
+            postings = self.postings.get(name)
+            if postings is None:
+                continue
+            postings.pop(email, None)
+            if not postings:
+                del self.postings[name]
+                del self.names[bisect.bisect_left(self.names, name)]
+                for gram in self._trigrams(name):
+                    holders = self.trigrams[gram]
+                    holders.discard(name)
+                    if not holders:
+                        del self.trigrams[gram]
+
+    def prefixed(self, prefix):
+        """Distinct names starting with prefix, in order"""
+        names = self.names
+        i = bisect.bisect_left(names, prefix)
+        matches = []
+        while i < len(names) and names[i].startswith(prefix):
+            matches.append(names[i])
+            i += 1
+        return matches
+
+    def similar(self, term, min_score=0.3, limit=10):
+        """Up to limit distinct names closest to term by trigram Jaccard similarity, best first"""
+        grams = self._trigrams(term)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self.trigrams.get(gram, ()))
+        scored = []
+        for name, common in shared.items():
+            score = common / (len(grams) + len(self._trigrams(name)) - common)
+            if score >= min_score:
+                scored.append((-score, name))
+        return [name for _, name in heapq.nsmallest(limit, scored)]
+
+    def matching(self, term):
+        """Names term prefixes, or failing that the names it most resembles"""
+        return self.prefixed(term) or self.similar(term)
+
+    def count(self, names):
+        return sum(len(self.postings[name]) for name in names)
+
+    def emails(self, names):
+        """Emails carrying any of names, grouped by name in the order given (may repeat)"""
+        for name in names:
+            yield from self.postings[name]
+
+
+def _name_matches(student, terms):
+    """True if every term prefixes the student's first or last name (terms lower-cased)"""
+    first, last = student.first_name.lower(), student.last_name.lower()
+    return all(first.startswith(term) or last.startswith(term) for term in terms)
+
+
+# Fast student CSV reading
+STUDENT_FIELDS = ['email_address', 'first_name', 'last_name', 'course_id', 'grade', 'marks']
+
+
+def _student_columns(header):
+    """Positions of STUDENT_FIELDS in a CSV header row"""
+    index = {name: i for i, name in enumerate(header)}
+    return [index[name] for name in STUDENT_FIELDS]
+
+
+def _parse_student_rows(reader, columns):
+    """Yield (email, first, last, course_id, grade, marks) from csv.reader rows"""
+    e, f, l, c, g, m = columns
+    for row in reader:
+        if not row:
+            continue
+        marks = row[m]
+        yield row[e], row[f], row[l], row[c], row[g], int(marks) if marks else 0
+
+
+def _parse_student_chunk(path, columns, start, end):
+    """Parse bytes [start, end) of a student CSV (runs in a worker process)"""
+    with open(path, 'rb') as file:
+        file.seek(start)
+        text = file.read(end - start).decode()
+    return list(_parse_student_rows(csv.reader(io.StringIO(text, newline='')), columns))
+
+
+PARALLEL_CHUNK_BYTES = 16 * 1024 * 1024
+
+
+def _read_student_rows_parallel(path, workers):
+    # Split at line boundaries, so fields must not contain quoted newlines
+    with open(path, 'rb') as file:
+        columns = _student_columns(next(csv.reader([file.readline().decode()])))
+        start = file.tell()
+        size = os.fstat(file.fileno()).st_size
+        chunks = max(workers * 4, (size - start) // PARALLEL_CHUNK_BYTES)
+        bounds = [start]
+        for i in range(1, chunks):
+            file.seek(max(start + (size - start) * i // chunks, bounds[-1]))
+            file.readline()
+            bounds.append(min(file.tell(), size))
+        bounds.append(size)
+
+    # at most workers + 1 parsed chunks are held at once, however big the file
+    ranges = ((a, b) for a, b in zip(bounds, bounds[1:]) if b > a)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque(pool.submit(_parse_student_chunk, path, columns, a, b)
+                        for a, b in islice(ranges, workers + 1))
+        try:
+            while pending:
+                rows = pending.popleft().result()
+                for a, b in islice(ranges, 1):
+                    pending.append(pool.submit(_parse_student_chunk, path, columns, a, b))
+                yield from rows
+        finally:
+            # stopped early: don't parse the rest of the file
+            for future in pending:
+                future.cancel()
+
+
+def read_student_rows(path, parallel_bytes=None):
+    """
+    Yield (email, first, last, course_id, grade, marks) tuples from a
+    student CSV using positional csv.reader rows. Files of parallel_bytes
+    or more are split into chunks parsed by a process pool.
+    """
+    workers = os.cpu_count() or 1
+    if parallel_bytes is not None and workers > 1 and os.path.getsize(path) >= parallel_bytes:
+        yield from _read_student_rows_parallel(path, workers)
+        return
+
+    with open(path, 'r', newline='', buffering=1024 * 1024) as file:
+        reader = csv.reader(file)
+        header = next(reader, None)
+        if header is not None:
+            yield from _parse_student_rows(reader, _student_columns(header))
+
+
+# Memory-mapped student snapshot
+class StudentSnapshot:
+    """
+    Read-only binary copy of students.csv, opened with mmap so nothing is
+    parsed up front.
+
+    Layout: a header, then one fixed-width record per student (offset and
+    lengths into the string pool, course and grade codes, marks), an array
+    of record numbers sorted by email, the string pool holding
+    "email\\0first\\0last" per student, and a small JSON trailer with the
+    course/grade code tables and a marks histogram per course. Lookups
+    binary-search the email index and statistics read the stored
+    histograms, so only the touched pages are ever read from disk.
+    """
+    MAGIC = b'CMGSNAP1'
+    HEADER = struct.Struct('<8sQQQQQ')   # magic, count, records, index, pool, trailer offsets
+    RECORD = struct.Struct('<QHHHBb')    # pool offset, email length, text length, course, grade, marks
+    INDEX_ITEM = 'I'
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self._count, self._records, index, self._pool, trailer = self.HEADER.unpack_from(self._map)
+        if magic != self.MAGIC:
+            raise ValueError(f"{path} is not a student snapshot")
+        self._index = memoryview(self._map)[index:index + 4 * self._count].cast(self.INDEX_ITEM)
+        meta = json.loads(self._map[trailer:])
+        self._course_ids = [_intern(c) for c in meta['course_ids']]
+        self._grade_letters = [_intern(g) for g in meta['grade_letters']]
+        self._histograms = {c: MarksHistogram(counts) for c, counts in zip(self._course_ids, meta['histograms'])}
+
+    @classmethod
+    def write(cls, path, rows):
+        """Write (email, first, last, course_id, grade, marks) rows to a new snapshot at path"""
+        course_lookup, grade_lookup, histograms, emails = {}, {}, [], []
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as file, tempfile.TemporaryFile() as pool:
+            file.write(cls.HEADER.pack(cls.MAGIC, 0, 0, 0, 0, 0))
+            records = cls.HEADER.size
+            seen = set()
+            pool_size = 0
+            for email, first_name, last_name, course_id, grade, marks in rows:
+                if email in seen or not 0 <= marks <= 100:
+                    continue
+                seen.add(email)
+                course = course_lookup.setdefault(course_id, len(course_lookup))
+                if course == len(histograms):
+                    histograms.append([0] * 101)
+                histograms[course][marks] += 1
+                encoded = email.encode()
+                text = b'\0'.join((encoded, first_name.encode(), last_name.encode()))
+                file.write(cls.RECORD.pack(pool_size, len(encoded), len(text), course,
+                                           grade_lookup.setdefault(grade, len(grade_lookup)), marks))
+                pool.write(text)
+                pool_size += len(text)
+                emails.append(encoded)
+            del seen
+            index = file.tell()
+            file.write(array(cls.INDEX_ITEM, sorted(range(len(emails)), key=emails.__getitem__)).tobytes())
+            pool_offset = file.tell()
+            pool.seek(0)
+            shutil.copyfileobj(pool, file, 1024 * 1024)
+            trailer = file.tell()
+            file.write(json.dumps({'course_ids': list(course_lookup), 'grade_letters': list(grade_lookup),
+                                   'histograms': histograms}).encode())
+            file.seek(0)
+            file.write(cls.HEADER.pack(cls.MAGIC, len(emails), records, index, pool_offset, trailer))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def for_csv(cls, csv_file):
+        """Open <csv_file>.snapshot, regenerating it first if the CSV is newer"""
+        path = csv_file + '.snapshot'
+        if not os.path.exists(path) or os.path.getmtime(path) < os.path.getmtime(csv_file):
+            start_time = time.time()
+            cls.write(path, read_student_rows(csv_file))
+            print(f"Rebuilt {path} in {time.time() - start_time:.3f} seconds")
+        return cls(path)
+
+    def __len__(self):
+        return self._count
+
+    def _row(self, number):
+        """(email, first, last, course_id, grade, marks) of record number"""
+        offset, _, length, course, grade, marks = self.RECORD.unpack_from(
+            self._map, self._records + number * self.RECORD.size)
+        start = self._pool + offset
+        email, first_name, last_name = self._map[start:start + length].decode().split('\0')
+        return email, first_name, last_name, self._course_ids[course], self._grade_letters[grade], marks
+
+    def _email(self, number):
+        offset, email_length = self.RECORD.unpack_from(self._map, self._records + number * self.RECORD.size)[:2]
+        start = self._pool + offset
+        return self._map[start:start + email_length]
+
+    def __iter__(self):
+        """Rows in file order"""
+        return map(self._row, range(self._count))
+
+    def find(self, email_address):
+        """Row for email_address by binary search over the email index, or None"""
+        key = email_address.encode()
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._email(self._index[mid]) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self._count and self._email(self._index[lo]) == key:
+            return self._row(self._index[lo])
+        return None
+
+    def histogram(self, course_id=None):
+        """Stored MarksHistogram for one course or overall"""
+        if course_id:
+            return self._histograms.get(course_id) or MarksHistogram()
+        return MarksHistogram.merged(self._histograms.values())
+
+    def close(self):
+        self._index.release()
+        self._map.close()
+
+
+# Sort keys for StudentManager views; email last so every key is unique
+SORT_KEYS = {
+    'email': lambda s: (s.email_address,),
+    'marks': lambda s: (s.marks, s.email_address),
+    'name': lambda s: (s.last_name, s.first_name, s.email_address),
+}
+
+
+class ImportReport:
+    """Outcome of import_students(): the students added and the rows turned away"""
+    __slots__ = ('accepted', 'rejected', 'elapsed')
+
+    def __init__(self):
+        self.accepted = []   # Student objects that were added
+        self.rejected = []   # (row_number, row, reason); row 1 is the first data row
+        self.elapsed = 0.0
+
+    def reject(self, row_number, row, reason):
+        self.rejected.append((row_number, row, reason))
+
+    def summary(self):
+        return (f"Imported {len(self.accepted)} student(s), rejected {len(self.rejected)} "
+                f"in {self.elapsed:.3f} seconds")
+
+    def to_dict(self):
+        return {
+            'accepted': len(self.accepted),
+            'rejected': [{'row': n, 'email_address': row.get('email_address'), 'reason': reason}
+                         for n, row, reason in self.rejected],
+            'elapsed': self.elapsed
+        }
+
+
+def _import_rows(source):
+    """Rows of an import as dicts, from a CSV path or an iterable of Students, dicts or tuples"""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'r', newline='', buffering=1024 * 1024) as file:
+            yield from csv.DictReader(file)
+        return
+    for item in source:
+        if isinstance(item, Student):
+            yield item.to_dict()
+        elif isinstance(item, dict):
+            yield item
+        else:
+            yield dict(zip(STUDENT_FIELDS, item))
+
+
+# Paged output
+PAGE_SIZE = 25
+
+
+class Pager:
+    """
+    Shows a long listing one page at a time. fetch(start, stop) returns the
+    rows in that range, so a page costs a skip to start plus page_size rows
+    however long the listing is, and nothing is held between pages (the
+    managers take their read lock per page, not while the user reads).
+    Each page is formatted into one string and written at once. When stdin
+    is a terminal, or interactive is set, the user moves with Enter/n, p, a
+    page number or q; otherwise every page is written in turn, fetched
+    block_rows at a time so streaming managers do not re-skip per page.
+    """
+    block_rows = 10000
+
+    def __init__(self, title, total, fetch, page_size=PAGE_SIZE, interactive=None):
+        self.title = title
+        self.total = total
+        self.fetch = fetch
+        self.page_size = max(1, page_size)
+        self.interactive = sys.stdin.isatty() if interactive is None else interactive
+
+    @classmethod
+    def for_list(cls, title, items, **kwargs):
+        """Pager over an already materialized list"""
+        return cls(title, len(items), lambda start, stop: items[start:stop], **kwargs)
+
+    @property
+    def pages(self):
+        return max(1, -(-self.total // self.page_size))
+
+    def render(self, number, rows=None):
+        """Write page number (1-based) in a single write, fetching its rows unless given"""
+        start = (number - 1) * self.page_size
+        if rows is None:
+            rows = self.fetch(start, start + self.page_size)
+        bar = '=' * 80
+        lines = ['', bar, f"Total {self.title}: {self.total}"]
+        if self.pages > 1:
+            lines.append(f"Showing {start + 1}-{start + len(rows)} (page {number} of {self.pages})")
+        lines.append(bar)
+        lines.extend(map(str, rows))
+        lines.append(bar)
+        sys.stdout.write('\n'.join(lines) + '\n')
+
+    def show(self):
+        if not self.interactive:
+            self.show_all()
+            return
+        number = 1
+        self.render(number)
+        while self.pages > 1:
+            try:
+                answer = input(f"Page {number}/{self.pages} - Enter/n next, p previous, "
+                               f"page number, q quit: ").strip().lower()
+            except EOFError:
+                return
+            if answer in ('', 'n'):
+                if number == self.pages:
+                    return
+                number += 1
+            elif answer == 'p':
+                number = max(1, number - 1)
+            elif answer.isdigit():
+                number = min(max(1, int(answer)), self.pages)
+            elif answer == 'q':
+                return
+            else:
+                print("Invalid choice!")
+                continue
+            self.render(number)
+
+    def show_all(self):
+        """Write every page in order"""
+        if not self.total:
+            self.render(1, [])
+            return
+        block = self.page_size * max(1, self.block_rows // self.page_size)
+        number = 1
+        for start in range(0, self.total, block):
+            rows = self.fetch(start, start + block)
+            for offset in range(0, len(rows), self.page_size):
+                self.render(number, rows[offset:offset + self.page_size])
+                number += 1
+            if len(rows) < block:
+                return   # the listing shrank since total was taken
+
+
+# Manager Classes
+class StudentManager(PersistentManager):
+    """
+    Manages all student operations
+
+    With lazy=True the CSV is not loaded up front: iter_students(),
+    search_student(), get_statistics(), grade_counts() and
+    display_all_students() stream the file (plus any journal) in constant
+    memory, and the roster is only loaded by the first change or sort.
+
+    snapshot=True is lazy mode reading from a memory-mapped StudentSnapshot
+    of the CSV (rebuilt when the CSV is newer) instead of parsing it:
+    search_student() binary-searches its email index and get_statistics()
+    uses its stored histograms, as long as no journaled changes are pending.
+
+    sort_students() does not reorder the roster. It selects a sorted view
+    (by email, marks or name) that is built once and then kept sorted by
+    bisect insertion on every change; iteration and display follow the
+    selected view.
+    """
+    records_attr = 'students'
+    parallel_load_bytes = 256 * 1024 * 1024   # parse bigger CSVs in parallel
+
+    def __init__(self, csv_file='students.csv', journal=False, lazy=False, snapshot=False):
+        self._init_persistence(csv_file, journal)
+        # Primary-key index: email_address -> Student. Dicts keep insertion
+        # order, so this doubles as the display order of the roster.
+        self._students = {}
+        self._loaded = False
+        self._sort_order = None   # (by, ascending) selected by sort_students
+        self._reset_indexes()
+        self._mapped = None
+        self._mapped_version = None   # CSV (inode, mtime, size) the snapshot was built from
+        if snapshot and os.path.exists(csv_file):
+            self._mapped_version = self._disk_version()[0]
+            self._mapped = StudentSnapshot.for_csv(csv_file)
+        if not lazy and not snapshot:
+            self._ensure_loaded()
+
+    # -- secondary indexes, kept in step with every change to _students --
+
+    def _reset_indexes(self):
+        self._overall_marks = MarksHistogram()
+        self._course_marks = {}      # course_id -> MarksHistogram
+        self._course_students = {}   # course_id -> {email_address: Student}, an ordered set
+        self._sorted_views = {}      # by -> sorted list of SORT_KEYS[by] tuples, built on demand
+        self._name_index = None      # NameIndex, built by the first search_by_name
+        self._marks_index = None     # course_id -> 101 {email_address: Student} buckets, built on demand
+
+    def _index_student(self, student):
+        course_id = student.course_id
+        self._overall_marks.add(student.marks)
+        histogram = self._course_marks.get(course_id)
+        if histogram is None:
+            histogram = self._course_marks[course_id] = MarksHistogram()
+            self._course_students[course_id] = {}
+        histogram.add(student.marks)
+        self._course_students[course_id][student.email_address] = student
+        for by, view in self._sorted_views.items():
+            bisect.insort(view, SORT_KEYS[by](student))
+        if self._name_index is not None:
+            self._name_index.add(student.email_address, student.first_name, student.last_name)
+        if self._marks_index is not None:
+            buckets = self._marks_index.get(course_id)
+            if buckets is None:
+                buckets = self._marks_index[course_id] = [{} for _ in range(101)]
+            buckets[student.marks][student.email_address] = student
+
+    def _unindex_student(self, student):
+        course_id = student.course_id
+        self._overall_marks.remove(student.marks)
+        histogram = self._course_marks[course_id]
+        histogram.remove(student.marks)
+        del self._course_students[course_id][student.email_address]
+        if self._marks_index is not None:
+            del self._marks_index[course_id][student.marks][student.email_address]
+        if not histogram.count:
+            del self._course_marks[course_id]
+            del self._course_students[course_id]
+            if self._marks_index is not None:
+                del self._marks_index[course_id]
+        for by, view in self._sorted_views.items():
+            key = SORT_KEYS[by](student)
+            del view[bisect.bisect_left(view, key)]
+        if self._name_index is not None:
+            self._name_index.remove(student.email_address, student.first_name, student.last_name)
+
+    def _rebuild_indexes(self):
+        self._reset_indexes()
+        for student in self._students.values():
+            self._index_student(student)
+
+    def _put(self, student):
+        """Insert or replace a student in the primary and secondary indexes"""
+        old = self._students.get(student.email_address)
+        if old is not None:
+            self._unindex_student(old)
+        self._students[student.email_address] = student
+        try:
+            self._index_student(student)
+        except BaseException:
+            # leave the roster as it was rather than half-indexed
+            if old is None:
+                del self._students[student.email_address]
+            else:
+                self._students[student.email_address] = old
+            self._rebuild_indexes()
+            raise
+
+    def _drop(self, email_address):
+        """Remove a student from all indexes; returns it or None"""
+        student = self._students.pop(email_address, None)
+        if student is not None:
+            self._unindex_student(student)
+        return student
+
+    def _view(self, by):
+        """Sorted view for by, built on first use and maintained afterwards"""
+        view = self._sorted_views.get(by)
+        if view is None:
+            view = self._sorted_views[by] = sorted(map(SORT_KEYS[by], self._students.values()))
+        return view
+
+    def _names(self):
+        """Name index, built on first use and maintained afterwards"""
+        if self._name_index is None:
+            index = NameIndex()
+            for student in self._students.values():
+                index.add(student.email_address, student.first_name, student.last_name)
+            self._name_index = index
+        return self._name_index
+
+    def _marks_buckets(self):
+        """Per-course marks buckets, built on first use and maintained afterwards"""
+        if self._marks_index is None:
+            index = {}
+            for course_id, students in self._course_students.items():
+                buckets = index[course_id] = [{} for _ in range(101)]
+                for email, student in students.items():
+                    buckets[student.marks][email] = student
+            self._marks_index = index
+        return self._marks_index
+
+    def _ordered_students(self):
+        """Loaded students in insertion order, or in the order picked by sort_students"""
+        if self._sort_order is None:
+            return iter(self._students.values())
+        by, ascending = self._sort_order
+        view = self._view(by)
+        students = self._students
+        return (students[key[-1]] for key in (view if ascending else reversed(view)))
+
+    def _ensure_loaded(self):
+        """Load the CSV and journal into memory if not done yet"""
+        if not self._loaded:
+            self._loaded = True
+            with self._disk_lock():
+                self.load_from_csv()
+                self.replay_journal()
+                self._version = self._disk_version()
+
+    @property
+    @read_locked
+    def students(self):
+        """List of students in current order (insertion order or last sort)"""
+        if not self._loaded:
+            return list(self.iter_students())
+        return list(self._ordered_students())
+
+    @read_locked
+    def __len__(self):
+        if not self._loaded:
+            snapshot = self._open_snapshot()
+            if snapshot is not None and not self._journal_overrides():
+                return len(snapshot)
+            return sum(1 for _ in self.iter_students())
+        return len(self._students)
+
+    @students.setter
+    @write_locked
+    def students(self, students):
+        self._loaded = True
+        self._students = {}
+        for student in students:
+            self._students.setdefault(student.email_address, student)
+        self._rebuild_indexes()
+        # the new roster replaces what is on disk rather than being merged with it
+        self._version = self._disk_version()
+
+    def _open_snapshot(self):
+        """The mapped snapshot, rebuilt first if the CSV was rewritten since; None when not mapped"""
+        if self._mapped is not None:
+            version = self._disk_version()[0]
+            if version != self._mapped_version:
+                # dropped rather than closed: an iterator may still be reading the old mapping
+                self._mapped = None
+                if version is not None:
+                    self._mapped = StudentSnapshot.for_csv(self.csv_file)
+                self._mapped_version = version
+        return self._mapped
+
+    def _file_rows(self, parallel=True):
+        """Student tuples from the mapped snapshot if open, else parsed from the CSV"""
+        snapshot = self._open_snapshot()
+        if snapshot is not None:
+            return iter(snapshot)
+        return read_student_rows(self.csv_file, self.parallel_load_bytes if parallel else None)
+
+    def _journal_overrides(self):
+        """{email: (op, row)} for the latest journaled change to each student"""
+        overrides = {}
+        if self.journal is not None:
+            for op, key, row in self.journal.replay():
+                overrides.pop(key, None)
+                overrides[key] = (op, row)
+        return overrides
+
+    def iter_students(self):
+        """Iterate over students without materializing the roster when lazy"""
+        if self._loaded:
+            yield from self._ordered_students()
+            return
+
+        # journal entries override CSV rows; the journal is kept small by compaction
+        overrides = self._journal_overrides()
+        if os.path.exists(self.csv_file):
+            # same rows as load_from_csv: the first valid row for each email wins
+            seen = set()
+            # streamed on the sequential reader: the parallel one parses ahead of the consumer
+            for row in self._file_rows(parallel=False):
+                if row[0] in seen or not self.validate_marks(row[5]):
+                    continue
+                seen.add(row[0])
+                override = overrides.pop(row[0], None)
+                if override is None:
+                    yield Student(*row)
+                elif override[0] == 'put':
+                    yield self._record_from_row(override[1])
+        for op, row in overrides.values():
+            if op == 'put':
+                yield self._record_from_row(row)
+
+    def iter_chunks(self, chunk_size=10000):
+        """Yield lists of up to chunk_size students"""
+        students = self.iter_students()
+        while True:
+            chunk = list(islice(students, chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+    @write_locked
     def load_from_csv(self):
         """Load students from CSV file"""
         if not os.path.exists(self.csv_file):
             return
         
+        skipped = 0
+        students = self._students
         try:
-            with open(self.csv_file, 'r', newline='') as file:
-                reader = csv.DictReader(file)
-                for row in reader:
-                    student = Student(
-                        row['email_address'],
-                        row['first_name'],
-                        row['last_name'],
-                        row['course_id'],
-                        row['grade'],
-                        int(row['marks']) if row['marks'] else 0
-                    )
-                    self.students.append(student)
-            print(f"✓ Loaded {len(self.students)} students from {self.csv_file}")
+            for row in self._file_rows():
+                if row[0] in students or not 0 <= row[5] <= 100:
+                    skipped += 1
+                    continue
+                students[row[0]] = Student(*row)
+            print(f"✓ Loaded {len(self._students)} students from {self.csv_file}")
+            if skipped:
+                print(f"Skipped {skipped} duplicate or invalid row(s) in {self.csv_file}")
+            self._count_csv_bytes('load')
         except Exception as e:
             print(f"Error loading students: {e}")
+        self._rebuild_indexes()
+
+    @read_locked
+    def save_to_csv(self):
+        """Save students to CSV file"""
+        if not self._loaded:
+            # lazy and untouched: the file on disk is already current
+            return
+        try:
+            with atomic_write(self.csv_file) as file:
+                writer = csv.writer(file)
+                writer.writerow(STUDENT_FIELDS)
+                writer.writerows((s.email_address, s.first_name, s.last_name, s.course_id, s.grade, s.marks)
+                                 for s in self._students.values())
+            self._count_csv_bytes('save')
+        except Exception as e:
+            print(f"Error saving students: {e}")
+
+    def _key(self, student):
+        return student.email_address
+
+    def _contains(self, email_address):
+        return email_address in self._students
+
+    def _record_from_row(self, row):
+        return Student(
+            row['email_address'],
+            row['first_name'],
+            row['last_name'],
+            row['course_id'],
+            row['grade'],
+            int(row['marks']) if row['marks'] else 0
+        )
+
+    def _apply_change(self, op, key, student):
+        if op == 'put':
+            self._put(student)
+        else:
+            self._drop(key)
+    
+    def validate_email(self, email):
+        # Check if email has @ and a dot after @
+        if '@' not in email:
+            return False
+        parts = email.split('@')
+        if len(parts) != 2:
+            return False
+        if '.' not in parts[1]:
+            return False
+        if len(parts[0]) == 0 or len(parts[1]) == 0:
+            return False
+        return True
+    
+    def validate_marks(self, marks):
+        """Validate marks: a whole number from 0 to 100 (floats and strings are rejected)"""
+        return isinstance(marks, int) and not isinstance(marks, bool) and 0 <= marks <= 100
+    
+    def _validate_student(self, student):
+        """Check a new student's fields, printing the first problem found"""
+        if not student.email_address or not self.validate_email(student.email_address):
+            print("Invalid email address format!")
+            return False
+        
+        if not student.first_name or not student.last_name:
+            print("First name and last name are required!")
+            return False
+        
+        if not self.validate_marks(student.marks):
+            print("Marks must be a whole number between 0 and 100!")
+            return False
+        return True
+
+    @write_locked
+    def add_student(self, student):
+        """Add new student with validation"""
+        if not self._validate_student(student):
+            return False
+        
+        self._ensure_loaded()
+        if student.email_address in self._students:
+            print(f"Student with email {student.email_address} already exists!")
+            return False
+        
+        self._put(student)
+        self._record_change('put', student.email_address, student)
+        print(f"Student {student.first_name} {student.last_name} added successfully!")
+        return True             
+
+    @write_locked
+    def delete_student(self, email_address):
+        """Delete student by email"""
+        self._ensure_loaded()
+        if self._drop(email_address) is not None:
+            self._record_change('delete', email_address)
+            print(f"Student with email {email_address} deleted successfully!")
+            return True
+        else:
+            print(f"Student with email {email_address} not found!")
+            return False
+    
+    @write_locked
+    def update_student(self, email_address, **kwargs):
+        """Update student details"""
+        self._ensure_loaded()
+        student = self._students.get(email_address)
+        if student is None:
+            print(f"Student with email {email_address} not found!")
+            return False
+
+        # Validate marks if being updated
+        if 'marks' in kwargs:
+            if not self.validate_marks(kwargs['marks']):
+                print("Marks must be a whole number between 0 and 100!")
+                return False
+
+        previous = {key: getattr(student, key) for key in kwargs if hasattr(student, key)}
+        self._unindex_student(student)
+        try:
+            for key, value in kwargs.items():
+                if hasattr(student, key):
+                    setattr(student, key, _intern(value) if key in ('course_id', 'grade') else value)
+            self._index_student(student)
+        except BaseException:
+            # undo the half-applied update so _students and every index agree again
+            for key, value in previous.items():
+                setattr(student, key, value)
+            self._rebuild_indexes()
+            raise
+        self._record_change('put', email_address, student)
+        print(f"Student {email_address} updated successfully!")
+        return True
+    
+    def _validated_imports(self, source, grade_manager, report):
+        """Yield a new Student per valid import row, recording the rejected ones in report"""
+        seen = set()
+        for row_number, row in enumerate(_import_rows(source), 1):
+            email = (row.get('email_address') or '').strip()
+            first_name = (row.get('first_name') or '').strip()
+            last_name = (row.get('last_name') or '').strip()
+            if not email or not self.validate_email(email):
+                report.reject(row_number, row, "invalid email address")
+                continue
+            if not first_name or not last_name:
+                report.reject(row_number, row, "first name and last name are required")
+                continue
+            try:
+                marks = int(row.get('marks'))
+            except (TypeError, ValueError):
+                report.reject(row_number, row, "marks must be a whole number")
+                continue
+            if not self.validate_marks(marks):
+                report.reject(row_number, row, "marks must be between 0 and 100")
+                continue
+            if email in seen:
+                report.reject(row_number, row, "duplicate email in import")
+                continue
+            if self._contains(email):
+                report.reject(row_number, row, "student already exists")
+                continue
+            seen.add(email)
+            grade = grade_manager.get_grade_for_marks(marks) if grade_manager else row.get('grade') or ''
+            yield Student(email, first_name, last_name, (row.get('course_id') or '').strip(), grade, marks)
+
+    @write_locked
+    def import_students(self, source, grade_manager=None):
+        """
+        Add many students at once from a CSV path or an iterable of Students,
+        dicts or tuples. Rows are validated in one pass (duplicates checked
+        against a set and the email index), graded by grade_manager when
+        given, and persisted with a single write. Returns an ImportReport.
+        """
+        start_time = time.time()
+        self._ensure_loaded()
+        report = ImportReport()
+        for student in self._validated_imports(source, grade_manager, report):
+            self._apply_change('put', student.email_address, student)
+            report.accepted.append(student)
+        self._record_changes([('put', s.email_address, s) for s in report.accepted])
+        report.elapsed = time.time() - start_time
+        print(report.summary())
+        return report
+
+
+    @read_locked
+    def search_student(self, email_address):
+        """Search for a student by email and measure performance"""
+        start_time = time.time()
+        if self._loaded:
+            result = self._students.get(email_address)
+        elif self._open_snapshot() is not None:
+            override = self._journal_overrides().get(email_address)
+            if override is not None:
+                result = self._record_from_row(override[1]) if override[0] == 'put' else None
+            else:
+                row = self._mapped.find(email_address)
+                result = Student(*row) if row is not None else None
+        else:
+            result = next((s for s in self.iter_students() if s.email_address == email_address), None)
+        
+        elapsed_time = time.time() - start_time
+        
+        if result:
+            print("\n" + "="*80)
+            result.display_record()
+            print("="*80)
+        else:
+            print(f"Student with email {email_address} not found!")
+        
+        print(f"Search completed in {elapsed_time:.6f} seconds")
+        return result, elapsed_time
+
+    @read_locked
+    def search_by_name(self, query, limit=20):
+        """
+        Up to limit students whose first or last name starts with every word
+        of query, case-insensitively. A word that prefixes no name matches
+        the names closest to it instead, so typos still find people.
+        """
+        terms = query.lower().split()
+        if not terms or limit <= 0:
+            return []
+        if not self._loaded:
+            return list(islice((s for s in self.iter_students() if _name_matches(s, terms)), limit))
+
+        index = self._names()
+        students = self._students
+        matched = [index.matching(term) for term in terms]
+        # walk the word matching the fewest students and test the others on each of them
+        lead = min(range(len(terms)), key=lambda i: index.count(matched[i]))
+
+        def carries(names):
+            if len(names) == 1:
+                return index.postings[names[0]].__contains__
+            if len(names) <= 8:
+                # a few names: probe their posting sets
+                postings = [index.postings[name] for name in names]
+                return lambda email: any(email in emails for emails in postings)
+            names = set(names)
+            return lambda email: (students[email].first_name.lower() in names
+                                  or students[email].last_name.lower() in names)
+
+        # filter() keeps the per-candidate work in C when a word matches a single name
+        candidates = chain.from_iterable(index.postings[name] for name in matched[lead])
+        for i, names in enumerate(matched):
+            if i != lead:
+                candidates = filter(carries(names), candidates)
+        results = {}   # a student can sit under two of the lead names (first and last)
+        for email in candidates:
+            results[email] = None
+            if len(results) == limit:
+                break
+        return [students[email] for email in results]
+    
+    @write_locked
+    def sort_students(self, by='email', ascending=True):
+        """Sort students by email, marks, or name"""
+        start_time = time.time()
+        
+        if by not in SORT_KEYS:
+            print("Invalid sort option!")
+            return 0
+
+        # only the first sort by a key costs O(N log N); the view is kept up to date
+        self._ensure_loaded()
+        self._view(by)
+        self._sort_order = (by, ascending)
+        
+        elapsed_time = time.time() - start_time
+        print(f"Students sorted by {by} ({'ascending' if ascending else 'descending'})")
+        print(f"Sort completed in {elapsed_time:.6f} seconds")
+        return elapsed_time
+    
+    @read_locked
+    def students_slice(self, start, stop):
+        """Students start..stop-1 in display order, skipping the rest in C where possible"""
+        if not self._loaded:
+            return list(islice(self.iter_students(), start, stop))
+        if self._sort_order is None:
+            return list(islice(self._students.values(), start, stop))
+        by, ascending = self._sort_order
+        view = self._view(by)
+        if ascending:
+            keys = view[start:stop]
+        else:
+            keys = view[max(0, len(view) - stop):max(0, len(view) - start)][::-1]
+        return [self._students[key[-1]] for key in keys]
+
+    def display_all_students(self, page_size=PAGE_SIZE, interactive=None):
+        """Display all students a page at a time"""
+        total = len(self)
+        if not total:
+            print("No students found!")
+            return
+        Pager("Students", total, self.students_slice, page_size, interactive).show()
+    
+    def top_k(self, by='marks', k=10):
+        """The k students with the highest key for by, highest first"""
+        return self._extreme_k(by, k, largest=True)
+
+    def bottom_k(self, by='marks', k=10):
+        """The k students with the lowest key for by, lowest first"""
+        return self._extreme_k(by, k, largest=False)
+
+    @read_locked
+    def _extreme_k(self, by, k, largest):
+        if by not in SORT_KEYS:
+            print("Invalid sort option!")
+            return []
+        if k <= 0:
+            return []
+        key = SORT_KEYS[by]
+        select = heapq.nlargest if largest else heapq.nsmallest
+        if not self._loaded:
+            return select(k, self.iter_students(), key=key)
+        view = self._sorted_views.get(by)
+        if view is None:
+            return select(k, self._students.values(), key=key)
+        keys = reversed(view[-k:]) if largest else view[:k]
+        return [self._students[key[-1]] for key in keys]
+
+    @read_locked
+    def students_in_course(self, course_id):
+        """Students enrolled in course_id, in roster order"""
+        if not self._loaded:
+            return [s for s in self.iter_students() if s.course_id == course_id]
+        return list(self._course_students.get(course_id, {}).values())
+
+    @read_locked
+    def students_in_marks_range(self, lo, hi, course_id=None):
+        """
+        Students with lo <= marks <= hi, in one course or all, lowest marks
+        first. Reads only the matching marks buckets, so the cost follows
+        the size of the result rather than the roster.
+        """
+        lo, hi = max(lo, 0), min(hi, 100)
+        if not self._loaded:
+            return sorted((s for s in self.iter_students()
+                           if lo <= s.marks <= hi and (not course_id or s.course_id == course_id)),
+                          key=lambda s: s.marks)
+        index = self._marks_buckets()
+        if course_id:
+            courses = [index[course_id]] if course_id in index else []
+        else:
+            courses = list(index.values())
+        return [student for marks in range(lo, hi + 1)
+                for buckets in courses for student in buckets[marks].values()]
+
+    @read_locked
+    def grade_counts(self, course_id=None):
+        """Number of students per grade letter, for one course or overall"""
+        if self._loaded and course_id:
+            return Counter(s.grade for s in self._course_students.get(course_id, {}).values())
+        return Counter(s.grade for s in self.iter_students()
+                       if not course_id or s.course_id == course_id)
+
+    @write_locked
+    def regrade(self, grade_table):
+        """Set every grade to grade_table[marks] and persist once; returns the number changed"""
+        self._ensure_loaded()
+        with self._disk_lock():
+            if not self._batch_depth:
+                self._refresh()
+            changed = []
+            for student in self._students.values():
+                grade = grade_table[student.marks]
+                if student.grade != grade:
+                    student.grade = grade
+                    changed.append(student)
+            if self.journal is None and not self._batch_depth:
+                if changed:
+                    self.save_to_csv()
+                    self._version = self._disk_version()
+            else:
+                self._record_changes([('put', s.email_address, s) for s in changed])
+        return len(changed)
+
+    def _marks_histogram(self, course_id=None):
+        """MarksHistogram for one course or overall"""
+        if self._loaded:
+            if course_id:
+                return self._course_marks.get(course_id) or MarksHistogram()
+            return self._overall_marks
+        snapshot = self._open_snapshot()
+        if snapshot is not None and not self._journal_overrides():
+            return snapshot.histogram(course_id)
+        # lazy: constant memory, one histogram filled from the stream
+        histogram = MarksHistogram()
+        for student in self.iter_students():
+            if (not course_id or student.course_id == course_id) and 0 <= student.marks <= 100:
+                histogram.add(student.marks)
+        return histogram
+
+    @read_locked
+    def get_statistics(self, course_id=None):
+        """Get average and median marks for course or overall"""
+        histogram = self._marks_histogram(course_id)
+        if not histogram.count:
+            print("No students found for statistics!")
+            return None, None
+        return histogram.average(), histogram.median()
+
+    @read_locked
+    def percentile(self, p, course_id=None):
+        """Nearest-rank p-th percentile (0-100) of marks, or None"""
+        return self._marks_histogram(course_id).percentile(p)
+
+    @read_locked
+    def course_statistics(self):
+        """{course_id: (count, average, median)} for every course"""
+        histograms = self._course_marks
+        if not self._loaded:
+            histograms = {}
+            for student in self.iter_students():
+                if 0 <= student.marks <= 100:
+                    histograms.setdefault(student.course_id, MarksHistogram()).add(student.marks)
+        return {course_id: (h.count, h.average(), h.median())
+                for course_id, h in sorted(histograms.items())}
+
+
+class StudentStore(PersistentManager):
+    """
+    Columnar drop-in for StudentManager.
+
+    Each student is a row across typed arrays instead of an object: marks in
+    array('b') (-1 marks a deleted row), course_id and grade as small-integer
+    codes, and email/first/last name packed as UTF-8 into one shared
+    bytearray. Email lookups use an open-addressing hash table of row
+    numbers. Statistics come from a (course, marks) histogram built in one
+    C-level pass over the columns and cached until the next change.
+    """
+    records_attr = 'students'
+    _EMPTY = -1
+    _DELETED = -2
+
+    # validation and row parsing are shared with StudentManager
+    validate_email = StudentManager.validate_email
+    validate_marks = StudentManager.validate_marks
+    _validate_student = StudentManager._validate_student
+    _key = StudentManager._key
+    _record_from_row = StudentManager._record_from_row
+    _validated_imports = StudentManager._validated_imports
+    import_students = StudentManager.import_students
+
+    def __init__(self, csv_file='students.csv', journal=False):
+        self._init_persistence(csv_file, journal)
+        self._sort_order = None           # (by, ascending) selected by sort_students
+        self._clear()
+        self._load()
+
+    def _clear(self):
+        self._text = bytearray()          # "email\0first\0last" per row
+        self._starts = array('Q')
+        self._lengths = array('H')
+        self._marks = array('b')
+        self._course_codes = array('H')
+        self._grade_codes = array('B')
+        self._course_ids, self._course_lookup = [], {}
+        self._grade_letters, self._grade_lookup = [], {}
+        self._table = array('i', [self._EMPTY]) * 8
+        self._used_slots = 0              # live + deleted slots
+        self._count = 0
+        self._order = None                # rows by ascending sort key, kept up to date
+        self._histogram = None
+
+    @read_locked
+    def __len__(self):
+        return self._count
+
+    def _ensure_loaded(self):
+        """The store is always fully loaded"""
+
+    def _contains(self, email_address):
+        return self._find(email_address)[1] >= 0
+
+    # -- row storage --
+
+    def _code(self, value, values, lookup):
+        code = lookup.get(value)
+        if code is None:
+            code = lookup[value] = len(values)
+            values.append(value)
+        return code
+
+    def _set_text(self, row, email, first_name, last_name):
+        text = '\0'.join((email, first_name, last_name)).encode()
+        self._starts[row] = len(self._text)
+        self._lengths[row] = len(text)
+        self._text += text
+
+    def _fields(self, row):
+        """(email, first_name, last_name) of a row"""
+        start = self._starts[row]
+        return self._text[start:start + self._lengths[row]].decode().split('\0')
+
+    def _student(self, row):
+        email, first_name, last_name = self._fields(row)
+        return Student(email, first_name, last_name,
+                       self._course_ids[self._course_codes[row]],
+                       self._grade_letters[self._grade_codes[row]],
+                       self._marks[row])
+
+    def _rows(self):
+        """Live row numbers in display order"""
+        if self._order is None:
+            rows = range(len(self._marks))
+        else:
+            rows = self._order if self._sort_order[1] else reversed(self._order)
+        marks = self._marks
+        return (row for row in rows if marks[row] >= 0)
+
+    def _find(self, email):
+        """(slot, row) for email; row is -1 and slot is a free slot if absent"""
+        key = email.encode() + b'\0'
+        table = self._table
+        mask = len(table) - 1
+        slot = hash(email) & mask
+        free = -1
+        while True:
+            row = table[slot]
+            if row == self._EMPTY:
+                return (free if free >= 0 else slot), -1
+            if row == self._DELETED:
+                if free < 0:
+                    free = slot
+            else:
+                start = self._starts[row]
+                if self._text[start:start + len(key)] == key:
+                    return slot, row
+            slot = (slot + 1) & mask
+
+    def _resize_table(self):
+        size = 8
+        while size < self._count * 3:
+            size *= 2
+        self._table = array('i', [self._EMPTY]) * size
+        self._used_slots = 0
+        for row in range(len(self._marks)):
+            if self._marks[row] >= 0:
+                slot, _ = self._find(self._fields(row)[0])
+                self._table[slot] = row
+                self._used_slots += 1
+
+    def _append(self, student):
+        """Store a validated student not already present; returns its row"""
+        if (self._used_slots + 1) * 3 >= len(self._table) * 2:
+            self._resize_table()
+        slot, _ = self._find(student.email_address)
+        row = len(self._marks)
+        self._starts.append(0)
+        self._lengths.append(0)
+        self._set_text(row, student.email_address, student.first_name, student.last_name)
+        self._marks.append(student.marks)
+        self._course_codes.append(self._code(student.course_id, self._course_ids, self._course_lookup))
+        self._grade_codes.append(self._code(student.grade, self._grade_letters, self._grade_lookup))
+        if self._table[slot] == self._EMPTY:
+            self._used_slots += 1
+        self._table[slot] = row
+        self._count += 1
+        self._insert_order(row)
+        self._histogram = None
+        return row
+
+    def _sort_rows(self):
+        """Rebuild _order for the sort_students order in effect, if any"""
+        self._order = None
+        if self._sort_order is not None:
+            self._order = array('Q', sorted(self._rows(), key=self._row_key(self._sort_order[0])))
+
+    def _insert_order(self, row):
+        if self._order is not None:
+            bisect.insort(self._order, row, key=self._row_key(self._sort_order[0]))
+
+    def _delete_order(self, row):
+        if self._order is not None:
+            key = self._row_key(self._sort_order[0])
+            del self._order[bisect.bisect_left(self._order, key(row), key=key)]
+
+    def _remove(self, slot, row):
+        self._delete_order(row)
+        self._table[slot] = self._DELETED
+        self._marks[row] = -1
+        self._count -= 1
+        self._histogram = None
+        # reclaim space once most rows are dead
+        if len(self._marks) > 1024 and self._count * 2 < len(self._marks):
+            self._reclaim()
+
+    def _reclaim(self):
+        """Rewrite the columns without dead rows, keeping the display order"""
+        # not the students setter: that would mark the file as current and
+        # the next save would overwrite what other processes wrote since
+        live = [self._student(row) for row in self._rows()]
+        self._clear()
+        for student in live:
+            self._append(student)
+        self._sort_rows()
+
+    def _update(self, row, **kwargs):
+        # marks and names are sort keys: move the row to its new place in _order
+        moved = self._order is not None and not kwargs.keys().isdisjoint(('first_name', 'last_name', 'marks'))
+        if moved:
+            self._delete_order(row)
+        email, first_name, last_name = self._fields(row)
+        if 'first_name' in kwargs or 'last_name' in kwargs:
+            self._set_text(row, email, kwargs.get('first_name', first_name),
+                           kwargs.get('last_name', last_name))
+        if 'marks' in kwargs:
+            self._marks[row] = kwargs['marks']
+        if 'course_id' in kwargs:
+            self._course_codes[row] = self._code(kwargs['course_id'], self._course_ids, self._course_lookup)
+        if 'grade' in kwargs:
+            self._grade_codes[row] = self._code(kwargs['grade'], self._grade_letters, self._grade_lookup)
+        if moved:
+            self._insert_order(row)
+        self._histogram = None
+
+    # -- StudentManager API --
+
+    @property
+    @read_locked
+    def students(self):
+        """Materialized list of students in current order"""
+        return [self._student(row) for row in self._rows()]
+
+    @students.setter
+    @write_locked
+    def students(self, students):
+        self._clear()
+        for student in students:
+            if self._find(student.email_address)[1] < 0:
+                self._append(student)
+        self._sort_rows()
+        # the new roster replaces what is on disk rather than being merged with it
+        self._version = self._disk_version()
+
+    def iter_students(self):
+        """Iterate over students, materializing one at a time"""
+        return (self._student(row) for row in self._rows())
+
+    iter_chunks = StudentManager.iter_chunks
+
+    @read_locked
+    def students_in_course(self, course_id):
+        """Students enrolled in course_id, in display order"""
+        code = self._course_lookup.get(course_id)
+        if code is None:
+            return []
+        codes = self._course_codes
+        return [self._student(row) for row in self._rows() if codes[row] == code]
+
+    @read_locked
+    def students_in_marks_range(self, lo, hi, course_id=None):
+        """Students with lo <= marks <= hi, in one course or all, lowest marks first (a column scan)"""
+        code = None
+        if course_id:
+            code = self._course_lookup.get(course_id)
+            if code is None:
+                return []
+        marks, codes = self._marks, self._course_codes
+        rows = [row for row in self._rows()
+                if lo <= marks[row] <= hi and (code is None or codes[row] == code)]
+        rows.sort(key=marks.__getitem__)
+        return [self._student(row) for row in rows]
+
+    @write_locked
+    def regrade(self, grade_table):
+        """Set every grade to grade_table[marks] and persist once; returns the number changed"""
+        with self._disk_lock():
+            if not self._batch_depth:
+                self._refresh()
+            codes = [self._code(letter, self._grade_letters, self._grade_lookup) for letter in grade_table]
+            # marks bytes 0-100 map straight to grade codes; deleted rows (-1 = 255) to 0
+            mapping = bytes(codes[m] if m <= 100 else 0 for m in range(256))
+            old_codes = self._grade_codes
+            self._grade_codes = array('B', self._marks.tobytes().translate(mapping))
+            changed = [row for row in self._rows() if old_codes[row] != self._grade_codes[row]]
+            if self.journal is None and not self._batch_depth:
+                if changed:
+                    self.save_to_csv()
+                    self._version = self._disk_version()
+            else:
+                self._record_changes([('put', self._fields(row)[0], self._student(row)) for row in changed])
+        return len(changed)
+
+    @read_locked
+    def grade_counts(self, course_id=None):
+        """Number of students per grade letter, for one course or overall"""
+        code = self._course_lookup.get(course_id) if course_id else None
+        if course_id and code is None:
+            return Counter()
+        counts = Counter(self._grade_codes[row] for row in self._rows()
+                         if code is None or self._course_codes[row] == code)
+        return Counter({self._grade_letters[g]: n for g, n in counts.items()})
+
+    def _snapshot(self):
+        return {name: copy.copy(value) for name, value in vars(self).items()
+                if name.startswith('_') and name not in ('_batch_depth', '_pending', '_disk_lock_depth', '_version')}
+
+    def _restore(self, snapshot):
+        vars(self).update(snapshot)
+
+    def _apply_change(self, op, key, student):
+        slot, row = self._find(key)
+        if op == 'put' and row >= 0:
+            self._update(row, **student.to_dict())
+        elif op == 'put':
+            self._append(student)
+        elif row >= 0:
+            self._remove(slot, row)
+
+    @write_locked
+    def load_from_csv(self):
+        """Load students from CSV file"""
+        if not os.path.exists(self.csv_file):
+            return
+
+        skipped = 0
+        # appended in file order, then sorted once rather than inserted one by one
+        self._order = None
+        try:
+            for row in read_student_rows(self.csv_file, StudentManager.parallel_load_bytes):
+                student = Student(*row)
+                if (not self.validate_marks(student.marks)
+                        or self._find(student.email_address)[1] >= 0):
+                    skipped += 1
+                    continue
+                self._append(student)
+            print(f"✓ Loaded {self._count} students from {self.csv_file}")
+            if skipped:
+                print(f"Skipped {skipped} duplicate or invalid row(s) in {self.csv_file}")
+            self._count_csv_bytes('load')
+        except Exception as e:
+            print(f"Error loading students: {e}")
+        self._sort_rows()
+
+    @read_locked
+    def save_to_csv(self):
+        """Save students to CSV file"""
+        try:
+            with atomic_write(self.csv_file) as file:
+                writer = csv.writer(file)
+                writer.writerow(['email_address', 'first_name', 'last_name', 'course_id', 'grade', 'marks'])
+                for row in self._rows():
+                    writer.writerow((*self._fields(row),
+                                     self._course_ids[self._course_codes[row]],
+                                     self._grade_letters[self._grade_codes[row]],
+                                     self._marks[row]))
+            self._count_csv_bytes('save')
+        except Exception as e:
+            print(f"Error saving students: {e}")
+
+    @write_locked
+    def add_student(self, student):
+        """Add new student with validation"""
+        if not self._validate_student(student):
+            return False
+
+        if self._find(student.email_address)[1] >= 0:
+            print(f"Student with email {student.email_address} already exists!")
+            return False
+
+        self._append(student)
+        self._record_change('put', student.email_address, student)
+        print(f"Student {student.first_name} {student.last_name} added successfully!")
+        return True
+
+    @write_locked
+    def delete_student(self, email_address):
+        """Delete student by email"""
+        slot, row = self._find(email_address)
+        if row < 0:
+            print(f"Student with email {email_address} not found!")
+            return False
+        self._remove(slot, row)
+        self._record_change('delete', email_address)
+        print(f"Student with email {email_address} deleted successfully!")
+        return True
+
+    @write_locked
+    def update_student(self, email_address, **kwargs):
+        """Update student details"""
+        _, row = self._find(email_address)
+        if row < 0:
+            print(f"Student with email {email_address} not found!")
+            return False
+
+        if 'marks' in kwargs and not self.validate_marks(kwargs['marks']):
+            print("Marks must be a whole number between 0 and 100!")
+            return False
+
+        self._update(row, **{k: v for k, v in kwargs.items() if k != 'email_address'})
+        self._record_change('put', email_address, self._student(row))
+        print(f"Student {email_address} updated successfully!")
+        return True
+
+    @read_locked
+    def search_student(self, email_address):
+        """Search for a student by email and measure performance"""
+        start_time = time.time()
+        _, row = self._find(email_address)
+        result = self._student(row) if row >= 0 else None
+        elapsed_time = time.time() - start_time
+
+        if result:
+            print("\n" + "="*80)
+            result.display_record()
+            print("="*80)
+        else:
+            print(f"Student with email {email_address} not found!")
+
+        print(f"Search completed in {elapsed_time:.6f} seconds")
+        return result, elapsed_time
+
+    @read_locked
+    def search_by_name(self, query, limit=20):
+        """
+        Up to limit students whose first or last name starts with every word
+        of query, case-insensitively. The store keeps no name index, so this
+        scans the rows.
+        """
+        terms = query.lower().split()
+        if not terms or limit <= 0:
+            return []
+        return list(islice((s for s in self.iter_students() if _name_matches(s, terms)), limit))
+
+    @write_locked
+    def sort_students(self, by='email', ascending=True):
+        """Sort students by email, marks, or name"""
+        start_time = time.time()
+
+        if self._row_key(by) is None:
+            print("Invalid sort option!")
+            return 0
+
+        self._sort_order = (by, ascending)
+        self._sort_rows()
+
+        elapsed_time = time.time() - start_time
+        print(f"Students sorted by {by} ({'ascending' if ascending else 'descending'})")
+        print(f"Sort completed in {elapsed_time:.6f} seconds")
+        return elapsed_time
+
+    def _row_key(self, by):
+        """Row sort key matching SORT_KEYS[by], or None for an unknown key"""
+        if by == 'email':
+            return lambda row: self._fields(row)[0]
+        if by == 'marks':
+            return lambda row: (self._marks[row], self._fields(row)[0])
+        if by == 'name':
+            def key(row):
+                email, first_name, last_name = self._fields(row)
+                return last_name, first_name, email
+            return key
+        return None
+
+    def top_k(self, by='marks', k=10):
+        """The k students with the highest key for by, highest first"""
+        return self._extreme_k(by, k, heapq.nlargest)
+
+    def bottom_k(self, by='marks', k=10):
+        """The k students with the lowest key for by, lowest first"""
+        return self._extreme_k(by, k, heapq.nsmallest)
+
+    @read_locked
+    def _extreme_k(self, by, k, select):
+        key = self._row_key(by)
+        if key is None:
+            print("Invalid sort option!")
+            return []
+        rows = range(len(self._marks))
+        return [self._student(row) for row in select(k, (r for r in rows if self._marks[r] >= 0), key=key)]
+
+    @read_locked
+    def students_slice(self, start, stop):
+        """Students start..stop-1 in display order"""
+        return [self._student(row) for row in islice(self._rows(), start, stop)]
+
+    def display_all_students(self, page_size=PAGE_SIZE, interactive=None):
+        """Display all students a page at a time"""
+        total = len(self)
+        if not total:
+            print("No students found!")
+            return
+        Pager("Students", total, self.students_slice, page_size, interactive).show()
+
+    # -- statistics --
+
+    def _histograms(self):
+        """{course_id: MarksHistogram}, rebuilt only after changes"""
+        if self._histogram is None:
+            # one pass over the two columns, counted in C by Counter
+            pairs = Counter(zip(self._course_codes, self._marks))
+            counts = {}
+            for (code, mark), n in pairs.items():
+                if mark >= 0:
+                    counts.setdefault(self._course_ids[code], [0] * 101)[mark] += n
+            self._histogram = {course_id: MarksHistogram(c) for course_id, c in counts.items()}
+        return self._histogram
+
+    def _marks_histogram(self, course_id=None):
+        histograms = self._histograms()
+        if course_id:
+            return histograms.get(course_id) or MarksHistogram()
+        return MarksHistogram.merged(histograms.values())
+
+    get_statistics = StudentManager.get_statistics
+    percentile = StudentManager.percentile
+
+    @read_locked
+    def course_statistics(self):
+        """{course_id: (count, average, median)} for every course"""
+        return {course_id: (h.count, h.average(), h.median())
+                for course_id, h in sorted(self._histograms().items())}
+
+
+class SQLiteStudentManager:
+    """
+    StudentManager API over the students table of a SQLiteStorage.
+
+    Nothing is held in memory: lookups use the primary key, course and
+    marks queries use the (course_id, marks) and (marks, email) indexes, and
+    counts, averages, medians and percentiles are computed by SQLite. Every
+    change is a single-row transaction; batch() makes the whole block one.
+    """
+    ORDER_BY = {
+        'email': ['email_address'],
+        'marks': ['marks', 'email_address'],
+        'name': ['last_name', 'first_name', 'email_address'],
+    }
+    SELECT = f"SELECT {', '.join(STUDENT_FIELDS)} FROM students"
+
+    validate_email = StudentManager.validate_email
+    validate_marks = StudentManager.validate_marks
+    _validate_student = StudentManager._validate_student
+    _validated_imports = StudentManager._validated_imports
+    iter_chunks = StudentManager.iter_chunks
+
+    def __init__(self, storage):
+        self.storage = storage
+        self.db = storage.connection
+        self.lock = ReadWriteLock()
+        self._sort_order = None   # (by, ascending) selected by sort_students
+        print(f"✓ Loaded {len(self)} students from {storage.path}")
 
-    def save_to_csv(self):
-        """Save students to CSV file"""
-        try:
-            with open(self.csv_file, 'w', newline='') as file:
-                fieldnames = ['email_address', 'first_name', 'last_name', 'course_id', 'grade', 'marks']
-                writer = csv.DictWriter(file, fieldnames=fieldnames)
-                writer.writeheader()
-                for student in self.students:
-                    writer.writerow(student.to_dict())
-        except Exception as e:
-            print(f"Error saving students: {e}")
-    
-    def validate_email(self, email):
-        # Check if email has @ and a dot after @
-        if '@' not in email:
-            return False
-        parts = email.split('@')
-        if len(parts) != 2:
-            return False
-        if '.' not in parts[1]:
-            return False
-        if len(parts[0]) == 0 or len(parts[1]) == 0:
-            return False
-        return True
-    
-    def validate_marks(self, marks):
-        """Validate marks range"""
-        return 0 <= marks <= 100
-    
+    @read_locked
+    def __len__(self):
+        return self.storage.count('students')
+
+    def _order_by(self, by, ascending=True):
+        return ', '.join(self.ORDER_BY[by] if ascending else
+                         [column + ' DESC' for column in self.ORDER_BY[by]])
+
+    def _where(self, course_id):
+        return ("WHERE course_id = ?", (course_id,)) if course_id else ("", ())
+
+    def _fetch(self, sql, params=()):
+        """Yield Students from a SELECT, fetching in pages"""
+        cursor = self.db.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(1000)
+            if not rows:
+                return
+            for row in rows:
+                yield Student(*row)
+
+    def _exists(self, email_address):
+        return self.db.execute("SELECT 1 FROM students WHERE email_address = ?",
+                               (email_address,)).fetchone() is not None
+
+    _contains = _exists
+
+    @property
+    @read_locked
+    def students(self):
+        """List of students in current order (insertion order or last sort)"""
+        return list(self.iter_students())
+
+    @students.setter
+    @write_locked
+    def students(self, students):
+        with self.storage.transaction() as db:
+            db.execute("DELETE FROM students")
+            db.executemany("INSERT OR IGNORE INTO students VALUES (?, ?, ?, ?, ?, ?)",
+                           ((s.email_address, s.first_name, s.last_name, s.course_id, s.grade, s.marks)
+                            for s in students))
+
+    def iter_students(self):
+        """Iterate over students in the order picked by sort_students"""
+        order = "rowid" if self._sort_order is None else self._order_by(*self._sort_order)
+        return self._fetch(f"{self.SELECT} ORDER BY {order}")
+
+    @contextmanager
+    def batch(self):
+        """Run the block as one transaction, rolled back on exception"""
+        with self.lock.writing(), self.storage.transaction():
+            yield self
+
+    def compact(self):
+        """Nothing to fold: every change is already in the database"""
+
+    @write_locked
     def add_student(self, student):
         """Add new student with validation"""
-        # Validation
-        if not student.email_address or not self.validate_email(student.email_address):
-            print("Invalid email address format!")
-            return False
-        
-        if not student.first_name or not student.last_name:
-            print("First name and last name are required!")
-            return False
-        
-        if not self.validate_marks(student.marks):
-            print("Marks must be between 0 and 100!")
+        if not self._validate_student(student):
             return False
-        
-        if any(s.email_address == student.email_address for s in self.students):
-            print(f"Student with email {student.email_address} already exists!")
-            return False
-        
-        self.students.append(student)
-        self.save_to_csv()
+
+        with self.storage.transaction() as db:
+            if self._exists(student.email_address):
+                print(f"Student with email {student.email_address} already exists!")
+                return False
+            db.execute("INSERT INTO students VALUES (?, ?, ?, ?, ?, ?)",
+                       (student.email_address, student.first_name, student.last_name,
+                        student.course_id, student.grade, student.marks))
         print(f"Student {student.first_name} {student.last_name} added successfully!")
-        return True             
+        return True
+
+    @write_locked
+    def import_students(self, source, grade_manager=None):
+        """Add many students in one transaction; see StudentManager.import_students"""
+        start_time = time.time()
+        report = ImportReport()
+        with self.storage.transaction() as db:
+            report.accepted = list(self._validated_imports(source, grade_manager, report))
+            db.executemany("INSERT INTO students VALUES (?, ?, ?, ?, ?, ?)",
+                           ((s.email_address, s.first_name, s.last_name, s.course_id, s.grade, s.marks)
+                            for s in report.accepted))
+        report.elapsed = time.time() - start_time
+        print(report.summary())
+        return report
 
+    @write_locked
     def delete_student(self, email_address):
         """Delete student by email"""
-        initial_count = len(self.students)
-        self.students = [s for s in self.students if s.email_address != email_address]
-        
-        if len(self.students) < initial_count:
-            self.save_to_csv()
+        with self.storage.transaction() as db:
+            deleted = db.execute("DELETE FROM students WHERE email_address = ?",
+                                 (email_address,)).rowcount
+        if deleted:
             print(f"Student with email {email_address} deleted successfully!")
             return True
-        else:
-            print(f"Student with email {email_address} not found!")
-            return False
-    
+        print(f"Student with email {email_address} not found!")
+        return False
+
+    @write_locked
     def update_student(self, email_address, **kwargs):
         """Update student details"""
-        for student in self.students:
-            if student.email_address == email_address:
-                # Validate marks if being updated
-                if 'marks' in kwargs:
-                    if not self.validate_marks(kwargs['marks']):
-                        print("Marks must be between 0 and 100!")
-                        return False
-                
-                for key, value in kwargs.items():
-                    if hasattr(student, key):
-                        setattr(student, key, value)
-                self.save_to_csv()
-                print(f"Student {email_address} updated successfully!")
-                return True
+        if 'marks' in kwargs and not self.validate_marks(kwargs['marks']):
+            print("Marks must be a whole number between 0 and 100!")
+            return False
 
-        print(f"Student with email {email_address} not found!")
-        return False
-    
+        columns = [key for key in kwargs if key in STUDENT_FIELDS[1:]]
+        with self.storage.transaction() as db:
+            if columns:
+                found = db.execute(
+                    f"UPDATE students SET {', '.join(c + ' = ?' for c in columns)} WHERE email_address = ?",
+                    [kwargs[c] for c in columns] + [email_address]).rowcount
+            else:
+                found = self._exists(email_address)
+        if not found:
+            print(f"Student with email {email_address} not found!")
+            return False
+        print(f"Student {email_address} updated successfully!")
+        return True
+
+    @read_locked
     def search_student(self, email_address):
         """Search for a student by email and measure performance"""
         start_time = time.time()
-        result = None
-        
-        for student in self.students:
-            if student.email_address == email_address:
-                result = student
-                break
-        
+        result = next(self._fetch(f"{self.SELECT} WHERE email_address = ?", (email_address,)), None)
         elapsed_time = time.time() - start_time
-        
+
         if result:
             print("\n" + "="*80)
             result.display_record()
             print("="*80)
         else:
             print(f"Student with email {email_address} not found!")
-        
+
         print(f"Search completed in {elapsed_time:.6f} seconds")
         return result, elapsed_time
-    
+
+    @read_locked
+    def search_by_name(self, query, limit=20):
+        """
+        Up to limit students whose first or last name starts with every word
+        of query, case-insensitively (SQLite LIKE), ordered by name.
+        """
+        terms = query.lower().split()
+        if not terms or limit <= 0:
+            return []
+        where = " AND ".join(["(first_name LIKE ? ESCAPE '\\' OR last_name LIKE ? ESCAPE '\\')"] * len(terms))
+        patterns = [term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%' for term in terms]
+        params = [pattern for pattern in patterns for _ in range(2)]
+        return list(self._fetch(f"{self.SELECT} WHERE {where} "
+                                f"ORDER BY last_name, first_name, email_address LIMIT ?", (*params, limit)))
+
+    @write_locked
     def sort_students(self, by='email', ascending=True):
         """Sort students by email, marks, or name"""
         start_time = time.time()
-        
-        if by == 'email':
-            self.students.sort(key=lambda s: s.email_address, reverse=not ascending)
-        elif by == 'marks':
-            self.students.sort(key=lambda s: s.marks, reverse=not ascending)
-        elif by == 'name':
-            self.students.sort(key=lambda s: (s.last_name, s.first_name), reverse=not ascending)
-        else:
+
+        if by not in self.ORDER_BY:
             print("Invalid sort option!")
             return 0
-        
+
+        # every order is backed by an index, so there is nothing to sort up front
+        self._sort_order = (by, ascending)
+
         elapsed_time = time.time() - start_time
         print(f"Students sorted by {by} ({'ascending' if ascending else 'descending'})")
         print(f"Sort completed in {elapsed_time:.6f} seconds")
         return elapsed_time
-    
-    def display_all_students(self):
-        """Display all students"""
-        if not self.students:
+
+    @read_locked
+    def students_slice(self, start, stop):
+        """Students start..stop-1 in the order picked by sort_students"""
+        order = "rowid" if self._sort_order is None else self._order_by(*self._sort_order)
+        return list(self._fetch(f"{self.SELECT} ORDER BY {order} LIMIT ? OFFSET ?",
+                                (max(0, stop - start), start)))
+
+    def display_all_students(self, page_size=PAGE_SIZE, interactive=None):
+        """Display all students a page at a time"""
+        total = len(self)
+        if not total:
             print("No students found!")
             return
-        
-        print(f"\n{'='*80}")
-        print(f"Total Students: {len(self.students)}")
-        print(f"{'='*80}")
-        for student in self.students:
-            student.display_record()
-        print(f"{'='*80}")
-    
+        Pager("Students", total, self.students_slice, page_size, interactive).show()
+
+    def top_k(self, by='marks', k=10):
+        """The k students with the highest key for by, highest first"""
+        return self._extreme_k(by, k, ascending=False)
+
+    def bottom_k(self, by='marks', k=10):
+        """The k students with the lowest key for by, lowest first"""
+        return self._extreme_k(by, k, ascending=True)
+
+    @read_locked
+    def _extreme_k(self, by, k, ascending):
+        if by not in self.ORDER_BY:
+            print("Invalid sort option!")
+            return []
+        if k <= 0:
+            return []
+        return list(self._fetch(f"{self.SELECT} ORDER BY {self._order_by(by, ascending)} LIMIT ?", (k,)))
+
+    @read_locked
+    def students_in_course(self, course_id):
+        """Students enrolled in course_id, in roster order"""
+        return list(self._fetch(f"{self.SELECT} WHERE course_id = ? ORDER BY rowid", (course_id,)))
+
+    @read_locked
+    def students_in_marks_range(self, lo, hi, course_id=None):
+        """Students with lo <= marks <= hi, in one course or all, lowest marks first"""
+        if course_id:
+            return list(self._fetch(f"{self.SELECT} WHERE course_id = ? AND marks BETWEEN ? AND ? "
+                                    f"ORDER BY marks, email_address", (course_id, lo, hi)))
+        return list(self._fetch(f"{self.SELECT} WHERE marks BETWEEN ? AND ? ORDER BY marks, email_address",
+                                (lo, hi)))
+
+    @read_locked
+    def grade_counts(self, course_id=None):
+        """Number of students per grade letter, for one course or overall"""
+        where, params = self._where(course_id)
+        return Counter(dict(self.db.execute(
+            f"SELECT grade, COUNT(*) FROM students {where} GROUP BY grade", params)))
+
+    @write_locked
+    def regrade(self, grade_table):
+        """Set every grade to grade_table[marks] in one UPDATE; returns the number changed"""
+        with self.storage.transaction() as db:
+            db.execute("CREATE TEMP TABLE IF NOT EXISTS grade_table (marks INTEGER PRIMARY KEY, grade TEXT)")
+            db.execute("DELETE FROM temp.grade_table")
+            db.executemany("INSERT INTO temp.grade_table VALUES (?, ?)", enumerate(grade_table))
+            return db.execute("""
+                UPDATE students SET grade = (SELECT g.grade FROM temp.grade_table g WHERE g.marks = students.marks)
+                WHERE grade IS NOT (SELECT g.grade FROM temp.grade_table g WHERE g.marks = students.marks)
+            """).rowcount
+
+    def _count(self, course_id):
+        where, params = self._where(course_id)
+        return self.db.execute(f"SELECT COUNT(*) FROM students {where}", params).fetchone()[0]
+
+    def _marks_at(self, course_id, offset, limit=1):
+        """Marks at 0-based positions offset.. in ascending order, read off the marks indexes"""
+        where, params = self._where(course_id)
+        return [marks for (marks,) in self.db.execute(
+            f"SELECT marks FROM students {where} ORDER BY marks LIMIT ? OFFSET ?", params + (limit, offset))]
+
+    def _median(self, course_id, count):
+        if count % 2 == 1:
+            return self._marks_at(course_id, count // 2)[0]
+        return sum(self._marks_at(course_id, count // 2 - 1, 2)) / 2
+
+    @read_locked
     def get_statistics(self, course_id=None):
         """Get average and median marks for course or overall"""
-        students_to_analyze = self.students
-        
-        if course_id:
-            students_to_analyze = [s for s in self.students if s.course_id == course_id]
-        
-        if not students_to_analyze:
+        where, params = self._where(course_id)
+        count, average = self.db.execute(
+            f"SELECT COUNT(*), AVG(marks) FROM students {where}", params).fetchone()
+        if not count:
             print("No students found for statistics!")
             return None, None
-        
-        marks_list = [s.marks for s in students_to_analyze]
-        average = sum(marks_list) / len(marks_list)
-        
-        sorted_marks = sorted(marks_list)
-        n = len(sorted_marks)
-        median = sorted_marks[n//2] if n % 2 == 1 else (sorted_marks[n//2-1] + sorted_marks[n//2]) / 2
-        
-        return average, median
+        return average, self._median(course_id, count)
+
+    @read_locked
+    def percentile(self, p, course_id=None):
+        """Nearest-rank p-th percentile (0-100) of marks, or None"""
+        count = self._count(course_id)
+        if not count:
+            return None
+        rank = -(-p * count // 100) - 1
+        return self._marks_at(course_id, max(0, min(count - 1, rank)))[0]
+
+    @read_locked
+    def course_statistics(self):
+        """{course_id: (count, average, median)} for every course"""
+        rows = self.db.execute("SELECT course_id, COUNT(*), AVG(marks) FROM students "
+                               "GROUP BY course_id ORDER BY course_id").fetchall()
+        return {course_id: (count, average, self._median(course_id, count))
+                for course_id, count, average in rows}
 
 
-class CourseManager:
+class CourseManager(PersistentManager):
     """Manages all course operations"""
-    def __init__(self, csv_file='courses.csv'):
-        self.csv_file = csv_file
+    records_attr = 'courses'
+    table = 'courses'
+
+    def __init__(self, csv_file='courses.csv', journal=False, storage=None):
+        self._init_persistence(csv_file, journal, storage)
         self.courses = []
-        self.load_from_csv()
+        self._load()
     
+    @write_locked
     def load_from_csv(self):
         """Load courses from CSV file"""
         if not os.path.exists(self.csv_file):
@@ -323,24 +2927,38 @@ class CourseManager:
             with open(self.csv_file, 'r', newline='') as file:
                 reader = csv.DictReader(file)
                 for row in reader:
-                    course = Course(row['course_id'], row['course_name'], row['description'])
-                    self.courses.append(course)
+                    self.courses.append(self._record_from_row(row))
             print(f"Loaded {len(self.courses)} courses from {self.csv_file}")
+            self._count_csv_bytes('load')
         except Exception as e:
             print(f"Error loading courses: {e}")
     
+    @read_locked
     def save_to_csv(self):
         """Save courses to CSV file"""
         try:
-            with open(self.csv_file, 'w', newline='') as file:
+            with atomic_write(self.csv_file) as file:
                 fieldnames = ['course_id', 'course_name', 'description']
                 writer = csv.DictWriter(file, fieldnames=fieldnames)
                 writer.writeheader()
                 for course in self.courses:
                     writer.writerow(course.to_dict())
+            self._count_csv_bytes('save')
         except Exception as e:
             print(f"Error saving courses: {e}")
+
+    def _key(self, course):
+        return course.course_id
+
+    def _record_from_row(self, row):
+        return Course(row['course_id'], row['course_name'], row['description'])
+
+    def _apply_change(self, op, key, course):
+        self.courses = [c for c in self.courses if c.course_id != key]
+        if op == 'put':
+            self.courses.append(course)
     
+    @write_locked
     def add_course(self, course):
         """Add new course"""
         if not course.course_id:
@@ -352,44 +2970,47 @@ class CourseManager:
             return False
         
         self.courses.append(course)
-        self.save_to_csv()
+        self._record_change('put', course.course_id, course)
         print(f"Course {course.course_name} added successfully!")
         return True
     
+    @write_locked
     def delete_course(self, course_id):
         """Delete course by ID"""
         initial_count = len(self.courses)
         self.courses = [c for c in self.courses if c.course_id != course_id]
         
         if len(self.courses) < initial_count:
-            self.save_to_csv()
+            self._record_change('delete', course_id)
             print(f"Course {course_id} deleted successfully!")
             return True
         else:
             print(f"Course {course_id} not found!")
             return False
     
-    def display_all_courses(self):
-        """Display all courses"""
+    @read_locked
+    def courses_slice(self, start, stop):
+        return self.courses[start:stop]
+
+    def display_all_courses(self, page_size=PAGE_SIZE, interactive=None):
+        """Display all courses a page at a time"""
         if not self.courses:
             print("No courses found!")
             return
-        
-        print(f"\n{'='*80}")
-        print(f"Total Courses: {len(self.courses)}")
-        print(f"{'='*80}")
-        for course in self.courses:
-            course.display_course()
-        print(f"{'='*80}")
+        Pager("Courses", len(self.courses), self.courses_slice, page_size, interactive).show()
 
 
-class ProfessorManager:
+class ProfessorManager(PersistentManager):
     """Manages all professor operations"""
-    def __init__(self, csv_file='professors.csv'):
-        self.csv_file = csv_file
+    records_attr = 'professors'
+    table = 'professors'
+
+    def __init__(self, csv_file='professors.csv', journal=False, storage=None):
+        self._init_persistence(csv_file, journal, storage)
         self.professors = []
-        self.load_from_csv()
+        self._load()
     
+    @write_locked
     def load_from_csv(self):
         """Load professors from CSV file"""
         if not os.path.exists(self.csv_file):
@@ -399,29 +3020,43 @@ class ProfessorManager:
             with open(self.csv_file, 'r', newline='') as file:
                 reader = csv.DictReader(file)
                 for row in reader:
-                    professor = Professor(
-                        row['professor_id'],
-                        row['professor_name'],
-                        row['rank'],
-                        row['course_id']
-                    )
-                    self.professors.append(professor)
+                    self.professors.append(self._record_from_row(row))
             print(f"Loaded {len(self.professors)} professors from {self.csv_file}")
+            self._count_csv_bytes('load')
         except Exception as e:
             print(f"Error loading professors: {e}")
     
+    @read_locked
     def save_to_csv(self):
         """Save professors to CSV file"""
         try:
-            with open(self.csv_file, 'w', newline='') as file:
+            with atomic_write(self.csv_file) as file:
                 fieldnames = ['professor_id', 'professor_name', 'rank', 'course_id']
                 writer = csv.DictWriter(file, fieldnames=fieldnames)
                 writer.writeheader()
                 for professor in self.professors:
                     writer.writerow(professor.to_dict())
+            self._count_csv_bytes('save')
         except Exception as e:
             print(f"Error saving professors: {e}")
 
+    def _key(self, professor):
+        return professor.professor_id
+
+    def _record_from_row(self, row):
+        return Professor(
+            row['professor_id'],
+            row['professor_name'],
+            row['rank'],
+            row['course_id']
+        )
+
+    def _apply_change(self, op, key, professor):
+        self.professors = [p for p in self.professors if p.professor_id != key]
+        if op == 'put':
+            self.professors.append(professor)
+
+    @write_locked
     def add_professor(self, professor):
         """Add new professor"""
         if not professor.professor_id:
@@ -433,44 +3068,72 @@ class ProfessorManager:
             return False
         
         self.professors.append(professor)
-        self.save_to_csv()
+        self._record_change('put', professor.professor_id, professor)
         print(f"Professor {professor.professor_name} added successfully!")
         return True
     
+    @write_locked
     def delete_professor(self, professor_id):
         """Delete professor by ID"""
         initial_count = len(self.professors)
         self.professors = [p for p in self.professors if p.professor_id != professor_id]
         
         if len(self.professors) < initial_count:
-            self.save_to_csv()
+            self._record_change('delete', professor_id)
             print(f"Professor {professor_id} deleted successfully!")
             return True
         else:
             print(f"Professor {professor_id} not found!")
             return False
 
-    def display_all_professors(self):
-        """Display all professors"""
+    @read_locked
+    def professors_slice(self, start, stop):
+        return self.professors[start:stop]
+
+    def display_all_professors(self, page_size=PAGE_SIZE, interactive=None):
+        """Display all professors a page at a time"""
         if not self.professors:
             print("No professors found!")
             return
-        
-        print(f"\n{'='*80}")
-        print(f"Total Professors: {len(self.professors)}")
-        print(f"{'='*80}")
-        for professor in self.professors:
-            professor.display_professor()
-        print(f"{'='*80}")
+        Pager("Professors", len(self.professors), self.professors_slice, page_size, interactive).show()
 
 
-class GradeManager:
+class GradeManager(PersistentManager):
     """Manages grading scale and grade calculations"""
-    def __init__(self, csv_file='grades.csv'):
-        self.csv_file = csv_file
+    records_attr = 'grades'
+    table = 'grades'
+
+    def __init__(self, csv_file='grades.csv', journal=False, storage=None):
+        self._init_persistence(csv_file, journal, storage)
         self.grades = []
         self.initialize_default_grades()
-        self.load_from_csv()
+        self._load()
+
+    def _load(self):
+        if self.storage is not None and not self.storage.count(self.table):
+            # empty database: store the default scale, as load_from_csv does for a missing CSV
+            self._persist_changes([('put', g.grade_id, g) for g in self.grades])
+            return
+        super()._load()
+
+    @property
+    def grades(self):
+        return self._grades
+
+    @grades.setter
+    def grades(self, grades):
+        self._grades = grades
+        self._rebuild_grade_table()
+
+    def _rebuild_grade_table(self):
+        """Precompute the grade letter for every mark 0-100"""
+        self._grade_table = [self._scan_grades(marks) for marks in range(101)]
+
+    def _scan_grades(self, marks):
+        for grade in self._grades:
+            if grade.is_in_range(marks):
+                return grade.grade_letter
+        return "F"
 
     def initialize_default_grades(self):
         """Initialize standard grading scale"""
@@ -489,6 +3152,7 @@ class GradeManager:
         ]
         self.grades = default_grades
     
+    @write_locked
     def load_from_csv(self):
         """Load grades from CSV if exists"""
         if not os.path.exists(self.csv_file):
@@ -498,39 +3162,61 @@ class GradeManager:
         try:
             with open(self.csv_file, 'r', newline='') as file:
                 reader = csv.DictReader(file)
-                self.grades = []
-                for row in reader:
-                    grade = Grade(
-                        row['grade_id'],
-                        row['grade_letter'],
-                        int(row['min_marks']),
-                        int(row['max_marks'])
-                    )
-                    self.grades.append(grade)
+                self.grades = [self._record_from_row(row) for row in reader]
             print(f"Loaded {len(self.grades)} grade definitions from {self.csv_file}")
+            self._count_csv_bytes('load')
         except Exception as e:
             print(f"Error loading grades: {e}")
             self.initialize_default_grades()
 
+    @read_locked
     def save_to_csv(self):
         """Save grades to CSV"""
         try:
-            with open(self.csv_file, 'w', newline='') as file:
+            with atomic_write(self.csv_file) as file:
                 fieldnames = ['grade_id', 'grade_letter', 'min_marks', 'max_marks']
                 writer = csv.DictWriter(file, fieldnames=fieldnames)
                 writer.writeheader()
                 for grade in self.grades:
                     writer.writerow(grade.to_dict())
+            self._count_csv_bytes('save')
         except Exception as e:
             print(f"Error saving grades: {e}")
+
+    def _key(self, grade):
+        return grade.grade_id
+
+    def _record_from_row(self, row):
+        return Grade(
+            row['grade_id'],
+            row['grade_letter'],
+            int(row['min_marks']),
+            int(row['max_marks'])
+        )
+
+    def _apply_change(self, op, key, grade):
+        self.grades = [g for g in self.grades if g.grade_id != key]
+        if op == 'put':
+            self.grades.append(grade)
+            self.grades.sort(key=lambda g: g.min_marks, reverse=True)
+            self._rebuild_grade_table()
     
     def get_grade_for_marks(self, marks):
         """Get grade letter for given marks"""
-        for grade in self.grades:
-            if grade.is_in_range(marks):
-                return grade.grade_letter
-        return "F"
+        if type(marks) is int and 0 <= marks <= 100:
+            return self._grade_table[marks]
+        return self._scan_grades(marks)
+
+    @read_locked
+    def regrade_all(self, student_manager):
+        """Re-grade every student against the current scale, persisting once"""
+        start_time = time.time()
+        changed = student_manager.regrade(self._grade_table)
+        elapsed_time = time.time() - start_time
+        print(f"Regraded {changed} student(s) in {elapsed_time:.3f} seconds")
+        return changed
     
+    @write_locked
     def add_grade(self, grade):
         """Add new grade definition"""
         if any(g.grade_id == grade.grade_id for g in self.grades):
@@ -539,23 +3225,26 @@ class GradeManager:
 
         self.grades.append(grade)
         self.grades.sort(key=lambda g: g.min_marks, reverse=True)
-        self.save_to_csv()
+        self._rebuild_grade_table()
+        self._record_change('put', grade.grade_id, grade)
         print(f"Grade {grade.grade_letter} added successfully!")
         return True
     
+    @write_locked
     def delete_grade(self, grade_id):
         """Delete grade by ID"""
         initial_count = len(self.grades)
         self.grades = [g for g in self.grades if g.grade_id != grade_id]
         
         if len(self.grades) < initial_count:
-            self.save_to_csv()
+            self._record_change('delete', grade_id)
             print(f"Grade {grade_id} deleted!")
             return True
         else:
             print(f"Grade {grade_id} not found!")
             return False
         
+    @write_locked
     def modify_grade(self, grade_id, **kwargs):
         """Modify grade details"""
         for grade in self.grades:
@@ -564,13 +3253,15 @@ class GradeManager:
                     if hasattr(grade, key):
                         setattr(grade, key, value)
                 self.grades.sort(key=lambda g: g.min_marks, reverse=True)
-                self.save_to_csv()
+                self._rebuild_grade_table()
+                self._record_change('put', grade_id, grade)
                 print(f"✓ Grade {grade_id} modified successfully!")
                 return True
         
         print(f"Grade {grade_id} not found!")
         return False
 
+    @read_locked
     def display_all_grades(self):
         """Display all grade definitions"""
         if not self.grades:
@@ -584,6 +3275,7 @@ class GradeManager:
             print(f"{grade.grade_letter:5s} : {grade.min_marks:3d} - {grade.max_marks:3d} marks")
         print(f"{'='*60}")
     
+    @read_locked
     def display_grade_report(self):
         """Display detailed grade report"""
         print("\n" + "="*60)
@@ -594,13 +3286,17 @@ class GradeManager:
         print("="*60)
 
 
-class LoginManager:
+class LoginManager(PersistentManager):
     """Manages user authentication"""
-    def __init__(self, csv_file='login.csv'):
-        self.csv_file = csv_file
+    records_attr = 'users'
+    table = 'users'
+
+    def __init__(self, csv_file='login.csv', journal=False, storage=None):
+        self._init_persistence(csv_file, journal, storage)
         self.users = []
-        self.load_from_csv()
+        self._load()
     
+    @write_locked
     def load_from_csv(self):
         """Load users from CSV file"""
         if not os.path.exists(self.csv_file):
@@ -610,24 +3306,38 @@ class LoginManager:
             with open(self.csv_file, 'r', newline='') as file:
                 reader = csv.DictReader(file)
                 for row in reader:
-                    user = LoginUser(row['user_id'], row['password'], row['role'])
-                    self.users.append(user)
+                    self.users.append(self._record_from_row(row))
             print(f"Loaded {len(self.users)} users from {self.csv_file}")
+            self._count_csv_bytes('load')
         except Exception as e:
             print(f"Error loading users: {e}")
     
+    @read_locked
     def save_to_csv(self):
         """Save users to CSV file"""
         try:
-            with open(self.csv_file, 'w', newline='') as file:
+            with atomic_write(self.csv_file) as file:
                 fieldnames = ['user_id', 'password', 'role']
                 writer = csv.DictWriter(file, fieldnames=fieldnames)
                 writer.writeheader()
                 for user in self.users:
                     writer.writerow(user.to_dict())
+            self._count_csv_bytes('save')
         except Exception as e:
             print(f"Error saving users: {e}")
 
+    def _key(self, user):
+        return user.email_id
+
+    def _record_from_row(self, row):
+        return LoginUser(row['user_id'], row['password'], row['role'])
+
+    def _apply_change(self, op, key, user):
+        self.users = [u for u in self.users if u.email_id != key]
+        if op == 'put':
+            self.users.append(user)
+
+    @write_locked
     def register_user(self, email_id, password, role):
         """Register a new user"""
         if any(u.email_id == email_id for u in self.users):
@@ -641,11 +3351,12 @@ class LoginManager:
         # Create actual user with encrypted password
         user = LoginUser(email_id, encrypted_password, role)
         self.users.append(user)
-        self.save_to_csv()
+        self._record_change('put', email_id, user)
         print(f"User {email_id} registered successfully!")
         print(f"Password encrypted with SHA-256")
         return True
     
+    @read_locked
     def login(self, email_id, password):
         """Login user by verifying password"""
         for user in self.users:
@@ -660,13 +3371,14 @@ class LoginManager:
         print(f"User {email_id} not found!")
         return False, None
     
+    @write_locked
     def change_password(self, email_id, old_password, new_password):
         """Change user password"""
         for user in self.users:
             if user.email_id == email_id:
                 if user.verify_password(old_password, user.password):
                     user.password = user.encrypt_password(new_password)
-                    self.save_to_csv()
+                    self._record_change('put', email_id, user)
                     print("Password changed successfully!")
                     print("New password encrypted with SHA-256")
                     return True
@@ -678,19 +3390,139 @@ class LoginManager:
         return False
 
 
+# Export
+EXPORT_FORMATS = ('csv', 'jsonl')
+
+
+def _export_format(path, fmt=None):
+    """Explicit fmt, else csv or jsonl from the file name (ignoring a .gz/.xz/.lzma suffix)"""
+    name = os.fspath(path).lower()
+    for suffix in ('.gz', '.xz', '.lzma'):
+        if name.endswith(suffix):
+            name = name[:-len(suffix)]
+    fmt = fmt or ('jsonl' if name.endswith(('.jsonl', '.json')) else 'csv')
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"unknown export format {fmt!r}, expected one of {EXPORT_FORMATS}")
+    return fmt
+
+
+def open_export(path):
+    """Buffered text writer for path, gzip- or lzma-compressed when it ends in .gz or .xz/.lzma"""
+    name = os.fspath(path).lower()
+    if name.endswith('.gz'):
+        compressed = gzip.GzipFile(path, 'wb', compresslevel=6)
+    elif name.endswith(('.xz', '.lzma')):
+        # preset 1 keeps the encoder to a few MB (the default needs ~100 MB) at a similar ratio for CSV
+        compressed = lzma.LZMAFile(path, 'wb', format=lzma.FORMAT_XZ if name.endswith('.xz') else lzma.FORMAT_ALONE,
+                                   preset=1)
+    else:
+        return open(path, 'w', newline='', buffering=1024 * 1024)
+    # hand the compressor 1 MB blocks rather than one small write per row
+    return io.TextIOWrapper(io.BufferedWriter(compressed, 1024 * 1024), encoding='utf-8', newline='')
+
+
+def write_records(path, fieldnames, rows, fmt=None):
+    """
+    Stream rows (sequences matching fieldnames) to path as CSV or JSON
+    Lines, one row at a time through a buffered writer; returns the count
+    """
+    fmt = _export_format(path, fmt)
+    count = 0
+    with open_export(path) as file:
+        if fmt == 'csv':
+            writer = csv.writer(file)
+            writer.writerow(fieldnames)
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+        else:
+            for row in rows:
+                file.write(json.dumps(dict(zip(fieldnames, row))) + "\n")
+                count += 1
+    return count
+
+
+def export_students(manager, path, fmt=None, course_id=None, min_marks=0, max_marks=100):
+    """Stream students, optionally one course and/or a marks range, to path; returns the number written"""
+    start_time = time.time()
+    with manager.lock.reading():
+        rows = ((s.email_address, s.first_name, s.last_name, s.course_id, s.grade, s.marks)
+                for s in manager.iter_students()
+                if (not course_id or s.course_id == course_id) and min_marks <= s.marks <= max_marks)
+        count = write_records(path, STUDENT_FIELDS, rows, fmt)
+    print(f"Exported {count} students to {path} in {time.time() - start_time:.3f} seconds")
+    return count
+
+
+def export_course_statistics(manager, path, fmt=None):
+    """Write count, average and median marks per course to path; returns the number of courses"""
+    rows = ((course_id, count, round(average, 2), median)
+            for course_id, (count, average, median) in manager.course_statistics().items())
+    count = write_records(path, ['course_id', 'count', 'average', 'median'], rows, fmt)
+    print(f"Exported statistics for {count} courses to {path}")
+    return count
+
+
+def export_grade_distribution(manager, grade_manager, path, fmt=None, course_id=None):
+    """Write students per grade of the scale, for one course or overall, to path; returns the row count"""
+    counts = manager.grade_counts(course_id)
+    total = sum(counts.values())
+    rows = ((course_id or '', g.grade_letter, g.min_marks, g.max_marks, counts.get(g.grade_letter, 0),
+             round(counts.get(g.grade_letter, 0) * 100 / total, 2) if total else 0.0)
+            for g in sorted(grade_manager.grades, key=lambda g: g.min_marks, reverse=True))
+    count = write_records(path, ['course_id', 'grade', 'min_marks', 'max_marks', 'students', 'percentage'],
+                          rows, fmt)
+    print(f"Exported the grade distribution of {total} students to {path}")
+    return count
+
+
 # MAIN APPLICATION
 
 class CheckMyGradeApp:
-    """Main application class"""
-    def __init__(self):
-        self.student_manager = StudentManager()
-        self.course_manager = CourseManager()
-        self.professor_manager = ProfessorManager()
-        self.grade_manager = GradeManager()
-        self.login_manager = LoginManager()
+    """Main application class; data_dir holds the CSV files"""
+    def __init__(self, journal=False, columnar=False, lazy=False, database=None, snapshot=False,
+                 profile_dir=None, data_dir='.'):
+        self.profiler = Profiler(profile_dir) if profile_dir else None
+        self.storage = None
+
+        def path(name):
+            return os.path.join(data_dir, name)
+        if database:
+            with self._profiled("load database"):
+                self.storage = SQLiteStorage(database)
+                if not any(self.storage.count(table) for table in SQLiteStorage.TABLES):
+                    # first run against a new database: bring over the existing CSVs
+                    self.storage.import_all(data_dir)
+            with self._profiled("load students"):
+                self.student_manager = SQLiteStudentManager(self.storage)
+        elif columnar:
+            with self._profiled("load students"):
+                self.student_manager = StudentStore(path('students.csv'), journal=journal)
+        else:
+            with self._profiled("load students"):
+                self.student_manager = StudentManager(path('students.csv'), journal=journal, lazy=lazy,
+                                                      snapshot=snapshot)
+        with self._profiled("load courses"):
+            self.course_manager = CourseManager(path('courses.csv'), journal=journal, storage=self.storage)
+        with self._profiled("load professors"):
+            self.professor_manager = ProfessorManager(path('professors.csv'), journal=journal,
+                                                      storage=self.storage)
+        with self._profiled("load grades"):
+            self.grade_manager = GradeManager(path('grades.csv'), journal=journal, storage=self.storage)
+        with self._profiled("load users"):
+            self.login_manager = LoginManager(path('login.csv'), journal=journal, storage=self.storage)
         self.current_user = None
         self.current_role = None
 
+    def _profiled(self, name):
+        """A profiling session for one action, or a no-op unless profiling is on"""
+        return self.profiler.session(name) if self.profiler else nullcontext()
+
+    def managers(self):
+        """All managers owned by the app"""
+        return [self.student_manager, self.course_manager, self.professor_manager,
+                self.grade_manager, self.login_manager]
+
     def run(self):
         """Main application loop"""
         print("\n" + "="*60)
@@ -738,62 +3570,67 @@ class CheckMyGradeApp:
 
             choice = input("\nEnter your choice (1-7): ").strip()
             
-            if choice == '1':
-                self.student_menu()
-            elif choice == '2':
-                email = input("Enter student email to delete: ").strip()
-                self.student_manager.delete_student(email)
+            with self._profiled(f"main menu {choice}"):
+                if choice == '1':
+                    self.student_menu()
+                elif choice == '2':
+                    email = input("Enter student email to delete: ").strip()
+                    self.student_manager.delete_student(email)
             
-            elif choice == '3':
-                email = input("Enter student email to update: ").strip()
-                print("Enter new values (press Enter to skip):")
-                updates = {}
+                elif choice == '3':
+                    email = input("Enter student email to update: ").strip()
+                    print("Enter new values (press Enter to skip):")
+                    updates = {}
                 
-                first_name = input("First name: ").strip()
-                if first_name:
-                    updates['first_name'] = first_name
+                    first_name = input("First name: ").strip()
+                    if first_name:
+                        updates['first_name'] = first_name
                 
-                last_name = input("Last name: ").strip()
-                if last_name:
-                    updates['last_name'] = last_name
+                    last_name = input("Last name: ").strip()
+                    if last_name:
+                        updates['last_name'] = last_name
                 
-                marks = input("Marks: ").strip()
-                if marks:
-                    try:
-                        marks_val = int(marks)
-                        updates['marks'] = marks_val
-                        updates['grade'] = self.grade_manager.get_grade_for_marks(marks_val)
-                    except ValueError:
-                        print("Invalid marks value!")
+                    marks = input("Marks: ").strip()
+                    if marks:
+                        try:
+                            marks_val = int(marks)
+                            updates['marks'] = marks_val
+                            updates['grade'] = self.grade_manager.get_grade_for_marks(marks_val)
+                        except ValueError:
+                            print("Invalid marks value!")
                 
-                if updates:
-                    self.student_manager.update_student(email, **updates)
+                    if updates:
+                        self.student_manager.update_student(email, **updates)
                         
-            elif choice == '4':
-                email = input("Enter student email to search: ").strip()
-                self.student_manager.search_student(email)
+                elif choice == '4':
+                    email = input("Enter student email to search: ").strip()
+                    self.student_manager.search_student(email)
             
-            elif choice == '5':
-                self.student_manager.display_all_students()
+                elif choice == '5':
+                    self.student_manager.display_all_students()
             
-            elif choice == '6':
-                print("\nSort by: 1) Email  2) Marks  3) Name")
-                sort_choice = input("Enter choice: ").strip()
-                order = input("Order (asc/desc): ").strip().lower()
+                elif choice == '6':
+                    print("\nSort by: 1) Email  2) Marks  3) Name")
+                    sort_choice = input("Enter choice: ").strip()
+                    order = input("Order (asc/desc): ").strip().lower()
                 
-                sort_by = 'email'
-                if sort_choice == '2':
-                    sort_by = 'marks'
-                elif sort_choice == '3':
-                    sort_by = 'name'
+                    sort_by = 'email'
+                    if sort_choice == '2':
+                        sort_by = 'marks'
+                    elif sort_choice == '3':
+                        sort_by = 'name'
                 
-                self.student_manager.sort_students(by=sort_by, ascending=(order == 'asc'))
-                self.student_manager.display_all_students()
+                    self.student_manager.sort_students(by=sort_by, ascending=(order == 'asc'))
+                    self.student_manager.display_all_students()
             
-            elif choice == '7':
-                break
-            else:
-                print("Invalid choice!")
+                elif choice == '7':
+                    break
+                else:
+                    print("Invalid choice!")
+
+        # fold any journaled changes back into the CSV files on exit
+        for manager in self.managers():
+            manager.compact()
     
     def student_menu(self):
         #Student management menu
@@ -807,40 +3644,68 @@ class CheckMyGradeApp:
             print("4. Search Student")
             print("5. Display All Students")
             print("6. Sort Students")
-            print("7. Back to Main Menu")
+            print("7. Import Students from CSV")
+            print("8. Search Students by Name")
+            print("9. Back to Main Menu")
             print("="*60)
 
-            choice = input("\nEnter your choice (1-7): ").strip()
+            choice = input("\nEnter your choice (1-9): ").strip()
 
-            if choice == '1':
-                try:
-                    email = input("Enter student email: ").strip()
-                    first_name = input("Enter first name: ").strip()
-                    last_name = input("Enter last name: ").strip()
-                    course_id = input("Enter course ID: ").strip()
-                    marks = int(input("Enter marks (0-100): ").strip())
-
-                    grade = self.grade_manager.get_grade_for_marks(marks)
-                    student = Student(email, first_name, last_name, course_id, grade, marks)
-                    self.student_manager.add_student(student)
-                except ValueError:
-                    print("Invalid marks! Please enter a number.")
-
-            elif choice == '2':
-                 self.course_menu()
-            elif choice == '3':
-                self.professor_menu()
-            elif choice == '4':
-                self.grade_menu()
-            elif choice == '5':
-                self.reports_menu()
-            elif choice == '6':
-                old_pass = input("Enter old password: ").strip()
-                new_pass = input("Enter new password: ").strip()
-                self.login_manager.change_password(self.current_user, old_pass, new_pass)
-            elif choice == '7':
-                print("Logging out... Goodbye!")
-                break
+            with self._profiled(f"student menu {choice}"):
+                if choice == '1':
+                    try:
+                        email = input("Enter student email: ").strip()
+                        first_name = input("Enter first name: ").strip()
+                        last_name = input("Enter last name: ").strip()
+                        course_id = input("Enter course ID: ").strip()
+                        marks = int(input("Enter marks (0-100): ").strip())
+
+                        grade = self.grade_manager.get_grade_for_marks(marks)
+                        student = Student(email, first_name, last_name, course_id, grade, marks)
+                        self.student_manager.add_student(student)
+                    except ValueError:
+                        print("Invalid marks! Please enter a number.")
+
+                elif choice == '2':
+                     self.course_menu()
+                elif choice == '3':
+                    self.professor_menu()
+                elif choice == '4':
+                    self.grade_menu()
+                elif choice == '5':
+                    self.reports_menu()
+                elif choice == '6':
+                    old_pass = input("Enter old password: ").strip()
+                    new_pass = input("Enter new password: ").strip()
+                    self.login_manager.change_password(self.current_user, old_pass, new_pass)
+                elif choice == '7':
+                    path = input("Enter CSV file to import: ").strip()
+                    try:
+                        report = self.student_manager.import_students(path, self.grade_manager)
+                    except OSError as e:
+                        print(f"Cannot read {path}: {e}")
+                        continue
+                    for row_number, row, reason in report.rejected[:20]:
+                        print(f"  row {row_number}: {row.get('email_address') or '?'} - {reason}")
+                    if len(report.rejected) > 20:
+                        print(f"  ... and {len(report.rejected) - 20} more")
+                elif choice == '8':
+                    query = input("Enter first and/or last name (or the start of them): ").strip()
+                    start_time = time.time()
+                    students = self.student_manager.search_by_name(query, limit=20)
+                    elapsed_time = time.time() - start_time
+                    if students:
+                        print("\n" + "="*80)
+                        for student in students:
+                            student.display_record()
+                        print("="*80)
+                        print(f"Showing {len(students)} match(es)" + (" (first 20)" if len(students) == 20 else ""))
+                    else:
+                        print(f"No students match {query!r}")
+                    print(f"Search completed in {elapsed_time:.6f} seconds")
+                elif choice == '9':
+                    print("Logging out... Goodbye!")
+                    break
 
     def course_menu(self):
         """Course management menu"""
@@ -856,26 +3721,27 @@ class CheckMyGradeApp:
             
             choice = input("\nEnter your choice (1-4): ").strip()
             
-            if choice == '1':
-                print("\n--- Add New Course ---")
-                course_id = input("Enter course ID: ").strip()
-                course_name = input("Enter course name: ").strip()
-                description = input("Enter description: ").strip()
+            with self._profiled(f"course menu {choice}"):
+                if choice == '1':
+                    print("\n--- Add New Course ---")
+                    course_id = input("Enter course ID: ").strip()
+                    course_name = input("Enter course name: ").strip()
+                    description = input("Enter description: ").strip()
                 
-                course = Course(course_id, course_name, description)
-                self.course_manager.add_course(course)
+                    course = Course(course_id, course_name, description)
+                    self.course_manager.add_course(course)
             
-            elif choice == '2':
-                course_id = input("Enter course ID to delete: ").strip()
-                self.course_manager.delete_course(course_id)
+                elif choice == '2':
+                    course_id = input("Enter course ID to delete: ").strip()
+                    self.course_manager.delete_course(course_id)
             
-            elif choice == '3':
-                self.course_manager.display_all_courses()
+                elif choice == '3':
+                    self.course_manager.display_all_courses()
             
-            elif choice == '4':
-                break
-            else:
-                print("Invalid choice!")
+                elif choice == '4':
+                    break
+                else:
+                    print("Invalid choice!")
     
     def professor_menu(self):
         """Professor management menu"""
@@ -891,27 +3757,28 @@ class CheckMyGradeApp:
             
             choice = input("\nEnter your choice (1-4): ").strip()
             
-            if choice == '1':
-                print("\n--- Add New Professor ---")
-                prof_id = input("Enter professor email: ").strip()
-                prof_name = input("Enter professor name: ").strip()
-                rank = input("Enter rank: ").strip()
-                course_id = input("Enter course ID: ").strip()
+            with self._profiled(f"professor menu {choice}"):
+                if choice == '1':
+                    print("\n--- Add New Professor ---")
+                    prof_id = input("Enter professor email: ").strip()
+                    prof_name = input("Enter professor name: ").strip()
+                    rank = input("Enter rank: ").strip()
+                    course_id = input("Enter course ID: ").strip()
                 
-                professor = Professor(prof_id, prof_name, rank, course_id)
-                self.professor_manager.add_professor(professor)
+                    professor = Professor(prof_id, prof_name, rank, course_id)
+                    self.professor_manager.add_professor(professor)
             
-            elif choice == '2':
-                prof_id = input("Enter professor ID to delete: ").strip()
-                self.professor_manager.delete_professor(prof_id)
+                elif choice == '2':
+                    prof_id = input("Enter professor ID to delete: ").strip()
+                    self.professor_manager.delete_professor(prof_id)
             
-            elif choice == '3':
-                self.professor_manager.display_all_professors()
+                elif choice == '3':
+                    self.professor_manager.display_all_professors()
             
-            elif choice == '4':
-                break
-            else:
-                print("Invalid choice!")
+                elif choice == '4':
+                    break
+                else:
+                    print("Invalid choice!")
     
     def grade_menu(self):
         """Grade management menu"""
@@ -930,67 +3797,70 @@ class CheckMyGradeApp:
             
             choice = input("\nEnter your choice (1-7): ").strip()
             
-            if choice == '1':
-                self.grade_manager.display_all_grades()
+            with self._profiled(f"grade menu {choice}"):
+                if choice == '1':
+                    self.grade_manager.display_all_grades()
             
-            elif choice == '2':
-                try:
-                    print("\n--- Add New Grade ---")
-                    grade_id = input("Enter grade ID: ").strip()
-                    letter = input("Enter grade letter (A+, A, B, etc.): ").strip()
-                    min_marks = int(input("Enter minimum marks: "))
-                    max_marks = int(input("Enter maximum marks: "))
+                elif choice == '2':
+                    try:
+                        print("\n--- Add New Grade ---")
+                        grade_id = input("Enter grade ID: ").strip()
+                        letter = input("Enter grade letter (A+, A, B, etc.): ").strip()
+                        min_marks = int(input("Enter minimum marks: "))
+                        max_marks = int(input("Enter maximum marks: "))
                     
-                    grade = Grade(grade_id, letter, min_marks, max_marks)
-                    self.grade_manager.add_grade(grade)
-                except ValueError:
-                    print("Invalid input! Marks must be numbers.")
+                        grade = Grade(grade_id, letter, min_marks, max_marks)
+                        if self.grade_manager.add_grade(grade):
+                            self.grade_manager.regrade_all(self.student_manager)
+                    except ValueError:
+                        print("Invalid input! Marks must be numbers.")
             
-            elif choice == '3':
-                grade_id = input("Enter grade ID to delete: ").strip()
-                self.grade_manager.delete_grade(grade_id)
+                elif choice == '3':
+                    grade_id = input("Enter grade ID to delete: ").strip()
+                    if self.grade_manager.delete_grade(grade_id):
+                        self.grade_manager.regrade_all(self.student_manager)
             
-            elif choice == '4':
-                grade_id = input("Enter grade ID to modify: ").strip()
-                print("Enter new values (press Enter to skip):")
-                updates = {}
+                elif choice == '4':
+                    grade_id = input("Enter grade ID to modify: ").strip()
+                    print("Enter new values (press Enter to skip):")
+                    updates = {}
                 
-                letter = input("Grade letter: ").strip()
-                if letter:
-                    updates['grade_letter'] = letter
+                    letter = input("Grade letter: ").strip()
+                    if letter:
+                        updates['grade_letter'] = letter
                 
-                min_marks = input("Minimum marks: ").strip()
-                if min_marks:
-                    try:
-                        updates['min_marks'] = int(min_marks)
-                    except ValueError:
-                        print("Invalid minimum marks!")
+                    min_marks = input("Minimum marks: ").strip()
+                    if min_marks:
+                        try:
+                            updates['min_marks'] = int(min_marks)
+                        except ValueError:
+                            print("Invalid minimum marks!")
                 
-                max_marks = input("Maximum marks: ").strip()
-                if max_marks:
-                    try:
-                        updates['max_marks'] = int(max_marks)
-                    except ValueError:
-                        print("Invalid maximum marks!")
+                    max_marks = input("Maximum marks: ").strip()
+                    if max_marks:
+                        try:
+                            updates['max_marks'] = int(max_marks)
+                        except ValueError:
+                            print("Invalid maximum marks!")
                 
-                if updates:
-                    self.grade_manager.modify_grade(grade_id, **updates)
+                    if updates and self.grade_manager.modify_grade(grade_id, **updates):
+                        self.grade_manager.regrade_all(self.student_manager)
             
-            elif choice == '5':
-                try:
-                    marks = int(input("Enter marks: "))
-                    grade_letter = self.grade_manager.get_grade_for_marks(marks)
-                    print(f"✓ Marks {marks} = Grade {grade_letter}")
-                except ValueError:
-                    print("Invalid marks!")
+                elif choice == '5':
+                    try:
+                        marks = int(input("Enter marks: "))
+                        grade_letter = self.grade_manager.get_grade_for_marks(marks)
+                        print(f"✓ Marks {marks} = Grade {grade_letter}")
+                    except ValueError:
+                        print("Invalid marks!")
             
-            elif choice == '6':
-                self.grade_manager.display_grade_report()
+                elif choice == '6':
+                    self.grade_manager.display_grade_report()
             
-            elif choice == '7':
-                break
-            else:
-                print("Invalid choice!")
+                elif choice == '7':
+                    break
+                else:
+                    print("Invalid choice!")
     
     def reports_menu(self):
         """Reports and statistics menu"""
@@ -1002,79 +3872,171 @@ class CheckMyGradeApp:
             print("2. Overall Statistics")
             print("3. Students by Course")
             print("4. Grade Distribution")
-            print("5. Back to Main Menu")
+            print("5. Export Data")
+            print("6. Borderline Students")
+            print("7. Performance")
+            print("8. Back to Main Menu")
             print("="*60)
             
-            choice = input("\nEnter your choice (1-5): ").strip()
+            choice = input("\nEnter your choice (1-8): ").strip()
             
-            if choice == '1':
-                course_id = input("Enter course ID: ").strip()
-                avg, median = self.student_manager.get_statistics(course_id)
-                if avg is not None:
-                    print(f"\n{'='*60}")
-                    print(f"Course: {course_id}")
-                    print(f"Average Marks: {avg:.2f}")
-                    print(f"Median Marks: {median:.2f}")
-                    print(f"{'='*60}")
+            with self._profiled(f"reports menu {choice}"):
+                if choice == '1':
+                    course_id = input("Enter course ID: ").strip()
+                    avg, median = self.student_manager.get_statistics(course_id)
+                    if avg is not None:
+                        print(f"\n{'='*60}")
+                        print(f"Course: {course_id}")
+                        print(f"Average Marks: {avg:.2f}")
+                        print(f"Median Marks: {median:.2f}")
+                        print(f"{'='*60}")
             
-            elif choice == '2':
-                avg, median = self.student_manager.get_statistics()
-                if avg is not None:
-                    print(f"\n{'='*60}")
-                    print(f"Overall Statistics:")
-                    print(f"Average Marks: {avg:.2f}")
-                    print(f"Median Marks: {median:.2f}")
-                    print(f"{'='*60}")
+                elif choice == '2':
+                    avg, median = self.student_manager.get_statistics()
+                    if avg is not None:
+                        print(f"\n{'='*60}")
+                        print(f"Overall Statistics:")
+                        print(f"Average Marks: {avg:.2f}")
+                        print(f"Median Marks: {median:.2f}")
+                        print(f"{'='*60}")
             
-            elif choice == '3':
-                course_id = input("Enter course ID: ").strip()
-                students = [s for s in self.student_manager.students if s.course_id == course_id]
-                if students:
-                    print(f"\n{'='*80}")
-                    print(f"Students in {course_id}: {len(students)}")
-                    print(f"{'='*80}")
-                    for student in students:
-                        student.display_record()
-                    print(f"{'='*80}")
-                else:
-                    print(f"No students found in {course_id}")
+                elif choice == '3':
+                    course_id = input("Enter course ID: ").strip()
+                    students = self.student_manager.students_in_course(course_id)
+                    if students:
+                        Pager.for_list(f"Students in {course_id}", students).show()
+                    else:
+                        print(f"No students found in {course_id}")
             
-            elif choice == '4':
-                print("\n--- Grade Distribution ---")
-                course_id = input("Enter course ID (or press Enter for all): ").strip()
+                elif choice == '4':
+                    print("\n--- Grade Distribution ---")
+                    course_id = input("Enter course ID (or press Enter for all): ").strip()
                 
-                students = self.student_manager.students
-                if course_id:
-                    students = [s for s in students if s.course_id == course_id]
-                
-                if not students:
-                    print("No students found!")
-                else:
                     # Count students in each grade
-                    grade_counts = {}
-                    for student in students:
-                        grade = student.grade
-                        grade_counts[grade] = grade_counts.get(grade, 0) + 1
-                    
-                    print(f"\n{'='*60}")
-                    print(f"Total Students: {len(students)}")
-                    print(f"{'='*60}")
-                    for grade_obj in sorted(self.grade_manager.grades, key=lambda g: g.min_marks, reverse=True):
-                        count = grade_counts.get(grade_obj.grade_letter, 0)
-                        percentage = (count / len(students)) * 100 if students else 0
-                        print(f"{grade_obj.grade_letter:5s} : {count:3d} students ({percentage:5.1f}%)")
-                    print(f"{'='*60}")
+                    grade_counts = self.student_manager.grade_counts(course_id)
+                    total = sum(grade_counts.values())
+                
+                    if not total:
+                        print("No students found!")
+                    else:
+                        print(f"\n{'='*60}")
+                        print(f"Total Students: {total}")
+                        print(f"{'='*60}")
+                        for grade_obj in sorted(self.grade_manager.grades, key=lambda g: g.min_marks, reverse=True):
+                            count = grade_counts.get(grade_obj.grade_letter, 0)
+                            percentage = (count / total) * 100
+                            print(f"{grade_obj.grade_letter:5s} : {count:3d} students ({percentage:5.1f}%)")
+                        print(f"{'='*60}")
             
-            elif choice == '5':
-                break
+                elif choice == '5':
+                    self.export_menu()
+
+                elif choice == '6':
+                    self.borderline_report()
+
+                elif choice == '7':
+                    self.performance_menu()
+
+                elif choice == '8':
+                    break
+                else:
+                    print("Invalid choice!")
+
+    def export_menu(self):
+        """Export students or statistics to CSV / JSON Lines, optionally compressed"""
+        print("\nExport: 1) Students  2) Course statistics  3) Grade distribution")
+        what = input("Enter choice: ").strip()
+        if what not in ('1', '2', '3'):
+            print("Invalid choice!")
+            return
+        path = input("Output file (.csv or .jsonl, add .gz or .xz to compress): ").strip()
+        try:
+            if what == '1':
+                course_id = input("Course ID (or press Enter for all): ").strip()
+                min_marks = int(input("Minimum marks (Enter for 0): ").strip() or 0)
+                max_marks = int(input("Maximum marks (Enter for 100): ").strip() or 100)
+                export_students(self.student_manager, path, course_id=course_id,
+                                min_marks=min_marks, max_marks=max_marks)
+            elif what == '2':
+                export_course_statistics(self.student_manager, path)
             else:
-                print("Invalid choice!")
+                course_id = input("Course ID (or press Enter for all): ").strip()
+                export_grade_distribution(self.student_manager, self.grade_manager, path, course_id=course_id)
+        except ValueError as e:
+            print(f"Invalid input: {e}")
+        except OSError as e:
+            print(f"Cannot write {path}: {e}")
+
+    def borderline_report(self):
+        """Students just below a grade boundary (by default the pass mark), per course or overall"""
+        # the pass mark is the lowest boundary above zero on the current scale (60 by default)
+        pass_mark = min((g.min_marks for g in self.grade_manager.grades if g.min_marks > 0), default=60)
+        course_id = input("Enter course ID (or press Enter for all): ").strip()
+        try:
+            lo = int(input(f"Minimum marks (Enter for {pass_mark - 5}): ").strip() or pass_mark - 5)
+            hi = int(input(f"Maximum marks (Enter for {pass_mark - 1}): ").strip() or pass_mark - 1)
+        except ValueError:
+            print("Invalid marks value!")
+            return
+        start_time = time.time()
+        students = self.student_manager.students_in_marks_range(lo, hi, course_id or None)
+        elapsed_time = time.time() - start_time
+        where = course_id or "all courses"
+        if not students:
+            print(f"No students with marks {lo}-{hi} in {where}")
+            return
+        per_mark = Counter(s.marks for s in students)
+        print("\nStudents per mark: " + "  ".join(f"{marks}: {count}" for marks, count in sorted(per_mark.items())))
+        print(f"Report built in {elapsed_time:.6f} seconds")
+        Pager.for_list(f"borderline students ({lo}-{hi}) in {where}", students).show()
+
+    def performance_menu(self):
+        """Show, dump, reset or toggle the operation metrics"""
+        state = "on" if METRICS.enabled else "off"
+        print(f"\nPerformance (metrics are {state}): 1) Show  2) Save as JSON  3) Reset  4) Turn {'off' if METRICS.enabled else 'on'}")
+        choice = input("Enter choice: ").strip()
+        if choice == '1':
+            METRICS.report()
+        elif choice == '2':
+            path = input("Output file (Enter for metrics.json): ").strip() or 'metrics.json'
+            try:
+                METRICS.dump(path)
+            except OSError as e:
+                print(f"Cannot write {path}: {e}")
+        elif choice == '3':
+            METRICS.reset()
+            print("✓ Metrics reset")
+        elif choice == '4':
+            if METRICS.enabled:
+                METRICS.disable()
+            else:
+                METRICS.enable()
+            print(f"✓ Metrics turned {'on' if METRICS.enabled else 'off'}")
+        else:
+            print("Invalid choice!")
 
 
 # MAIN ENTRY POINT
 
 if __name__ == "__main__":
-    app = CheckMyGradeApp()
+    parser = argparse.ArgumentParser(description="CheckMyGrade")
+    parser.add_argument('--database', help="keep all records in this SQLite file instead of the CSVs")
+    parser.add_argument('--journal', action='store_true', help="journal changes instead of rewriting CSVs")
+    parser.add_argument('--columnar', action='store_true', help="use the columnar student store")
+    parser.add_argument('--lazy', action='store_true', help="stream students.csv instead of loading it")
+    parser.add_argument('--snapshot', action='store_true',
+                        help="serve students from a memory-mapped binary snapshot of students.csv")
+    parser.add_argument('--metrics', action='store_true',
+                        help="record operation counts and latencies (also CHECKMYGRADE_METRICS=1)")
+    parser.add_argument('--profile', nargs='?', const='profiles', metavar='DIR',
+                        default=os.environ.get('CHECKMYGRADE_PROFILE') or None,
+                        help="write cProfile/tracemalloc dumps of every load and menu action to DIR "
+                             "(default ./profiles; also CHECKMYGRADE_PROFILE=DIR)")
+    args = parser.parse_args()
+    if args.metrics:
+        METRICS.enable()
+    app = CheckMyGradeApp(journal=args.journal, columnar=args.columnar, lazy=args.lazy,
+                          database=args.database, snapshot=args.snapshot, profile_dir=args.profile)
 # if not app.login_manager.users:
 #     print("Creating default admin user...")
 #     app.login_manager.register_user("micheal@mycsu.edu", "Welcome12#_", "professor")
@@ -0,0 +1,358 @@
+"""
+Benchmarks for the CheckMyGrade managers.
+
+Run:  python benchmark_checkMyGradeApp.py [suite|latency|memory|load ...] [--sizes 1000 10000 ...]
+      python benchmark_checkMyGradeApp.py suite --json results.json [--repeat 5 --warmup 1]
+
+"suite" (the default) times the StudentManager operations (load, save,
+add, update, delete, search, name search, one roster page, sort and
+statistics) plus grade lookup and login. Each case is timed with
+time.perf_counter after warmup runs, over several repeats, and the
+results can be written as JSON for comparing runs.
+"""
+import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+from CheckMyGrade_lab_work_1 import (GradeManager, LoginManager, LoginUser, PAGE_SIZE, Pager, StudentManager,
+                                      StudentStore, Student)
+
+COURSE_IDS = ["DATA200", "DATA201", "DATA202"]
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+LOAD_SIZES = [10_000, 100_000, 1_000_000, 5_000_000]
+LINEAR_WORK = 10_000_000   # cap on records touched by per-record-scan benchmarks per run
+
+
+def make_students(n, seed=42):
+    """Build n synthetic students in memory (no CSV involved)"""
+    rng = random.Random(seed)
+    return [
+        Student(f"student{i}@mycsu.edu", f"First{i}", f"Last{i}",
+                rng.choice(COURSE_IDS), "", rng.randint(0, 100))
+        for i in range(1, n + 1)
+    ]
+
+
+def write_students_csv(path, n, seed=42):
+    """Write n synthetic students to a CSV in the StudentManager format"""
+    with open(path, 'w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(['email_address', 'first_name', 'last_name', 'course_id', 'grade', 'marks'])
+        for s in make_students(n, seed):
+            writer.writerow([s.email_address, s.first_name, s.last_name, s.course_id, "A", s.marks])
+
+
+class DictStudent:
+    """Student as it was before __slots__ and interning, for comparison"""
+    def __init__(self, email_address, first_name, last_name, course_id="", grade="", marks=0):
+        self.email_address = email_address
+        self.first_name = first_name
+        self.last_name = last_name
+        self.course_id = course_id
+        self.grade = grade
+        self.marks = marks
+
+
+class DictStudentManager(StudentManager):
+    """StudentManager loading DictStudent records"""
+    def _record_from_row(self, row):
+        return DictStudent(row['email_address'], row['first_name'], row['last_name'],
+                           row['course_id'], row['grade'], int(row['marks']))
+
+    def load_from_csv(self):
+        """Load as before the fast reader: csv.DictReader rows, nothing interned"""
+        # StudentManager.load_from_csv builds Student(*row) directly, so _record_from_row alone is not enough
+        if not os.path.exists(self.csv_file):
+            return
+        with open(self.csv_file, newline='') as file:
+            for row in csv.DictReader(file):
+                self._students.setdefault(row['email_address'], self._record_from_row(row))
+        self._rebuild_indexes()
+
+
+def make_manager(n, manager_class=StudentManager):
+    """Manager holding n students, with persistence switched off"""
+    mgr = manager_class(csv_file=os.path.join(tempfile.gettempdir(), '__benchmark_students__.csv'))
+    # isolate the in-memory cost from the full-file rewrite
+    mgr.save_to_csv = lambda: None
+    mgr.students = make_students(n)
+    return mgr
+
+
+def time_per_op(func, args_list):
+    """Average seconds per call of func over args_list"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        for args in args_list:
+            func(*args)
+        elapsed = time.perf_counter() - start
+    return elapsed / len(args_list)
+
+
+def bench_search_and_add(sizes, ops=1000, manager_class=StudentManager):
+    """Search and add latency should stay flat as the roster grows"""
+    print(f"\n{manager_class.__name__}")
+    print(f"{'records':>10} {'search (us)':>12} {'add (us)':>10}")
+    for n in sizes:
+        mgr = make_manager(n, manager_class)
+        rng = random.Random(n)
+        lookups = [(f"student{rng.randint(1, n)}@mycsu.edu",) for _ in range(ops)]
+        search = time_per_op(mgr.search_student, lookups)
+
+        new = [(Student(f"new{i}@mycsu.edu", "New", "Student", "DATA200", "A", 95),)
+               for i in range(ops)]
+        add = time_per_op(mgr.add_student, new)
+        print(f"{n:>10} {search * 1e6:>12.2f} {add * 1e6:>10.2f}")
+
+
+def loaded_bytes_per_record(csv_file, n, manager_class):
+    """Traced bytes a manager keeps alive after loading n students from CSV"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    with contextlib.redirect_stdout(io.StringIO()):
+        mgr = manager_class(csv_file=csv_file)
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del mgr
+    return held / n
+
+
+def bench_memory(sizes):
+    """Memory per loaded record: before slots/interning, after, and columnar"""
+    print(f"\n{'records':>10} {'dict objects (B)':>17} {'slotted (B)':>12} {'columnar (B)':>13}")
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_file = os.path.join(tmp, 'students.csv')
+        for n in sizes:
+            write_students_csv(csv_file, n)
+            before = loaded_bytes_per_record(csv_file, n, DictStudentManager)
+            after = loaded_bytes_per_record(csv_file, n, StudentManager)
+            columnar = loaded_bytes_per_record(csv_file, n, StudentStore)
+            print(f"{n:>10} {before:>17.1f} {after:>12.1f} {columnar:>13.1f}")
+
+
+def legacy_load(csv_file):
+    """The original DictReader-based load_from_csv, for comparison"""
+    students = []
+    with open(csv_file, 'r', newline='') as file:
+        for row in csv.DictReader(file):
+            students.append(Student(row['email_address'], row['first_name'], row['last_name'],
+                                    row['course_id'], row['grade'],
+                                    int(row['marks']) if row['marks'] else 0))
+    return students
+
+
+def timed_load(csv_file, parallel_bytes):
+    """Seconds for StudentManager to load csv_file"""
+    saved = StudentManager.parallel_load_bytes
+    StudentManager.parallel_load_bytes = parallel_bytes
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            StudentManager(csv_file=csv_file)
+            return time.perf_counter() - start
+    finally:
+        StudentManager.parallel_load_bytes = saved
+
+
+def bench_load(sizes):
+    """CSV load time: DictReader vs positional reader vs parallel chunks"""
+    print(f"\n{'records':>10} {'DictReader (s)':>15} {'positional (s)':>15} "
+          f"{'parallel x%d (s)' % (os.cpu_count() or 1):>17}")
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_file = os.path.join(tmp, 'students.csv')
+        for n in sizes:
+            write_students_csv(csv_file, n)
+            start = time.perf_counter()
+            legacy_load(csv_file)
+            legacy = time.perf_counter() - start
+            positional = timed_load(csv_file, float('inf'))
+            parallel = timed_load(csv_file, 0)
+            print(f"{n:>10} {legacy:>15.3f} {positional:>15.3f} {parallel:>17.3f}")
+
+
+def measure(run, setup=None, ops=1, repeat=5, warmup=1):
+    """
+    Seconds per operation for each of repeat timed runs. run(state) performs
+    ops operations; setup() builds its state untimed before every run,
+    including the warmup runs, whose timings are discarded.
+    """
+    timings = []
+    with contextlib.redirect_stdout(io.StringIO()) as output:
+        for i in range(warmup + repeat):
+            state = setup() if setup else None
+            start = time.perf_counter()
+            run(state)
+            elapsed = time.perf_counter() - start
+            if i >= warmup:
+                timings.append(elapsed / ops)
+            output.seek(0)
+            output.truncate()   # drop what the managers printed
+    return timings
+
+
+def suite_cases(n, tmp, ops):
+    """(name, run, setup, ops) for every benchmark at n records"""
+    csv_file = os.path.join(tmp, 'students.csv')
+    write_students_csv(csv_file, n)
+    with contextlib.redirect_stdout(io.StringIO()):
+        mgr = StudentManager(csv_file=csv_file)
+    roster = mgr.students
+    rng = random.Random(n)
+    emails = [s.email_address for s in roster]
+    counter = iter(range(10 ** 9))
+
+    def in_memory():
+        # persistence is measured by "save"; the single-record ops time the in-memory work
+        mgr.save_to_csv = lambda: None
+        return mgr
+
+    def add(m):
+        base = next(counter)
+        for i in range(ops):
+            m.add_student(Student(f"new{base}-{i}@mycsu.edu", "New", "Student", "DATA200", "A", i % 101))
+
+    def update(m):
+        for email in rng.sample(emails, ops):
+            m.update_student(email, marks=rng.randint(0, 100))
+
+    def delete_setup():
+        m = in_memory()
+        base = next(counter)
+        victims = [Student(f"gone{base}-{i}@mycsu.edu", "Gone", "Student", "DATA201", "B", i % 101)
+                   for i in range(ops)]
+        for student in victims:
+            m.add_student(student)
+        return m, [s.email_address for s in victims]
+
+    def delete(state):
+        m, victims = state
+        for email in victims:
+            m.delete_student(email)
+
+    def search(m):
+        for email in rng.sample(emails, ops):
+            m.search_student(email)
+
+    def sort_setup():
+        m = in_memory()
+        m.students = roster   # drops the cached sorted views
+        return m
+
+    name_terms = [f"last{rng.randint(1, n)}" for _ in range(ops)]
+
+    def name_search_setup():
+        m = in_memory()
+        m.search_by_name("first1")   # builds the name index
+        return m
+
+    def name_search(m):
+        for term in name_terms:
+            m.search_by_name(term)
+
+    def page(m):
+        # one page from the middle of the roster, as display_all_students renders it
+        with contextlib.redirect_stdout(io.StringIO()):
+            pager = Pager("Students", len(m), m.students_slice, PAGE_SIZE, interactive=False)
+            pager.render(pager.pages // 2 + 1)
+
+    def statistics_run(m):
+        for i in range(ops):
+            m.get_statistics(COURSE_IDS[i % len(COURSE_IDS)] if i % 2 else None)
+
+    grade_mgr = GradeManager(csv_file=os.path.join(tmp, 'grades.csv'))
+    marks = [rng.randint(0, 100) for _ in range(ops)]
+
+    def grade_lookup(_):
+        for m in marks:
+            grade_mgr.get_grade_for_marks(m)
+
+    # login scans the user list, so the number of logins per run is capped
+    login_ops = max(10, min(ops, LINEAR_WORK // n))
+    login_mgr = LoginManager(csv_file=os.path.join(tmp, 'login.csv'))
+    password = LoginUser("", "", "").encrypt_password("Welcome12#_")
+    login_mgr.users = [LoginUser(f"user{i}@mycsu.edu", password, "student") for i in range(n)]
+    login_ids = [f"user{rng.randrange(n)}@mycsu.edu" for _ in range(login_ops)]
+
+    def login(_):
+        for user_id in login_ids:
+            login_mgr.login(user_id, "Welcome12#_")
+
+    return [
+        ('load', lambda _: StudentManager(csv_file=csv_file), None, 1),
+        ('save', lambda m: StudentManager.save_to_csv(m), lambda: mgr, 1),
+        ('add', add, in_memory, ops),
+        ('update', update, in_memory, ops),
+        ('delete', delete, delete_setup, ops),
+        ('search', search, in_memory, ops),
+        ('name_search', name_search, name_search_setup, ops),
+        ('page', page, in_memory, 1),
+        ('sort', lambda m: m.sort_students('marks'), sort_setup, 1),
+        ('statistics', statistics_run, in_memory, ops),
+        ('grade_lookup', grade_lookup, None, ops),
+        ('login', login, None, login_ops),
+    ]
+
+
+def bench_suite(sizes, ops, repeat, warmup, json_path=None):
+    """Time every operation at every size; optionally write the results as JSON"""
+    results = []
+    print(f"\n{'benchmark':>12} {'records':>10} {'ops':>6} {'best (us)':>12} {'median (us)':>12}")
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            for name, run, setup, case_ops in suite_cases(n, tmp, ops):
+                timings = measure(run, setup, case_ops, repeat, warmup)
+                results.append({'benchmark': name, 'records': n, 'ops': case_ops,
+                                 'seconds_per_op': timings, 'best': min(timings),
+                                 'median': statistics.median(timings), 'mean': statistics.mean(timings)})
+                print(f"{name:>12} {n:>10} {case_ops:>6} {min(timings) * 1e6:>12.2f} "
+                      f"{statistics.median(timings) * 1e6:>12.2f}")
+    if json_path:
+        report = {
+            'meta': {
+                'timestamp': datetime.now().isoformat(timespec='seconds'),
+                'python': sys.version.split()[0],
+                'platform': platform.platform(),
+                'machine': platform.machine(),
+                'cpu_count': os.cpu_count(),
+                'repeat': repeat,
+                'warmup': warmup,
+            },
+            'results': results,
+        }
+        with open(json_path, 'w') as file:
+            json.dump(report, file, indent=2)
+        print(f"\nWrote {len(results)} results to {json_path}")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CheckMyGrade benchmarks")
+    parser.add_argument('benchmarks', nargs='*', default=['suite'],
+                        help="any of: suite, latency, memory, load (default: suite)")
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        help=f"record counts (default {DEFAULT_SIZES}, {LOAD_SIZES} for load)")
+    parser.add_argument('--ops', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=5, help="timed runs per suite benchmark")
+    parser.add_argument('--warmup', type=int, default=1, help="untimed runs before them")
+    parser.add_argument('--json', help="write suite results to this file")
+    args = parser.parse_args()
+    if 'suite' in args.benchmarks:
+        bench_suite(args.sizes or DEFAULT_SIZES, args.ops, args.repeat, args.warmup, args.json)
+    if 'latency' in args.benchmarks:
+        bench_search_and_add(args.sizes or DEFAULT_SIZES, args.ops)
+        bench_search_and_add(args.sizes or DEFAULT_SIZES, args.ops, StudentStore)
+    if 'memory' in args.benchmarks:
+        bench_memory(args.sizes or DEFAULT_SIZES)
+    if 'load' in args.benchmarks:
+        bench_load(args.sizes or LOAD_SIZES)
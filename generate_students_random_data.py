@@ -1,45 +1,165 @@
-import csv, random
+"""
+Deterministic synthetic data for CheckMyGrade: students.csv, courses.csv,
+professors.csv, grades.csv and login.csv, consistent with each other.
 
-COURSE_IDS = ["DATA200", "DATA201", "DATA202"]
+Run:  python generate_students_random_data.py [--students 1000] [--courses 20] [--seed 200]
+      python generate_students_random_data.py --students 10000000 --output fixtures/10m
 
-with open('students.csv', 'w', newline='') as f:
-    writer = csv.writer(f)
-    writer.writerow(['email_address','first_name','last_name','course_id','grade','marks'])
-    
-    for i in range(1, 1001):  # will generate 1000 students
+Existing CSVs in the output directory are left alone unless --force is given.
+Students are student1@mycsu.edu ... studentN@mycsu.edu, as before.
+
+Students are generated in fixed-size chunks, each from its own seeded
+random.Random, so the output depends only on the arguments and not on
+--workers. Chunks are formatted straight to CSV text (every generated value
+is free of commas and quotes) and written with one write per chunk;
+with more than one CPU they are built in parallel.
+"""
+import argparse
+import contextlib
+import io
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate
+
+from CheckMyGrade_lab_work_1 import GradeManager, LoginUser, STUDENT_FIELDS
+
+CHUNK_ROWS = 250_000
+OUTPUT_FILES = ('students.csv', 'courses.csv', 'professors.csv', 'grades.csv', 'login.csv')
+
+FIRST_NAMES = ["James", "Mary", "Robert", "Patricia", "John", "Jennifer", "Michael", "Linda", "David",
+               "Elizabeth", "William", "Barbara", "Richard", "Susan", "Joseph", "Jessica", "Thomas",
+               "Sarah", "Carlos", "Karen", "Wei", "Priya", "Ahmed", "Mei", "Juan", "Fatima", "Hiroshi",
+               "Olga", "Kwame", "Ana", "Arjun", "Sofia", "Daniel", "Nancy", "Matthew", "Lisa", "Minh",
+               "Aisha", "Luca", "Emma"]
+LAST_NAMES = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez",
+              "Martinez", "Hernandez", "Lopez", "Gonzalez", "Wilson", "Anderson", "Thomas", "Taylor",
+              "Moore", "Jackson", "Martin", "Lee", "Perez", "Thompson", "White", "Harris", "Nguyen",
+              "Chen", "Patel", "Kim", "Singh", "Wang", "Tanaka", "Ivanova", "Mensah", "Silva", "Rossi",
+              "Khan", "Clark", "Lewis", "Walker"]
+DEPARTMENTS = [("DATA", "Data Science"), ("CS", "Computer Science"), ("MATH", "Mathematics"),
+               ("STAT", "Statistics"), ("BUS", "Business Analytics"), ("ENGR", "Engineering")]
+TOPICS = ["Foundations", "Programming", "Databases", "Machine Learning", "Visualization", "Statistics",
+          "Algorithms", "Linear Algebra", "Probability", "Ethics", "Cloud Computing", "Optimization"]
+RANKS = ["Lecturer", "Assistant Professor", "Associate Professor", "Professor"]
+RANK_WEIGHTS = [3, 4, 3, 2]
+
+# Marks follow a normal curve (mean 75, sd 12) clipped to 0-100; each course
+# shifts it by its own difficulty so course statistics differ.
+MARK_CUM_WEIGHTS = list(accumulate(math.exp(-((m - 75) / 12) ** 2 / 2) for m in range(101)))
+
+
+def make_courses(count, rng):
+    """(course_id, course_name, description, popularity, difficulty); DATA200-202 come first"""
+    courses = []
+    for i in range(count):
+        code, department = DEPARTMENTS[0] if i < 3 else DEPARTMENTS[i % len(DEPARTMENTS)]
+        course_id = f"{code}{200 + i}"
+        topic = TOPICS[i % len(TOPICS)]
+        # Zipf-like enrolment: a few large intro courses and a long tail of small ones
+        courses.append((course_id, f"{department} {topic}", f"{department} {200 + i} - {topic}",
+                        1 / (i + 1), rng.randint(-8, 8)))
+    return courses
+
+
+def student_chunk(args):
+    """CSV text for students [start, stop) and their login rows"""
+    seed, index, start, stop, courses, grade_table, password = args
+    rng = random.Random(seed * 1_000_003 + index)
+    n = stop - start
+    # "course_id,grade,marks" for every (course, base mark), so rows need no arithmetic
+    tails = []
+    for course_id, _, _, _, difficulty in courses:
+        shifted = (min(100, max(0, base + difficulty)) for base in range(101))
+        tails.append([f"{course_id},{grade_table[m]},{m}" for m in shifted])
+    picks = rng.choices(tails, cum_weights=list(accumulate(c[3] for c in courses)), k=n)
+    base = rng.choices(range(101), cum_weights=MARK_CUM_WEIGHTS, k=n)
+    firsts = rng.choices(range(len(FIRST_NAMES)), k=n)
+    lasts = rng.choices(range(len(LAST_NAMES)), k=n)
+
+    students, logins = [], []
+    for i, first, last, tail, mark in zip(range(start + 1, stop + 1), firsts, lasts, picks, base):
         email = f"student{i}@mycsu.edu"
-        fname = f"First{i}"
-        lname = f"Last{i}"
-        
-        # Randomly assign one of your chosen courses
-        course = random.choice(COURSE_IDS)
-        
-        marks = random.randint(0, 100)
-
-        # Assign grade based on marks
-        if marks >= 97:
-            grade = "A+"
-        elif marks >= 93:
-            grade = "A"
-        elif marks >= 90:
-            grade = "A-"
-        elif marks >= 87:
-            grade = "B+"
-        elif marks >= 83:
-            grade = "B"
-        elif marks >= 80:
-            grade = "B-"
-        elif marks >= 77:
-            grade = "C+"
-        elif marks >= 73:
-            grade = "C"
-        elif marks >= 70:
-            grade = "C-"
-        elif marks >= 60:
-            grade = "D"
+        students.append(f"{email},{FIRST_NAMES[first]},{LAST_NAMES[last]},{tail[mark]}\n")
+        logins.append(f"{email},{password},student\n")
+    return ''.join(students), ''.join(logins)
+
+
+def write_rows(path, header, rows):
+    with open(path, 'w', newline='') as file:
+        file.write(','.join(header) + '\n')
+        file.writelines(','.join(map(str, row)) + '\n' for row in rows)
+
+
+def generate(output='.', students=1000, courses=20, professors=None, seed=200,
+             password="Welcome12#_", workers=None, force=False):
+    """Write all five CSVs into output; returns the number of student rows"""
+    existing = [name for name in OUTPUT_FILES if os.path.exists(os.path.join(output, name))]
+    if existing and not force:
+        raise FileExistsError(f"{output} already has {', '.join(existing)}")
+    os.makedirs(output, exist_ok=True)
+    rng = random.Random(seed)
+    catalog = make_courses(courses, rng)
+
+    # grades.csv and the letters come from GradeManager, so they always agree;
+    # it writes the default scale when the file does not exist yet
+    with contextlib.redirect_stdout(io.StringIO()):
+        grade_manager = GradeManager(csv_file=os.path.join(output, 'grades.csv'))
+    grade_table = [grade_manager.get_grade_for_marks(marks) for marks in range(101)]
+    password_hash = LoginUser("", "", "").encrypt_password(password)
+
+    write_rows(os.path.join(output, 'courses.csv'), ['course_id', 'course_name', 'description'],
+               (c[:3] for c in catalog))
+
+    professor_rows = []
+    for i in range(courses * 2 if professors is None else professors):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        # every course gets a professor before any course gets a second one
+        course_id = catalog[i][0] if i < len(catalog) else rng.choice(catalog)[0]
+        rank = rng.choices(RANKS, RANK_WEIGHTS)[0]
+        professor_rows.append((f"{first}.{last}{i}@mycsu.edu".lower(), f"{first} {last}", rank, course_id))
+    write_rows(os.path.join(output, 'professors.csv'), ['professor_id', 'professor_name', 'rank', 'course_id'],
+               professor_rows)
+
+    jobs = [(seed, index, start, min(start + CHUNK_ROWS, students), catalog, grade_table, password_hash)
+            for index, start in enumerate(range(0, students, CHUNK_ROWS))]
+    workers = workers or os.cpu_count() or 1
+    with open(os.path.join(output, 'students.csv'), 'w', newline='') as student_file, \
+            open(os.path.join(output, 'login.csv'), 'w', newline='') as login_file, \
+            contextlib.ExitStack() as stack:
+        student_file.write(','.join(STUDENT_FIELDS) + '\n')
+        login_file.write('user_id,password,role\n')
+        login_file.writelines(f"{row[0]},{password_hash},professor\n" for row in professor_rows)
+        if workers > 1 and len(jobs) > 1:
+            pool = stack.enter_context(ProcessPoolExecutor(workers))
+            chunks = pool.map(student_chunk, jobs)
         else:
-            grade = "F"
+            chunks = map(student_chunk, jobs)
+        for student_text, login_text in chunks:
+            student_file.write(student_text)
+            login_file.write(login_text)
+    return students
+
 
-        writer.writerow([email, fname, lname, course, grade, marks])
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate deterministic CheckMyGrade CSV fixtures")
+    parser.add_argument('--students', type=int, default=1000)
+    parser.add_argument('--courses', type=int, default=20)
+    parser.add_argument('--professors', type=int, help="default: two per course")
+    parser.add_argument('--seed', type=int, default=200)
+    parser.add_argument('--password', default="Welcome12#_", help="password of every generated login")
+    parser.add_argument('--output', default='.', help="directory for the five CSVs")
+    parser.add_argument('--workers', type=int, help="processes building student chunks (default: CPU count)")
+    parser.add_argument('--force', action='store_true', help="overwrite CSVs already in the output directory")
+    args = parser.parse_args()
 
-print("Successfully created students.csv with 1000 random records!")
+    start = time.perf_counter()
+    try:
+        count = generate(args.output, args.students, args.courses, args.professors, args.seed,
+                         args.password, args.workers, args.force)
+    except FileExistsError as e:
+        parser.error(f"{e}; pass --force to overwrite")
+    print(f"Successfully created {count} students, {args.courses} courses and their professors, "
+          f"grades and logins in {args.output} ({time.perf_counter() - start:.1f} s)")
@@ -0,0 +1,142 @@
+"""
+Load test for server_checkMyGradeApp.py: requests/sec and latency percentiles.
+
+Run:  python loadtest_checkMyGradeApp.py [--students 100000] [--clients 32] [--duration 10]
+      python loadtest_checkMyGradeApp.py --url http://127.0.0.1:8080 --students 100000
+
+Without --url a server is started on a free port in a temporary directory,
+seeded with --students synthetic students (journal mode, so writes append
+to the journal instead of rewriting the CSV). Each client keeps one
+keep-alive connection and sends a mix of student lookups, statistics and
+--writes fraction of mark updates.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.parse import urlsplit
+
+from benchmark_checkMyGradeApp import write_students_csv
+
+SERVER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'server_checkMyGradeApp.py')
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(directory, students, port):
+    """Seed directory with students and start a server there; returns the process"""
+    write_students_csv(os.path.join(directory, 'students.csv'), students)
+    process = subprocess.Popen([sys.executable, SERVER, '--port', str(port), '--journal'],
+                               cwd=directory, stdout=subprocess.DEVNULL)
+    deadline = time.monotonic() + 120
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return process
+        except OSError:
+            if process.poll() is not None:
+                raise RuntimeError("server exited during startup")
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("server did not start listening")
+
+
+async def request(reader, writer, method, path, body=None):
+    """Send one request on a keep-alive connection; returns the status code"""
+    data = json.dumps(body).encode() if body is not None else b''
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+                 f"Content-Length: {len(data)}\r\n\r\n".encode() + data)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.lower() == 'content-length':
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+async def client(host, port, students, deadline, writes, rng, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            email = f"student{rng.randint(1, students)}@mycsu.edu"
+            roll = rng.random()
+            if roll < writes:
+                kind, args = 'update', ('PATCH', f"/students/{email}", {'marks': rng.randint(0, 100)})
+            elif roll < writes + 0.1:
+                kind, args = 'statistics', ('GET', "/statistics?course=DATA201")
+            else:
+                kind, args = 'search', ('GET', f"/students/{email}")
+            start = time.perf_counter()
+            status = await request(reader, writer, *args)
+            latencies.setdefault(kind, []).append(time.perf_counter() - start)
+            if status != 200:
+                errors[status] = errors.get(status, 0) + 1
+    finally:
+        writer.close()
+
+
+def percentile(sorted_values, p):
+    return sorted_values[max(0, -(-p * len(sorted_values) // 100) - 1)]
+
+
+async def run(host, port, students, clients, duration, writes):
+    latencies, errors = {}, {}
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(*(client(host, port, students, deadline, writes, random.Random(i), latencies, errors)
+                           for i in range(clients)))
+    elapsed = time.perf_counter() - start
+
+    total = sum(len(values) for values in latencies.values())
+    print(f"\n{clients} clients, {elapsed:.1f} s: {total} requests, {total / elapsed:.0f} req/s"
+          + (f", non-200 responses: {errors}" if errors else ""))
+    print(f"{'request':>12} {'count':>8} {'p50 (ms)':>9} {'p99 (ms)':>9} {'max (ms)':>9}")
+    everything = []
+    for kind, values in sorted(latencies.items()):
+        values.sort()
+        everything.extend(values)
+        print(f"{kind:>12} {len(values):>8} {percentile(values, 50) * 1e3:>9.2f} "
+              f"{percentile(values, 99) * 1e3:>9.2f} {values[-1] * 1e3:>9.2f}")
+    everything.sort()
+    print(f"{'all':>12} {total:>8} {percentile(everything, 50) * 1e3:>9.2f} "
+          f"{percentile(everything, 99) * 1e3:>9.2f} {everything[-1] * 1e3:>9.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CheckMyGrade server load test")
+    parser.add_argument('--url', help="test a running server instead of starting one")
+    parser.add_argument('--students', type=int, default=100_000,
+                        help="roster size to seed (or that the running server holds)")
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=10.0, help="seconds")
+    parser.add_argument('--writes', type=float, default=0.05, help="fraction of requests that update marks")
+    args = parser.parse_args()
+
+    if args.url:
+        url = urlsplit(args.url)
+        asyncio.run(run(url.hostname, url.port or 80, args.students, args.clients, args.duration, args.writes))
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            port = free_port()
+            server = start_server(tmp, args.students, port)
+            try:
+                asyncio.run(run('127.0.0.1', port, args.students, args.clients, args.duration, args.writes))
+            finally:
+                server.terminate()
+                server.wait()
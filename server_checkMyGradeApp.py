@@ -0,0 +1,403 @@
+"""
+Local HTTP/JSON server for CheckMyGrade, built on asyncio and the stdlib.
+
+Run:  python server_checkMyGradeApp.py [--port 8080] [--journal | --database checkmygrade.db]
+
+Endpoints (JSON in and out):
+    GET    /students?course=&sort=email|marks|name&order=asc|desc&offset=&limit=
+    GET    /students/<email>
+    POST   /students                  {"email_address", "first_name", "last_name", "course_id", "marks"}
+    PATCH  /students/<email>          any student fields except email_address
+    DELETE /students/<email>
+    GET    /courses[/<id>]      POST /courses       DELETE /courses/<id>
+    GET    /professors[/<id>]   POST /professors    DELETE /professors/<id>
+    GET    /grades[/<id>]       POST /grades        PATCH /grades/<id>    DELETE /grades/<id>
+    GET    /statistics?course=
+    GET    /statistics/courses
+
+Manager calls run on a pool of worker threads (--workers): the event loop
+only parses requests and writes responses, and never waits on disk. The
+managers' read/write locks let lookups and statistics proceed together
+and while save_to_csv writes a big roster; changes still go one at a time.
+When a manager call fails, the message it printed is returned as "error";
+prints are collected per thread, since redirect_stdout would swap
+sys.stdout for every thread at once.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from CheckMyGrade_lab_work_1 import CheckMyGradeApp, Course, Grade, Professor, Student
+
+REASONS = {200: 'OK', 201: 'Created', 400: 'Bad Request', 404: 'Not Found',
+           405: 'Method Not Allowed', 500: 'Internal Server Error'}
+DEFAULT_LIMIT = 100
+DEFAULT_WORKERS = 8
+MAX_BODY = 1024 * 1024
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def fields(body, allowed, required=()):
+    """Pick allowed keys from a JSON object body, checking the required ones"""
+    if not isinstance(body, dict):
+        raise HTTPError(400, "expected a JSON object")
+    missing = [name for name in required if name not in body]
+    if missing:
+        raise HTTPError(400, f"missing field(s): {', '.join(missing)}")
+    return {name: body[name] for name in allowed if name in body}
+
+
+class ThreadOutput:
+    """sys.stdout stand-in that sends a thread's prints to its own buffer while one is set"""
+    def __init__(self, stream):
+        self.stream = stream
+        self.local = threading.local()
+
+    def _target(self):
+        buffer = getattr(self.local, 'buffer', None)
+        return self.stream if buffer is None else buffer
+
+    def write(self, text):
+        return self._target().write(text)
+
+    def flush(self):
+        self._target().flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+_install_lock = threading.Lock()
+
+
+@contextlib.contextmanager
+def captured_output():
+    """Collect what the calling thread prints; other threads keep printing as before"""
+    with _install_lock:
+        if not isinstance(sys.stdout, ThreadOutput):
+            sys.stdout = ThreadOutput(sys.stdout)
+        stdout = sys.stdout
+    buffer, previous = io.StringIO(), getattr(stdout.local, 'buffer', None)
+    stdout.local.buffer = buffer
+    try:
+        yield buffer
+    finally:
+        stdout.local.buffer = previous
+
+
+def quiet(func, *args):
+    """Call func without letting its printed output reach the reply"""
+    with captured_output():
+        return func(*args)
+
+
+def integer(value, name, minimum=None):
+    """value as an int: whole numbers or their strings only, so 85.9 is refused rather than truncated"""
+    if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+        raise HTTPError(400, f"{name} must be an integer")
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        raise HTTPError(400, f"{name} must be an integer")
+    if minimum is not None and number < minimum:
+        raise HTTPError(400, f"{name} must be at least {minimum}")
+    return number
+
+
+class CheckMyGradeServer:
+    """Routes HTTP requests to the managers of a CheckMyGradeApp"""
+
+    def __init__(self, app, workers=DEFAULT_WORKERS):
+        self.app = app
+        self.worker = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='checkmygrade-managers')
+        self.routes = {
+            ('GET', 'students', False): self.list_students,
+            ('GET', 'students', True): self.get_student,
+            ('POST', 'students', False): self.add_student,
+            ('PATCH', 'students', True): self.update_student,
+            ('DELETE', 'students', True): self.delete_student,
+            ('GET', 'courses', False): self.list_courses,
+            ('GET', 'courses', True): self.get_course,
+            ('POST', 'courses', False): self.add_course,
+            ('DELETE', 'courses', True): self.delete_course,
+            ('GET', 'professors', False): self.list_professors,
+            ('GET', 'professors', True): self.get_professor,
+            ('POST', 'professors', False): self.add_professor,
+            ('DELETE', 'professors', True): self.delete_professor,
+            ('GET', 'grades', False): self.list_grades,
+            ('GET', 'grades', True): self.get_grade,
+            ('POST', 'grades', False): self.add_grade,
+            ('PATCH', 'grades', True): self.modify_grade,
+            ('DELETE', 'grades', True): self.delete_grade,
+            ('GET', 'statistics', False): self.statistics,
+            ('GET', 'statistics', True): self.course_statistics,
+        }
+
+    # -- HTTP --
+
+    async def handle_connection(self, reader, writer):
+        """Serve keep-alive HTTP/1.1 requests on one connection"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, version = request_line.decode('latin-1').split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get('content-length', 0))
+                if length > MAX_BODY:
+                    raise ValueError("request body too large")
+                body = await reader.readexactly(length) if length else b''
+
+                status, payload = await self.dispatch(method, target, body)
+                data = json.dumps(payload).encode()
+                keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass   # malformed request or client went away: drop the connection
+        finally:
+            writer.close()
+
+    async def dispatch(self, method, target, body):
+        """(status, payload) for one request; manager work runs on the worker threads"""
+        url = urlsplit(target)
+        parts = [unquote(part) for part in url.path.strip('/').split('/') if part]
+        if not parts or len(parts) > 2:
+            return 404, {'error': f"no route for {url.path}"}
+        handler = self.routes.get((method, parts[0], len(parts) == 2))
+        if handler is None:
+            if any(route[1:] == (parts[0], len(parts) == 2) for route in self.routes):
+                return 405, {'error': f"{method} not allowed on {url.path}"}
+            return 404, {'error': f"no route for {url.path}"}
+        try:
+            data = json.loads(body) if body else None
+        except ValueError:
+            return 400, {'error': "request body is not valid JSON"}
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        args = (parts[1], query, data) if len(parts) == 2 else (query, data)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.worker, self.call, handler, args)
+
+    def call(self, handler, args):
+        """Run a handler on a worker thread, reporting what the managers printed on failure"""
+        try:
+            with captured_output() as output:
+                status, payload = handler(*args)
+        except HTTPError as e:
+            return e.status, {'error': str(e)}
+        except Exception as e:
+            return 500, {'error': f"{type(e).__name__}: {e}"}
+        lines = [line for line in output.getvalue().splitlines() if line.strip('= ')]
+        if status >= 400 and lines:
+            payload.setdefault('error', lines[-1])
+        return status, payload
+
+    # -- students --
+
+    def list_students(self, query, body):
+        students = self.app.student_manager
+        offset = integer(query.get('offset', 0), 'offset', minimum=0)
+        limit = integer(query.get('limit', DEFAULT_LIMIT), 'limit', minimum=0)
+        by = query.get('sort')
+        if 'course' in query:
+            rows = students.students_in_course(query['course'])
+            total = len(rows)
+            page = rows[offset:offset + limit]
+        elif by:
+            select = students.top_k if query.get('order') == 'desc' else students.bottom_k
+            total = len(students)
+            page = select(by, offset + limit)[offset:]
+        else:
+            total = len(students)
+            page = students.students_slice(offset, offset + limit)
+        return 200, {'total': total, 'students': [s.to_dict() for s in page]}
+
+    def get_student(self, email, query, body):
+        student = quiet(self.app.student_manager.search_student, email)[0]
+        if student is None:
+            return 404, {'error': f"Student with email {email} not found!"}
+        return 200, student.to_dict()
+
+    def _with_grade(self, values):
+        """Fill in the grade letter for new marks unless one was given"""
+        if 'marks' in values:
+            values['marks'] = integer(values['marks'], 'marks')
+            values.setdefault('grade', self.app.grade_manager.get_grade_for_marks(values['marks']))
+        return values
+
+    def add_student(self, query, body):
+        values = self._with_grade(fields(body, ['email_address', 'first_name', 'last_name', 'course_id',
+                                                'grade', 'marks'],
+                                         required=['email_address', 'first_name', 'last_name', 'marks']))
+        student = Student(**values)
+        if not self.app.student_manager.add_student(student):
+            return 400, {}
+        return 201, student.to_dict()
+
+    def update_student(self, email, query, body):
+        values = self._with_grade(fields(body, ['first_name', 'last_name', 'course_id', 'grade', 'marks']))
+        manager = self.app.student_manager
+        if quiet(manager.search_student, email)[0] is None:
+            return 404, {'error': f"Student with email {email} not found!"}
+        if not manager.update_student(email, **values):
+            return 400, {}
+        return 200, quiet(manager.search_student, email)[0].to_dict()
+
+    def delete_student(self, email, query, body):
+        if not self.app.student_manager.delete_student(email):
+            return 404, {}
+        return 200, {}
+
+    # -- courses, professors --
+
+    def list_courses(self, query, body):
+        return 200, {'courses': [c.to_dict() for c in self.app.course_manager.courses]}
+
+    def get_course(self, course_id, query, body):
+        for course in self.app.course_manager.courses:
+            if course.course_id == course_id:
+                return 200, course.to_dict()
+        return 404, {'error': f"Course {course_id} not found!"}
+
+    def add_course(self, query, body):
+        course = Course(**fields(body, ['course_id', 'course_name', 'description'],
+                                 required=['course_id', 'course_name']))
+        if not self.app.course_manager.add_course(course):
+            return 400, {}
+        return 201, course.to_dict()
+
+    def delete_course(self, course_id, query, body):
+        if not self.app.course_manager.delete_course(course_id):
+            return 404, {}
+        return 200, {}
+
+    def list_professors(self, query, body):
+        return 200, {'professors': [p.to_dict() for p in self.app.professor_manager.professors]}
+
+    def get_professor(self, professor_id, query, body):
+        for professor in self.app.professor_manager.professors:
+            if professor.professor_id == professor_id:
+                return 200, professor.to_dict()
+        return 404, {'error': f"Professor {professor_id} not found!"}
+
+    def add_professor(self, query, body):
+        professor = Professor(**fields(body, ['professor_id', 'professor_name', 'rank', 'course_id'],
+                                       required=['professor_id', 'professor_name', 'rank', 'course_id']))
+        if not self.app.professor_manager.add_professor(professor):
+            return 400, {}
+        return 201, professor.to_dict()
+
+    def delete_professor(self, professor_id, query, body):
+        if not self.app.professor_manager.delete_professor(professor_id):
+            return 404, {}
+        return 200, {}
+
+    # -- grades: scale changes regrade every student, as in the grade menu --
+
+    def list_grades(self, query, body):
+        return 200, {'grades': [g.to_dict() for g in self.app.grade_manager.grades]}
+
+    def get_grade(self, grade_id, query, body):
+        for grade in self.app.grade_manager.grades:
+            if grade.grade_id == grade_id:
+                return 200, grade.to_dict()
+        return 404, {'error': f"Grade {grade_id} not found!"}
+
+    def _grade_values(self, body, required=()):
+        values = fields(body, ['grade_id', 'grade_letter', 'min_marks', 'max_marks'], required)
+        for name in ('min_marks', 'max_marks'):
+            if name in values:
+                values[name] = integer(values[name], name)
+        return values
+
+    def add_grade(self, query, body):
+        grade = Grade(**self._grade_values(body, required=['grade_id', 'grade_letter', 'min_marks', 'max_marks']))
+        if not self.app.grade_manager.add_grade(grade):
+            return 400, {}
+        return 201, {'grade': grade.to_dict(),
+                     'regraded': self.app.grade_manager.regrade_all(self.app.student_manager)}
+
+    def modify_grade(self, grade_id, query, body):
+        values = self._grade_values(body)
+        values.pop('grade_id', None)
+        if not self.app.grade_manager.modify_grade(grade_id, **values):
+            return 404, {}
+        return 200, {'regraded': self.app.grade_manager.regrade_all(self.app.student_manager)}
+
+    def delete_grade(self, grade_id, query, body):
+        if not self.app.grade_manager.delete_grade(grade_id):
+            return 404, {}
+        return 200, {'regraded': self.app.grade_manager.regrade_all(self.app.student_manager)}
+
+    # -- statistics --
+
+    def statistics(self, query, body):
+        course_id = query.get('course')
+        manager = self.app.student_manager
+        average, median = manager.get_statistics(course_id)
+        if average is None:
+            return 404, {}
+        return 200, {'course_id': course_id, 'average': average, 'median': median,
+                     'p90': manager.percentile(90, course_id),
+                     'grades': dict(manager.grade_counts(course_id))}
+
+    def course_statistics(self, name, query, body):
+        if name != 'courses':
+            return 404, {'error': f"no route for /statistics/{name}"}
+        return 200, {course_id: {'count': count, 'average': average, 'median': median}
+                     for course_id, (count, average, median)
+                     in self.app.student_manager.course_statistics().items()}
+
+    # -- lifecycle --
+
+    async def serve(self, host, port):
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        print(f"CheckMyGrade API listening on http://{host}:{port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            # fold any journals into the CSVs before exiting, as CheckMyGradeApp.run does
+            for manager in self.app.managers():
+                self.worker.submit(manager.compact)
+            self.worker.shutdown(wait=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CheckMyGrade HTTP/JSON server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--database', help="keep all records in this SQLite file instead of the CSVs")
+    parser.add_argument('--journal', action='store_true', help="journal changes instead of rewriting CSVs")
+    parser.add_argument('--columnar', action='store_true', help="use the columnar student store")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help="threads running manager calls")
+    args = parser.parse_args()
+    app = CheckMyGradeApp(journal=args.journal, columnar=args.columnar, database=args.database)
+    try:
+        asyncio.run(CheckMyGradeServer(app, args.workers).serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
@@ -1,23 +1,71 @@
 import unittest
+import asyncio
+import contextlib
+import csv
+import gzip
+import http.client
+import io
+import json
+import lzma
+import multiprocessing
 import os
+import random
+import shutil
+import tempfile
+import threading
 import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
 
 from CheckMyGrade_lab_work_1 import (
+    atomic_write,
+    batch,
+    export_course_statistics,
+    export_grade_distribution,
+    export_students,
+    fcntl,
+    read_student_rows,
+    ReadWriteLock,
+    SQLiteStorage,
+    SQLiteStudentManager,
     StudentManager,
+    StudentSnapshot,
+    StudentStore,
     CourseManager,
     ProfessorManager,
+    GradeManager,
+    LatencyHistogram,
+    METRICS,
+    Pager,
     Student,
     Course,
     Professor,
+    CheckMyGradeApp,
 )
+from generate_students_random_data import generate
+from server_checkMyGradeApp import CheckMyGradeServer
 
-class TestCheckMyGrade(unittest.TestCase):
+
+class TempDirTestCase(unittest.TestCase):
+    """Test case whose files (CSVs, locks, journals, exports) live in a temporary directory"""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp(prefix='test_checkmygrade_')
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+
+    def path(self, name):
+        return os.path.join(self.tmp, name)
+
+
+class TestCheckMyGrade(TempDirTestCase):
 
     def setUp(self):
+        super().setUp()
         # using temp csv names so I don't overwrite real data
-        self.student_mgr = StudentManager(csv_file='test_students.csv')
-        self.course_mgr = CourseManager(csv_file='test_courses.csv')
-        self.prof_mgr = ProfessorManager(csv_file='test_professors.csv')
+        self.student_mgr = StudentManager(csv_file=self.path('test_students.csv'))
+        self.course_mgr = CourseManager(csv_file=self.path('test_courses.csv'))
+        self.prof_mgr = ProfessorManager(csv_file=self.path('test_professors.csv'))
 
         self.student_mgr.students = []
         self.student_mgr.save_to_csv()
@@ -36,12 +84,68 @@ class TestCheckMyGrade(unittest.TestCase):
         self.student_mgr.update_student("sam@mycsu.edu", first_name="Samuel")
         self.assertEqual(self.student_mgr.students[0].first_name, "Samuel")
 
+    def test_non_integer_marks_rejected_without_changes(self):
+        self.student_mgr.add_student(Student("sam@mycsu.edu", "Sam", "Carpenter", "DATA200", "A", 95))
+        self.assertFalse(self.student_mgr.update_student("sam@mycsu.edu", course_id="DATA201", marks=85.5))
+        self.assertFalse(self.student_mgr.add_student(Student("f@mycsu.edu", "F", "Float", "DATA200", "B", 80.0)))
+        self.assertEqual([(s.course_id, s.marks) for s in self.student_mgr.students], [("DATA200", 95)])
+        self.assertEqual(self.student_mgr.get_statistics("DATA200"), (95.0, 95.0))
+
+    def test_failed_reindex_leaves_roster_consistent(self):
+        self.student_mgr.add_student(Student("sam@mycsu.edu", "Sam", "Carpenter", "DATA200", "A", 95))
+        with mock.patch.object(self.student_mgr, 'validate_marks', return_value=True):
+            with self.assertRaises(TypeError):
+                self.student_mgr.update_student("sam@mycsu.edu", course_id="DATA201", marks=85.5)
+        self.assertEqual([(s.course_id, s.marks) for s in self.student_mgr.students], [("DATA200", 95)])
+        self.assertEqual(self.student_mgr.get_statistics("DATA200"), (95.0, 95.0))
+        self.assertEqual(self.student_mgr.students_in_course("DATA201"), [])
+
     def test_delete_student(self):
         s = Student("sam@mycsu.edu", "Sam", "Carpenter", "DATA200", "A", 95)
         self.student_mgr.add_student(s)
         self.student_mgr.delete_student("sam@mycsu.edu")
         self.assertEqual(len(self.student_mgr.students), 0)
 
+    def test_add_duplicate_student_rejected(self):
+        self.student_mgr.add_student(Student("sam@mycsu.edu", "Sam", "Carpenter", "DATA200", "A", 95))
+        added = self.student_mgr.add_student(Student("sam@mycsu.edu", "Sammy", "C", "DATA201", "B", 85))
+        self.assertFalse(added)
+        self.assertEqual(len(self.student_mgr.students), 1)
+
+    def test_search_after_sort_and_delete(self):
+        # index has to stay in sync with every mutation
+        self.student_mgr.add_student(Student("a@x.com", "A", "A", "DATA200", "B", 80))
+        self.student_mgr.add_student(Student("b@x.com", "B", "B", "DATA200", "A", 95))
+        self.student_mgr.sort_students(by='marks', ascending=False)
+        self.student_mgr.delete_student("b@x.com")
+        found, _ = self.student_mgr.search_student("a@x.com")
+        missing, _ = self.student_mgr.search_student("b@x.com")
+        self.assertEqual(found.first_name, "A")
+        self.assertIsNone(missing)
+
+    def test_statistics_follow_changes(self):
+        self.student_mgr.add_student(Student("a@x.com", "A", "A", "DATA200", "B", 80))
+        self.student_mgr.add_student(Student("b@x.com", "B", "B", "DATA200", "A", 95))
+        self.student_mgr.add_student(Student("c@x.com", "C", "C", "DATA201", "C", 70))
+        self.assertEqual(self.student_mgr.get_statistics("DATA200"), (87.5, 87.5))
+        self.student_mgr.update_student("c@x.com", course_id="DATA200", marks=60)
+        self.student_mgr.delete_student("b@x.com")
+        self.assertEqual(self.student_mgr.get_statistics("DATA200"), (70.0, 70.0))
+        self.assertEqual(self.student_mgr.get_statistics("DATA201"), (None, None))
+        self.assertEqual(self.student_mgr.get_statistics(), (70.0, 70.0))
+        self.assertEqual(self.student_mgr.percentile(100), 80)
+
+    def test_students_in_course(self):
+        self.student_mgr.add_student(Student("a@x.com", "A", "A", "DATA200", "B", 80))
+        self.student_mgr.add_student(Student("b@x.com", "B", "B", "DATA200", "A", 95))
+        self.student_mgr.add_student(Student("c@x.com", "C", "C", "DATA201", "C", 70))
+        self.student_mgr.update_student("a@x.com", course_id="DATA201")
+        self.student_mgr.delete_student("c@x.com")
+        in_200 = [s.email_address for s in self.student_mgr.students_in_course("DATA200")]
+        in_201 = [s.email_address for s in self.student_mgr.students_in_course("DATA201")]
+        self.assertEqual((in_200, in_201), (["b@x.com"], ["a@x.com"]))
+        self.assertEqual(self.student_mgr.grade_counts("DATA201"), {"B": 1})
+
     def test_sort_students_by_marks(self):
         # adding few more
         self.student_mgr.add_student(Student("a@x.com", "A", "A", "DATA200", "B", 80))
@@ -52,6 +156,20 @@ class TestCheckMyGrade(unittest.TestCase):
         # printing time 
         print("Sort time:", elapsed)
 
+    def test_sorted_view_follows_changes(self):
+        self.student_mgr.add_student(Student("a@x.com", "A", "Zed", "DATA200", "B", 80))
+        self.student_mgr.add_student(Student("b@x.com", "B", "Young", "DATA200", "A", 95))
+        self.student_mgr.sort_students(by='marks', ascending=False)
+        self.student_mgr.add_student(Student("c@x.com", "C", "Xu", "DATA201", "A", 99))
+        self.student_mgr.update_student("a@x.com", marks=100)
+        self.assertEqual([s.email_address for s in self.student_mgr.students],
+                         ["a@x.com", "c@x.com", "b@x.com"])
+        self.assertEqual([s.marks for s in self.student_mgr.top_k('marks', 2)], [100, 99])
+        self.assertEqual([s.last_name for s in self.student_mgr.bottom_k('name', 1)], ["Xu"])
+        # the roster itself keeps insertion order
+        saved = StudentManager(csv_file=self.path('test_students.csv'))
+        self.assertEqual([s.email_address for s in saved.students], ["a@x.com", "b@x.com", "c@x.com"])
+
     # Performance of 1000 Records
     def test_search_time_on_big_file(self):
         """
@@ -94,5 +212,996 @@ class TestCheckMyGrade(unittest.TestCase):
         self.assertTrue(deleted)
 
 
+class TestJournal(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.csv_file = self.path('test_journal_students.csv')
+
+    def test_changes_go_to_journal_and_replay(self):
+        mgr = StudentManager(csv_file=self.csv_file, journal=True)
+        mgr.add_student(Student("a@x.com", "A", "A", "DATA200", "B", 80))
+        mgr.add_student(Student("b@x.com", "B", "B", "DATA200", "A", 95))
+        mgr.update_student("a@x.com", marks=85)
+        mgr.delete_student("b@x.com")
+        # nothing rewritten yet, everything is in the journal
+        self.assertFalse(os.path.exists(self.csv_file))
+
+        reloaded = StudentManager(csv_file=self.csv_file, journal=True)
+        self.assertEqual([s.email_address for s in reloaded.students], ["a@x.com"])
+        self.assertEqual(reloaded.students[0].marks, 85)
+
+    def test_compact_folds_journal_into_csv(self):
+        mgr = StudentManager(csv_file=self.csv_file, journal=True)
+        mgr.add_student(Student("a@x.com", "A", "A", "DATA200", "B", 80))
+        mgr.compact()
+        self.assertFalse(os.path.exists(self.csv_file + '.journal'))
+
+        plain = StudentManager(csv_file=self.csv_file)
+        self.assertEqual(len(plain.students), 1)
+
+    def test_torn_line_skipped_and_later_changes_kept(self):
+        mgr = StudentManager(csv_file=self.csv_file, journal=True)
+        mgr.add_student(Student("a@x.com", "A", "A", "DATA200", "B", 80))
+        with open(self.csv_file + '.journal', 'a') as journal:
+            journal.write('{"op": "put", "key": "torn@x.com", "ro')   # crash mid-write
+        mgr.add_student(Student("b@x.com", "B", "B", "DATA200", "A", 95))
+        mgr.update_student("a@x.com", marks=85)
+
+        reloaded = StudentManager(csv_file=self.csv_file, journal=True)
+        self.assertEqual([s.email_address for s in reloaded.students], ["a@x.com", "b@x.com"])
+        self.assertEqual(reloaded.students[0].marks, 85)
+
+
+class TestBatch(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.student_mgr = StudentManager(csv_file=self.path('test_batch_students.csv'))
+        self.course_mgr = CourseManager(csv_file=self.path('test_batch_courses.csv'))
+        self.student_mgr.students = []
+        self.student_mgr.save_to_csv()
+        self.course_mgr.courses = []
+        self.course_mgr.save_to_csv()
+
+    def test_batch_saves_once(self):
+        saves = []
+        original_save = self.student_mgr.save_to_csv
+        self.student_mgr.save_to_csv = lambda: (saves.append(1), original_save())
+        with self.student_mgr.batch():
+            for i in range(20):
+                self.student_mgr.add_student(Student(f"s{i}@x.com", "S", "T", "DATA200", "A", 95))
+            self.student_mgr.update_student("s0@x.com", marks=50)
+            self.student_mgr.delete_student("s1@x.com")
+        self.assertEqual(len(saves), 1)
+        self.assertEqual(len(StudentManager(csv_file=self.path('test_batch_students.csv')).students), 19)
+
+    def test_batch_rolls_back_on_error(self):
+        self.student_mgr.add_student(Student("a@x.com", "A", "A", "DATA200", "B", 80))
+        with self.assertRaises(RuntimeError):
+            with batch(self.student_mgr, self.course_mgr):
+                self.student_mgr.update_student("a@x.com", marks=10)
+                self.student_mgr.add_student(Student("b@x.com", "B", "B", "DATA200", "A", 95))
+                self.course_mgr.add_course(Course("DATA200", "Data 200"))
+                raise RuntimeError("abort term-end update")
+        self.assertEqual(len(self.student_mgr.students), 1)
+        self.assertEqual(self.student_mgr.search_student("a@x.com")[0].marks, 80)
+        self.assertEqual(self.course_mgr.courses, [])
+
+
+class TestStudentStore(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.store = StudentStore(csv_file=self.path('test_store_students.csv'))
+        self.store.students = []
+        self.store.save_to_csv()
+
+    def test_crud_round_trip(self):
+        self.assertTrue(self.store.add_student(Student("a@x.com", "A", "Able", "DATA200", "B", 80)))
+        self.assertTrue(self.store.add_student(Student("b@x.com", "B", "Baker", "DATA201", "A", 95)))
+        self.assertFalse(self.store.add_student(Student("a@x.com", "A", "Able", "DATA200", "B", 80)))
+        self.store.update_student("a@x.com", last_name="Abel", marks=82)
+        self.store.delete_student("b@x.com")
+
+        reloaded = StudentStore(csv_file=self.path('test_store_students.csv'))
+        student, _ = reloaded.search_student("a@x.com")
+        self.assertEqual((student.last_name, student.marks), ("Abel", 82))
+        self.assertIsNone(reloaded.search_student("b@x.com")[0])
+        self.assertEqual(len(reloaded.students), 1)
+
+    def test_statistics_match_student_manager(self):
+        rng = random.Random(7)
+        students = [Student(f"s{i}@x.com", "S", f"L{i}", rng.choice(["DATA200", "DATA201"]), "", rng.randint(0, 100))
+                    for i in range(501)]
+        mgr = StudentManager(csv_file=self.path('test_store_unused.csv'))
+        mgr.students = students
+        self.store.students = students
+        for course_id in (None, "DATA200", "DATA201", "NOPE"):
+            self.assertEqual(self.store.get_statistics(course_id), mgr.get_statistics(course_id))
+        self.assertEqual([s.email_address for s in self.store.students_in_course("DATA201")],
+                         [s.email_address for s in mgr.students_in_course("DATA201")])
+
+    def test_sort_by_marks(self):
+        self.store.add_student(Student("a@x.com", "A", "A", "DATA200", "B", 80))
+        self.store.add_student(Student("b@x.com", "B", "B", "DATA200", "A", 95))
+        self.store.sort_students(by='marks', ascending=False)
+        self.assertEqual([s.marks for s in self.store.students], [95, 80])
+        self.assertEqual([s.marks for s in self.store.bottom_k('marks', 1)], [80])
+
+    def test_sort_order_follows_changes(self):
+        for i in range(20):
+            self.store.add_student(Student(f"s{i}@x.com", "S", f"L{i}", "DATA200", "B", i * 5))
+        self.store.sort_students(by='marks', ascending=False)
+        self.store.add_student(Student("new@x.com", "N", "New", "DATA200", "A", 42))
+        self.store.update_student("s0@x.com", marks=100)
+        self.store.update_student("s19@x.com", marks=1)
+        self.store.delete_student("s10@x.com")
+        keys = [(s.marks, s.email_address) for s in self.store.students]
+        self.assertEqual(keys, sorted(keys, reverse=True))
+        self.assertEqual(len(keys), 20)
+
+        self.store.sort_students(by='name')
+        self.store.update_student("s3@x.com", last_name="A")
+        self.assertEqual(self.store.students[0].email_address, "s3@x.com")
+
+
+class TestLazyStudentManager(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.csv_file = self.path('test_lazy_students.csv')
+        rng = random.Random(3)
+        eager = StudentManager(csv_file=self.csv_file)
+        eager.students = [Student(f"s{i}@x.com", "S", f"L{i}", rng.choice(["DATA200", "DATA201"]),
+                                  rng.choice(["A", "B"]), rng.randint(0, 100)) for i in range(200)]
+        eager.save_to_csv()
+        self.eager = eager
+
+    def test_aggregates_stream_without_loading(self):
+        lazy = StudentManager(csv_file=self.csv_file, lazy=True)
+        self.assertEqual(lazy.get_statistics("DATA200"), self.eager.get_statistics("DATA200"))
+        self.assertEqual(lazy.grade_counts(), self.eager.grade_counts())
+        self.assertEqual(lazy.search_student("s150@x.com")[0].last_name, "L150")
+        self.assertEqual(sum(len(c) for c in lazy.iter_chunks(64)), 200)
+        self.assertFalse(lazy._loaded)
+
+    def test_lazy_matches_eager_on_duplicate_and_invalid_rows(self):
+        with open(self.csv_file, 'w', newline='') as file:
+            file.write("email_address,first_name,last_name,course_id,grade,marks\n"
+                       "a@x.com,A,Able,C1,A,90\n"
+                       "a@x.com,A,Again,C1,F,10\n"
+                       "b@x.com,B,Baker,C1,A,150\n"
+                       "b@x.com,B,Baker,C1,B,85\n")
+        eager = StudentManager(csv_file=self.csv_file)
+        lazy = StudentManager(csv_file=self.csv_file, lazy=True)
+        self.assertEqual(lazy.get_statistics("C1"), eager.get_statistics("C1"))
+        self.assertEqual(lazy.grade_counts(), eager.grade_counts())
+        self.assertEqual([s.last_name for s in lazy.students_in_course("C1")],
+                         [s.last_name for s in eager.students_in_course("C1")])
+        self.assertEqual(lazy.search_student("a@x.com")[0].marks, 90)
+        self.assertFalse(lazy._loaded)
+
+    def test_lazy_sees_journal_and_loads_on_change(self):
+        journaled = StudentManager(csv_file=self.csv_file, journal=True)
+        journaled.delete_student("s0@x.com")
+        journaled.add_student(Student("new@x.com", "N", "New", "DATA200", "A", 99))
+
+        lazy = StudentManager(csv_file=self.csv_file, journal=True, lazy=True)
+        emails = [s.email_address for s in lazy.iter_students()]
+        self.assertNotIn("s0@x.com", emails)
+        self.assertEqual(emails[-1], "new@x.com")
+
+        lazy.update_student("s1@x.com", marks=0)
+        self.assertTrue(lazy._loaded)
+        self.assertEqual(len(lazy.students), 200)
+
+
+class TestStudentSnapshot(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.csv_file = self.path('test_snapshot_students.csv')
+        rng = random.Random(5)
+        eager = StudentManager(csv_file=self.csv_file)
+        eager.students = [Student(f"s{i}@x.com", "S", f"Lé{i}", rng.choice(["DATA200", "DATA201"]),
+                                  rng.choice(["A", "B"]), rng.randint(0, 100)) for i in range(300)]
+        eager.save_to_csv()
+        self.eager = eager
+
+    def test_search_and_statistics_from_snapshot(self):
+        mapped = StudentManager(csv_file=self.csv_file, snapshot=True)
+        self.assertTrue(os.path.exists(self.csv_file + '.snapshot'))
+        self.assertEqual(mapped.search_student("s123@x.com")[0].last_name, "Lé123")
+        self.assertIsNone(mapped.search_student("s300@x.com")[0])
+        for course_id in (None, "DATA201"):
+            self.assertEqual(mapped.get_statistics(course_id), self.eager.get_statistics(course_id))
+        self.assertEqual([s.email_address for s in mapped.iter_students()],
+                         [s.email_address for s in self.eager.students])
+        self.assertFalse(mapped._loaded)
+
+    def test_rebuilt_when_csv_is_newer(self):
+        StudentManager(csv_file=self.csv_file, snapshot=True)
+        self.eager.add_student(Student("late@x.com", "L", "Late", "DATA200", "A", 97))
+        os.utime(self.csv_file, (time.time() + 5, time.time() + 5))
+        mapped = StudentManager(csv_file=self.csv_file, snapshot=True)
+        self.assertEqual(mapped.search_student("late@x.com")[0].marks, 97)
+        self.assertEqual(len(StudentSnapshot(self.csv_file + '.snapshot')), 301)
+
+    def test_writers_see_each_others_rewrites(self):
+        first = StudentManager(csv_file=self.csv_file, snapshot=True)
+        second = StudentManager(csv_file=self.csv_file, snapshot=True)
+        first.add_student(Student("a@x.com", "A", "One", "DATA200", "A", 90))
+        second.add_student(Student("b@x.com", "B", "Two", "DATA200", "B", 80))
+        first.add_student(Student("c@x.com", "C", "Three", "DATA201", "C", 70))
+        emails = {s.email_address for s in StudentManager(csv_file=self.csv_file).students}
+        self.assertTrue({"a@x.com", "b@x.com", "c@x.com"} <= emails)
+        self.assertEqual(len(emails), 303)
+
+class TestFastLoader(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.csv_file = self.path('test_loader_students.csv')
+        with open(self.csv_file, 'w', newline='') as file:
+            # columns deliberately out of the usual order
+            file.write("marks,email_address,grade,first_name,last_name,course_id\n")
+            for i in range(1000):
+                file.write(f"{i % 101},s{i}@x.com,A,First {i},\"Last, {i}\",DATA20{i % 3}\n")
+
+    def test_positional_reader_maps_header(self):
+        rows = list(read_student_rows(self.csv_file))
+        self.assertEqual(len(rows), 1000)
+        self.assertEqual(rows[5], ("s5@x.com", "First 5", "Last, 5", "DATA202", "A", 5))
+
+    def test_parallel_chunks_match_sequential(self):
+        sequential = list(read_student_rows(self.csv_file))
+        with mock.patch('CheckMyGrade_lab_work_1.os.cpu_count', return_value=3):
+            parallel = list(read_student_rows(self.csv_file, parallel_bytes=0))
+        self.assertEqual(parallel, sequential)
+
+    def test_parallel_reader_streams_small_chunks(self):
+        sequential = list(read_student_rows(self.csv_file))
+        with mock.patch('CheckMyGrade_lab_work_1.os.cpu_count', return_value=2), \
+                mock.patch('CheckMyGrade_lab_work_1.PARALLEL_CHUNK_BYTES', 1000):
+            self.assertEqual(list(read_student_rows(self.csv_file, parallel_bytes=0)), sequential)
+            rows = read_student_rows(self.csv_file, parallel_bytes=0)
+            self.assertEqual(next(rows), sequential[0])
+            rows.close()   # early exit cancels the chunks not yet started
+
+    def test_lazy_iteration_reads_sequentially(self):
+        lazy = StudentManager(csv_file=self.csv_file, lazy=True)
+        lazy.parallel_load_bytes = 0
+        with mock.patch('CheckMyGrade_lab_work_1.os.cpu_count', return_value=3), \
+                mock.patch('CheckMyGrade_lab_work_1._read_student_rows_parallel') as parallel:
+            self.assertEqual(next(lazy.iter_students()).email_address, "s0@x.com")
+        parallel.assert_not_called()
+
+
+class TestGradeManager(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.grade_mgr = GradeManager(csv_file=self.path('test_grades.csv'))
+
+    def test_lookup_table_follows_scale_changes(self):
+        self.assertEqual(self.grade_mgr.get_grade_for_marks(95), "A")
+        self.assertEqual(self.grade_mgr.get_grade_for_marks(0), "F")
+        self.grade_mgr.modify_grade("G2", min_marks=95)
+        self.grade_mgr.modify_grade("G3", max_marks=94)
+        self.assertEqual(self.grade_mgr.get_grade_for_marks(94), "A-")
+
+    def test_regrade_all(self):
+        self.grade_mgr.modify_grade("G2", min_marks=95)
+        self.grade_mgr.modify_grade("G3", max_marks=94)
+        for manager_class in (StudentManager, StudentStore):
+            students = manager_class(csv_file=self.path('test_regrade_students.csv'))
+            students.students = [Student("a@x.com", "A", "A", "DATA200", "A", 94),
+                                 Student("b@x.com", "B", "B", "DATA200", "B", 85)]
+            self.assertEqual(self.grade_mgr.regrade_all(students), 1)
+            reloaded = manager_class(csv_file=self.path('test_regrade_students.csv'))
+            self.assertEqual([s.grade for s in reloaded.students], ["A-", "B"])
+
+
+class TestSQLiteStorage(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.storage = SQLiteStorage(self.path('test_checkmygrade.db'))
+        self.addCleanup(self.storage.close)
+        self.students = SQLiteStudentManager(self.storage)
+
+    def test_student_crud_round_trip(self):
+        self.assertTrue(self.students.add_student(Student("a@x.com", "A", "Able", "DATA200", "B", 80)))
+        self.assertTrue(self.students.add_student(Student("b@x.com", "B", "Baker", "DATA201", "A", 95)))
+        self.assertFalse(self.students.add_student(Student("a@x.com", "A", "Able", "DATA200", "B", 80)))
+        self.assertTrue(self.students.update_student("a@x.com", last_name="Abel", marks=82))
+        self.assertFalse(self.students.update_student("z@x.com", marks=82))
+        self.assertTrue(self.students.delete_student("b@x.com"))
+
+        reloaded = SQLiteStudentManager(SQLiteStorage(self.path('test_checkmygrade.db')))
+        student, _ = reloaded.search_student("a@x.com")
+        self.assertEqual((student.last_name, student.marks), ("Abel", 82))
+        self.assertIsNone(reloaded.search_student("b@x.com")[0])
+
+    def test_queries_match_student_manager(self):
+        rng = random.Random(7)
+        roster = [Student(f"s{i}@x.com", "F", f"L{i % 13}", f"DATA20{i % 3}", "ABC"[i % 3], rng.randint(0, 100))
+                  for i in range(200)]
+        memory = StudentManager(csv_file=self.path('test_sqlite_parity.csv'))
+        memory.students = roster
+        self.students.students = roster
+
+        for course_id in (None, "DATA201"):
+            self.assertEqual(self.students.get_statistics(course_id), memory.get_statistics(course_id))
+            self.assertEqual(self.students.percentile(90, course_id), memory.percentile(90, course_id))
+            self.assertEqual(self.students.grade_counts(course_id), memory.grade_counts(course_id))
+        self.assertEqual(self.students.course_statistics(), memory.course_statistics())
+        emails = lambda students: [s.email_address for s in students]
+        self.assertEqual(emails(self.students.students_in_course("DATA202")),
+                         emails(memory.students_in_course("DATA202")))
+        for by in ('marks', 'name'):
+            self.assertEqual(emails(self.students.top_k(by, 5)), emails(memory.top_k(by, 5)))
+            self.students.sort_students(by, ascending=False)
+            memory.sort_students(by, ascending=False)
+            self.assertEqual(emails(self.students.students), emails(memory.students))
+
+    def test_small_managers_and_csv_import(self):
+        courses = CourseManager(csv_file=self.path('test_sqlite_courses.csv'))
+        courses.courses = [Course("DATA200", "Data 200")]
+        courses.save_to_csv()
+        self.storage.import_csv('courses', self.path('test_sqlite_courses.csv'))
+
+        courses = CourseManager(storage=self.storage)
+        self.assertEqual([c.course_id for c in courses.courses], ["DATA200"])
+        courses.add_course(Course("DATA201", "Data 201"))
+        courses.delete_course("DATA200")
+        self.assertEqual([c.course_id for c in CourseManager(storage=self.storage).courses], ["DATA201"])
+        self.assertEqual(len(GradeManager(storage=self.storage).grades), 11)
+        self.assertEqual(self.storage.count('grades'), 11)
+
+    def test_batch_rolls_back(self):
+        self.students.add_student(Student("a@x.com", "A", "A", "DATA200", "B", 80))
+        with self.assertRaises(RuntimeError):
+            with batch(self.students):
+                self.students.update_student("a@x.com", marks=10)
+                self.students.add_student(Student("b@x.com", "B", "B", "DATA200", "A", 95))
+                raise RuntimeError("abort")
+        self.assertEqual(len(self.students), 1)
+        self.assertEqual(self.students.search_student("a@x.com")[0].marks, 80)
+
+    def test_regrade(self):
+        self.students.students = [Student("a@x.com", "A", "A", "DATA200", "A", 94),
+                                  Student("b@x.com", "B", "B", "DATA200", "B", 85)]
+        grades = GradeManager(storage=self.storage)
+        grades.modify_grade("G2", min_marks=95)
+        grades.modify_grade("G3", max_marks=94)
+        self.assertEqual(grades.regrade_all(self.students), 1)
+        self.assertEqual([s.grade for s in self.students.students], ["A-", "B"])
+
+
+class TestImportStudents(TempDirTestCase):
+
+    ROWS = [
+        {'email_address': 'new1@x.com', 'first_name': 'N', 'last_name': 'One', 'course_id': 'DATA200', 'marks': '91'},
+        {'email_address': 'not-an-email', 'first_name': 'N', 'last_name': 'Two', 'marks': '80'},
+        {'email_address': 'new3@x.com', 'first_name': '', 'last_name': 'Three', 'marks': '80'},
+        {'email_address': 'new4@x.com', 'first_name': 'N', 'last_name': 'Four', 'marks': 'eighty'},
+        {'email_address': 'new5@x.com', 'first_name': 'N', 'last_name': 'Five', 'marks': '101'},
+        {'email_address': 'new1@x.com', 'first_name': 'N', 'last_name': 'Again', 'marks': '50'},
+        {'email_address': 'old@x.com', 'first_name': 'O', 'last_name': 'Old', 'marks': '50'},
+        {'email_address': 'new8@x.com', 'first_name': 'N', 'last_name': 'Eight', 'course_id': 'DATA201', 'marks': '59'},
+    ]
+
+    def setUp(self):
+        super().setUp()
+        self.grades = GradeManager(csv_file=self.path('test_import_grades.csv'))
+
+    def check_report(self, mgr, report):
+        self.assertEqual([s.email_address for s in report.accepted], ['new1@x.com', 'new8@x.com'])
+        self.assertEqual([(n, reason) for n, _, reason in report.rejected], [
+            (2, "invalid email address"), (3, "first name and last name are required"),
+            (4, "marks must be a whole number"), (5, "marks must be between 0 and 100"),
+            (6, "duplicate email in import"), (7, "student already exists")])
+        self.assertEqual(mgr.search_student('new1@x.com')[0].grade, 'A-')
+        self.assertEqual(mgr.search_student('new8@x.com')[0].grade, 'F')
+
+    def test_import_validates_grades_and_saves_once(self):
+        for manager_class in (StudentManager, StudentStore):
+            csv_file = self.path(f'test_import_{manager_class.__name__}.csv')
+            mgr = manager_class(csv_file=csv_file)
+            mgr.students = [Student("old@x.com", "O", "Old", "DATA200", "F", 50)]
+            mgr.save_to_csv()
+            with mock.patch.object(mgr, 'save_to_csv', wraps=mgr.save_to_csv) as save:
+                report = mgr.import_students(self.ROWS, self.grades)
+            self.assertEqual(save.call_count, 1)
+            self.check_report(mgr, report)
+            self.assertEqual(len(manager_class(csv_file=csv_file).students), 3)
+
+    def test_import_from_csv_path_into_sqlite(self):
+        with open(self.path('test_import_extract.csv'), 'w', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=['email_address', 'first_name', 'last_name',
+                                                      'course_id', 'marks'], restval='')
+            writer.writeheader()
+            writer.writerows(self.ROWS)
+        storage = SQLiteStorage(self.path('test_import.db'))
+        self.addCleanup(storage.close)
+        mgr = SQLiteStudentManager(storage)
+        mgr.add_student(Student("old@x.com", "O", "Old", "DATA200", "F", 50))
+        report = mgr.import_students(self.path('test_import_extract.csv'), self.grades)
+        self.check_report(mgr, report)
+        self.assertEqual(len(mgr), 3)
+
+
+class TestExport(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        rng = random.Random(11)
+        self.mgr = StudentManager(csv_file=self.path('test_export_students.csv'))
+        self.mgr.students = [Student(f"e{i}@x.com", "E", f"L{i}", f"DATA20{i % 3}", "ABCDF"[i % 5], rng.randint(0, 100))
+                             for i in range(50000)]
+
+    def test_filtered_students_round_trip(self):
+        expected = [s for s in self.mgr.students if s.course_id == "DATA201" and 40 <= s.marks <= 60]
+        self.assertEqual(export_students(self.mgr, self.path('test_export.jsonl.gz'), course_id="DATA201",
+                                         min_marks=40, max_marks=60), len(expected))
+        with gzip.open(self.path('test_export.jsonl.gz'), 'rt') as file:
+            rows = [json.loads(line) for line in file]
+        self.assertEqual(rows[0], expected[0].to_dict())
+        self.assertEqual(len(rows), len(expected))
+
+        export_students(self.mgr, self.path('test_export.csv.xz'), course_id="DATA201", min_marks=40, max_marks=60)
+        with lzma.open(self.path('test_export.csv.xz'), 'rt', newline='') as file:
+            rows = list(csv.DictReader(file))
+        self.assertEqual([r['email_address'] for r in rows], [s.email_address for s in expected])
+
+    def test_export_memory_is_bounded(self):
+        tracemalloc.start()
+        try:
+            export_students(self.mgr, self.path('test_export_all.jsonl.gz'))
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        # the uncompressed output is ~7 MB; only buffers should be alive at once
+        self.assertLess(peak, 3 * 1024 * 1024)
+
+    def test_statistics_and_grade_distribution(self):
+        export_course_statistics(self.mgr, self.path('test_export_courses.csv'))
+        with open(self.path('test_export_courses.csv'), newline='') as file:
+            rows = list(csv.DictReader(file))
+        count, average, median = self.mgr.course_statistics()["DATA200"]
+        self.assertEqual(rows[0], {'course_id': 'DATA200', 'count': str(count),
+                                   'average': str(round(average, 2)), 'median': str(median)})
+
+        grades = GradeManager(csv_file=self.path('test_export_grades.csv'))
+        export_grade_distribution(self.mgr, grades, self.path('test_export_grades.jsonl'), course_id="DATA202")
+        with open(self.path('test_export_grades.jsonl')) as file:
+            rows = [json.loads(line) for line in file]
+        self.assertEqual(len(rows), len(grades.grades))
+        # every letter used in setUp is on the default scale
+        self.assertEqual(sum(r['students'] for r in rows), len(self.mgr.students_in_course("DATA202")))
+
+
+class TestMetrics(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.mgr = StudentManager(csv_file=self.path('test_metrics_students.csv'))
+        METRICS.reset()
+
+    def tearDown(self):
+        METRICS.disable()
+        METRICS.reset()
+
+    def test_disabled_records_nothing(self):
+        self.mgr.add_student(Student("m@x.com", "M", "X", "DATA200", "A", 95))
+        self.mgr.search_student("m@x.com")
+        self.assertEqual(METRICS.snapshot()['timings'], {})
+        self.assertEqual(METRICS.snapshot()['counters'], {})
+
+    def test_manager_calls_and_csv_bytes(self):
+        METRICS.enable()
+        for i in range(3):
+            self.mgr.add_student(Student(f"m{i}@x.com", "M", "X", "DATA200", "A", 95))
+        self.mgr.search_student("m1@x.com")
+        StudentManager(csv_file=self.path('test_metrics_students.csv'))
+
+        snapshot = METRICS.snapshot()
+        self.assertEqual(snapshot['timings']['StudentManager.add_student']['count'], 3)
+        self.assertEqual(snapshot['timings']['StudentManager.search_student']['count'], 1)
+        self.assertEqual(snapshot['timings']['StudentManager.load_from_csv']['count'], 1)
+        size = os.path.getsize(self.path('test_metrics_students.csv'))
+        self.assertEqual(snapshot['counters']['StudentManager.load_bytes'], size)
+        self.assertGreater(snapshot['counters']['StudentManager.save_bytes'], size)   # one save per add
+
+        METRICS.dump(self.path('test_metrics.json'))
+        with open(self.path('test_metrics.json')) as file:
+            self.assertEqual(json.load(file)['counters'], snapshot['counters'])
+
+    def test_histogram_percentiles(self):
+        histogram = LatencyHistogram()
+        for _ in range(98):
+            histogram.observe(0.000_010)   # 10 us
+        histogram.observe(0.001)
+        histogram.observe(0.5)
+        self.assertEqual(histogram.count, 100)
+        self.assertEqual(histogram.percentile(50), 16e-6)   # 10 us lands in the [8, 16) us bucket
+        self.assertLessEqual(histogram.percentile(99), 2 * 0.001)
+        self.assertEqual(histogram.percentile(100), 0.5)
+
+
+class TestProfiling(unittest.TestCase):
+
+    def setUp(self):
+        # the app, its CSVs and the profiles all live in a throwaway directory
+        self.data_dir = tempfile.mkdtemp(prefix='test_profiling_')
+        self.addCleanup(shutil.rmtree, self.data_dir, ignore_errors=True)
+        self.profile_dir = os.path.join(self.data_dir, 'profiles')
+
+    def test_loads_and_menu_actions_are_profiled(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            app = CheckMyGradeApp(profile_dir=self.profile_dir, data_dir=self.data_dir)
+            app.login_manager.register_user("prof@mycsu.edu", "Welcome12#_", "professor")
+            # login, main 1 -> student menu 5 -> reports menu 2 (overall statistics), then back out
+            answers = ["prof@mycsu.edu", "Welcome12#_", "1", "5", "2", "8", "9", "7"]
+            with mock.patch('builtins.input', side_effect=answers):
+                app.run()
+
+        names = sorted(name[5:] for name in os.listdir(self.profile_dir) if name.endswith('.prof'))
+        self.assertEqual(names, sorted([
+            'load-students.prof', 'load-courses.prof', 'load-professors.prof', 'load-grades.prof',
+            'load-users.prof', 'reports-menu-2.prof', 'reports-menu-8.prof', 'student-menu-9.prof',
+            'main-menu-7.prof']))   # "main menu 1" and "student menu 5" only opened submenus
+        summary = next(name for name in os.listdir(self.profile_dir) if name.endswith('reports-menu-2.txt'))
+        with open(os.path.join(self.profile_dir, summary)) as file:
+            text = file.read()
+        self.assertIn("peak traced memory", text)
+        self.assertIn("get_statistics", text)
+        self.assertFalse(tracemalloc.is_tracing())
+
+    def test_off_by_default(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            app = CheckMyGradeApp(data_dir=self.data_dir)
+        self.assertIsNone(app.profiler)
+
+
+class TestDataGenerator(unittest.TestCase):
+
+    def setUp(self):
+        self.output = tempfile.mkdtemp(prefix='test_generated_')
+        self.addCleanup(shutil.rmtree, self.output, ignore_errors=True)
+
+    def test_deterministic_and_consistent(self):
+        first, second = os.path.join(self.output, '1'), os.path.join(self.output, '2')
+        with mock.patch('generate_students_random_data.CHUNK_ROWS', 1000):
+            generate(first, students=3500, courses=8, seed=7, workers=1)
+            generate(second, students=3500, courses=8, seed=7, workers=2)
+        for name in ('students.csv', 'courses.csv', 'professors.csv', 'grades.csv', 'login.csv'):
+            with open(os.path.join(first, name)) as a, open(os.path.join(second, name)) as b:
+                self.assertEqual(a.read(), b.read(), name)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            students = StudentManager(csv_file=os.path.join(first, 'students.csv')).students
+            courses = CourseManager(csv_file=os.path.join(first, 'courses.csv')).courses
+            professors = ProfessorManager(csv_file=os.path.join(first, 'professors.csv')).professors
+            grades = GradeManager(csv_file=os.path.join(first, 'grades.csv'))
+        self.assertEqual(len(students), 3500)
+        self.assertEqual((students[0].email_address, students[-1].email_address),
+                         ("student1@mycsu.edu", "student3500@mycsu.edu"))
+        course_ids = {c.course_id for c in courses}
+        self.assertEqual(len(course_ids), 8)
+        self.assertTrue(all(s.course_id in course_ids and s.grade == grades.get_grade_for_marks(s.marks)
+                            for s in students))
+        self.assertEqual({p.course_id for p in professors}, course_ids)
+
+    def test_existing_csvs_need_force(self):
+        with open(os.path.join(self.output, 'login.csv'), 'w') as file:
+            file.write("user_id,password,role\nreal@mycsu.edu,secret,professor\n")
+        with self.assertRaises(FileExistsError):
+            generate(self.output, students=10, courses=2)
+        with open(os.path.join(self.output, 'login.csv')) as file:
+            self.assertIn("real@mycsu.edu", file.read())
+        generate(self.output, students=10, courses=2, force=True)
+        with open(os.path.join(self.output, 'login.csv')) as file:
+            self.assertNotIn("real@mycsu.edu", file.read())
+
+
+class TestNameSearch(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        rng = random.Random(5)
+        firsts = ["Ana", "Andrew", "Bob", "Maria", "Marius", "John"]
+        lasts = ["Smith", "Smythe", "Lopez", "Anders", "Johnson"]
+        self.roster = [Student(f"n{i}@x.com", rng.choice(firsts), rng.choice(lasts), "DATA200", "A", 90)
+                       for i in range(2000)]
+        self.mgr = StudentManager(csv_file=self.path('test_names.csv'))
+        self.mgr.students = self.roster
+        self.mgr.save_to_csv()
+
+    def expected(self, *terms):
+        return {s.email_address for s in self.roster
+                if all(s.first_name.lower().startswith(t) or s.last_name.lower().startswith(t) for t in terms)}
+
+    def test_prefix_terms_and_limit(self):
+        self.assertEqual({s.email_address for s in self.mgr.search_by_name("an", limit=5000)}, self.expected("an"))
+        self.assertEqual({s.email_address for s in self.mgr.search_by_name("MAR sm", limit=5000)},
+                         self.expected("mar", "sm"))
+        self.assertEqual(len(self.mgr.search_by_name("s", limit=7)), 7)
+        self.assertEqual(self.mgr.search_by_name("   "), [])
+
+    def test_index_follows_changes(self):
+        self.mgr.search_by_name("x")   # builds the index
+        self.mgr.add_student(Student("zed@x.com", "Zelda", "Quinn", "DATA200", "A", 90))
+        self.assertEqual([s.email_address for s in self.mgr.search_by_name("zel qu")], ["zed@x.com"])
+        self.mgr.update_student("zed@x.com", last_name="Reyes")
+        self.assertEqual(self.mgr.search_by_name("quinn"), [])
+        self.assertEqual([s.email_address for s in self.mgr.search_by_name("rey")], ["zed@x.com"])
+        self.mgr.delete_student("zed@x.com")
+        self.assertEqual(self.mgr.search_by_name("zelda"), [])
+        self.assertNotIn("zelda", self.mgr._names().postings)
+
+    def test_typos_fall_back_to_similar_names(self):
+        found = {s.last_name for s in self.mgr.search_by_name("smiht", limit=5000)}
+        self.assertIn("Smith", found)
+        self.assertNotIn("Lopez", found)
+
+    def test_other_stores_agree(self):
+        store = StudentStore(csv_file=self.path('test_names.csv'))
+        lazy = StudentManager(csv_file=self.path('test_names.csv'), lazy=True)
+        sqlite = SQLiteStudentManager(SQLiteStorage(self.path('test_names.db')))
+        sqlite.students = self.roster
+        for manager in (store, lazy, sqlite):
+            self.assertEqual({s.email_address for s in manager.search_by_name("jo an", limit=5000)},
+                             self.expected("jo", "an"))
+        sqlite.storage.close()
+
+    def test_large_roster_uses_index(self):
+        # latency is tracked by the name_search benchmark; here: answered without a roster scan
+        mgr = StudentManager(csv_file=self.path('test_names.csv'))
+        mgr.students = [Student(f"big{i}@x.com", f"First{i % 5000}", f"Last{i}", "DATA200", "A", 90)
+                        for i in range(200000)]
+        mgr.search_by_name("first1")   # build the index
+        with mock.patch.object(mgr, 'iter_students', side_effect=AssertionError("scanned the roster")), \
+                mock.patch('CheckMyGrade_lab_work_1._name_matches', side_effect=AssertionError("scanned")):
+            results = mgr.search_by_name("last19999")
+        self.assertEqual(len(results), 11)   # Last19999 and Last199990-199999
+        self.assertEqual(mgr._names().prefixed("last19999"),
+                         ["last19999"] + [f"last19999{d}" for d in range(10)])
+
+
+class TestMarksRange(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        rng = random.Random(9)
+        self.roster = [Student(f"r{i}@x.com", "R", f"L{i}", f"DATA20{i % 3}", "A", rng.randint(0, 100))
+                       for i in range(3000)]
+        self.mgr = StudentManager(csv_file=self.path('test_marks_range.csv'))
+        self.mgr.students = self.roster
+        self.mgr.save_to_csv()
+
+    def expected(self, lo, hi, course_id=None):
+        return sorted((s.email_address for s in self.roster
+                       if lo <= s.marks <= hi and (course_id is None or s.course_id == course_id)))
+
+    def emails(self, students):
+        self.assertEqual([s.marks for s in students], sorted(s.marks for s in students))
+        return sorted(s.email_address for s in students)
+
+    def test_ranges_match_a_scan(self):
+        for lo, hi, course_id in [(55, 60, "DATA201"), (0, 100, None), (90, 95, None), (61, 40, None),
+                                  (-5, 3, "DATA200"), (50, 60, "NOPE")]:
+            self.assertEqual(self.emails(self.mgr.students_in_marks_range(lo, hi, course_id)),
+                             self.expected(lo, hi, course_id))
+
+    def test_index_follows_changes(self):
+        self.mgr.students_in_marks_range(55, 60)   # builds the index
+        self.mgr.add_student(Student("new@x.com", "N", "W", "DATA209", "F", 57))
+        self.mgr.update_student("r0@x.com", marks=58, course_id="DATA209")
+        self.mgr.delete_student("r1@x.com")
+        self.assertEqual(self.emails(self.mgr.students_in_marks_range(55, 60, "DATA209")),
+                         ["new@x.com", "r0@x.com"])
+        self.mgr.delete_student("new@x.com")
+        self.mgr.delete_student("r0@x.com")
+        self.assertEqual(self.mgr.students_in_marks_range(0, 100, "DATA209"), [])
+        self.assertNotIn("r1@x.com", {s.email_address for s in self.mgr.students_in_marks_range(0, 100)})
+
+    def test_other_stores_agree(self):
+        sqlite = SQLiteStudentManager(SQLiteStorage(self.path('test_marks_range.db')))
+        sqlite.students = self.roster
+        for manager in (StudentStore(csv_file=self.path('test_marks_range.csv')),
+                        StudentManager(csv_file=self.path('test_marks_range.csv'), lazy=True), sqlite):
+            self.assertEqual(self.emails(manager.students_in_marks_range(55, 60, "DATA201")),
+                             self.expected(55, 60, "DATA201"))
+        sqlite.storage.close()
+
+
+class TestPager(TempDirTestCase):
+
+    def test_navigation_and_one_write_per_page(self):
+        items = [f"row {i}" for i in range(95)]
+        fetched = []
+
+        def fetch(start, stop):
+            fetched.append((start, stop))
+            return items[start:stop]
+        writes = []
+        output = io.StringIO()
+        output.write = lambda text: writes.append(text)
+        with contextlib.redirect_stdout(output), \
+                mock.patch('builtins.input', side_effect=["", "n", "p", "9", "junk", "1", "q"]):
+            Pager("Rows", len(items), fetch, page_size=20, interactive=True).show()
+
+        # pages 1, 2, 3, 2, 5 (9 is clamped to the last page), 1; "junk" re-prompts without a render
+        self.assertEqual([start // 20 + 1 for start, _ in fetched], [1, 2, 3, 2, 5, 1])
+        pages = [text for text in writes if "Total Rows: 95" in text]
+        self.assertEqual(len(pages), 6)   # each page arrives in one write
+        self.assertIn("Showing 81-95 (page 5 of 5)", pages[4])
+        self.assertIn("row 94", pages[4])
+        self.assertNotIn("row 79", pages[4])
+
+    def test_display_all_students_writes_every_page(self):
+        roster = [Student(f"p{i:06d}@x.com", "P", "Q", "DATA200", "A", i % 101) for i in range(25005)]
+        mgr = StudentManager(csv_file=self.path('test_pager.csv'))
+        mgr.students = roster
+        mgr.save_to_csv()
+        sqlite = SQLiteStudentManager(SQLiteStorage(self.path('test_pager.db')))
+        sqlite.students = roster
+        with contextlib.redirect_stdout(io.StringIO()):
+            managers = [mgr, StudentStore(csv_file=self.path('test_pager.csv')),
+                        StudentManager(csv_file=self.path('test_pager.csv'), lazy=True), sqlite]
+        for manager in managers:
+            output = io.StringIO()
+            with mock.patch.object(manager, 'students_slice', wraps=manager.students_slice) as fetch, \
+                    contextlib.redirect_stdout(output):
+                manager.display_all_students(page_size=10, interactive=False)
+            text = output.getvalue()
+            self.assertEqual(text.count("Total Students: 25005"), 2501)
+            self.assertIn("Showing 1-10 (page 1 of 2501)", text)
+            self.assertIn("Showing 25001-25005 (page 2501 of 2501)", text)
+            self.assertEqual(text.count("Email: p"), 25005)
+            # fetched in blocks, not once per page
+            self.assertEqual(fetch.call_count, 3)
+            self.assertEqual([s.email_address for s in manager.students_slice(20, 23)],
+                             ["p000020@x.com", "p000021@x.com", "p000022@x.com"])
+
+        for manager in (mgr, sqlite):
+            with contextlib.redirect_stdout(io.StringIO()):
+                manager.sort_students('marks', ascending=False)
+            self.assertEqual([s.marks for s in manager.students_slice(0, 3)], [100, 100, 100])
+        sqlite.storage.close()
+
+
+class TestThreadSafety(TempDirTestCase):
+
+    def test_readers_share_and_writers_exclude(self):
+        lock = ReadWriteLock()
+        both_reading = threading.Barrier(2, timeout=5)
+
+        def read():
+            with lock.reading():
+                both_reading.wait()   # only passes if the two readers overlap
+        with ThreadPoolExecutor(2) as pool:
+            for future in [pool.submit(read), pool.submit(read)]:
+                future.result()
+
+        with lock.reading():
+            with self.assertRaises(RuntimeError):
+                with lock.writing():
+                    pass
+        with lock.writing():
+            with lock.reading(), lock.writing():
+                pass
+
+    def test_stress_keeps_indexes_consistent(self):
+        for manager_class in (StudentManager, StudentStore):
+            csv_file = self.path(f'test_stress_{manager_class.__name__}.csv')
+            mgr = manager_class(csv_file=csv_file, journal=True)
+            mgr.students = [Student(f"base{i}@x.com", "B", f"L{i}", "DATA200", "A", i % 101) for i in range(300)]
+            mgr.save_to_csv()
+
+            def writer(n):
+                rng = random.Random(n)
+                for i in range(100):
+                    email = f"w{n}-{i}@x.com"
+                    mgr.add_student(Student(email, "W", "W", rng.choice(["DATA200", "DATA201"]), "B", rng.randint(0, 100)))
+                    mgr.update_student(f"base{rng.randrange(300)}@x.com", marks=rng.randint(0, 100))
+                    if i % 2:
+                        mgr.delete_student(email)
+
+            def reader(n):
+                rng = random.Random(-n)
+                for _ in range(200):
+                    self.assertIsNotNone(mgr.search_student(f"base{rng.randrange(300)}@x.com")[0])
+                    average, median = mgr.get_statistics()
+                    self.assertTrue(0 <= average <= 100 and 0 <= median <= 100)
+                    marks = [s.marks for s in mgr.top_k('marks', 20)]
+                    self.assertEqual(marks, sorted(marks, reverse=True))
+                    self.assertEqual(sum(mgr.grade_counts().values()), len(mgr.students))
+
+            with mock.patch('builtins.print'), ThreadPoolExecutor(8) as pool:
+                futures = [pool.submit(writer, n) for n in range(4)] + [pool.submit(reader, n) for n in range(4)]
+                for future in futures:
+                    future.result()
+
+            students = mgr.students
+            self.assertEqual(len(students), 300 + 4 * 50)
+            self.assertEqual(mgr.percentile(100), max(s.marks for s in students))
+            self.assertEqual(mgr.get_statistics()[0], sum(s.marks for s in students) / len(students))
+            reloaded = manager_class(csv_file=csv_file, journal=True)
+            self.assertEqual(sorted(s.email_address for s in reloaded.students),
+                             sorted(s.email_address for s in students))
+
+
+def add_students_in_process(csv_file, journal, writer, count, compact=False):
+    """Child process body for TestMultiProcess: each writer adds its own students"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        mgr = StudentManager(csv_file=csv_file, journal=journal)
+        for i in range(count):
+            mgr.add_student(Student(f"p{writer}-{i}@x.com", "P", f"W{writer}", "DATA200", "B", i % 101))
+            if compact and i % 10 == 9:
+                mgr.compact()   # folds the other writers' journaled rows in too
+        mgr.update_student("shared@x.com", marks=writer)
+
+
+class TestMultiProcess(TempDirTestCase):
+
+    def test_atomic_write_keeps_old_file_on_failure(self):
+        with open(self.path('test_atomic.csv'), 'w') as file:
+            file.write("old contents\n")
+        with self.assertRaises(RuntimeError):
+            with atomic_write(self.path('test_atomic.csv')) as file:
+                file.write("half of the new")
+                raise RuntimeError("crash mid-write")
+        with open(self.path('test_atomic.csv')) as file:
+            self.assertEqual(file.read(), "old contents\n")
+        self.assertEqual([name for name in os.listdir(self.tmp) if name.startswith(self.path('test_atomic.csv.'))], [])
+
+    def test_store_reclaim_keeps_rows_written_elsewhere(self):
+        csv_file = self.path('test_store_reclaim.csv')
+        seed = StudentManager(csv_file=csv_file)
+        seed.students = [Student(f"s{i}@x.edu", "S", f"L{i}", "DATA200", "A", i % 101) for i in range(2100)]
+        seed.save_to_csv()
+        with contextlib.redirect_stdout(io.StringIO()):
+            first = StudentStore(csv_file=csv_file)
+            second = StudentStore(csv_file=csv_file)
+            first.sort_students('marks', ascending=False)
+            with first.batch():
+                for i in range(1050):
+                    first.delete_student(f"s{i}@x.edu")
+            second.add_student(Student("new@x.edu", "N", "New", "DATA200", "A", 99))
+            first.delete_student("s1050@x.edu")   # more than half the rows dead: reclaims
+            emails = {s.email_address for s in StudentManager(csv_file=csv_file).students}
+        self.assertIn("new@x.edu", emails)
+        self.assertEqual(len(emails), 1050)
+        # the reclaim keeps the sort_students order, rows refreshed from disk included
+        keys = [(s.marks, s.email_address) for s in first.students]
+        self.assertEqual(keys, sorted(keys, reverse=True))
+        self.assertIn((99, "new@x.edu"), keys)
+
+    def test_compaction_keeps_rows_journaled_elsewhere(self):
+        csv_file = self.path('test_journal_compact.csv')
+        with contextlib.redirect_stdout(io.StringIO()):
+            first = StudentManager(csv_file=csv_file, journal=True)
+            second = StudentManager(csv_file=csv_file, journal=True)
+            first.add_student(Student("a@x.com", "A", "One", "DATA200", "A", 90))
+            second.add_student(Student("b@x.com", "B", "Two", "DATA200", "B", 80))
+            # no CSV exists yet: only the shared journal has changed
+            first.compact()
+            emails = {s.email_address for s in StudentManager(csv_file=csv_file).students}
+        self.assertEqual(emails, {"a@x.com", "b@x.com"})
+
+    @unittest.skipIf(fcntl is None or 'fork' not in multiprocessing.get_all_start_methods(),
+                     "needs fcntl and fork")
+    def test_parallel_writers_lose_nothing(self):
+        context = multiprocessing.get_context('fork')
+        # with journal only the first compaction creates the CSV, from the journal all writers share
+        for journal, compact in ((False, False), (True, False), (True, True)):
+            csv_file = self.path(f'test_multiprocess_{journal}_{compact}.csv')
+            mgr = StudentManager(csv_file=csv_file, journal=journal)
+            mgr.add_student(Student("shared@x.com", "S", "Shared", "DATA200", "A", 100))
+
+            writers = [context.Process(target=add_students_in_process, args=(csv_file, journal, n, 25, compact))
+                       for n in range(4)]
+            for process in writers:
+                process.start()
+            for process in writers:
+                process.join()
+                self.assertEqual(process.exitcode, 0)
+
+            students = StudentManager(csv_file=csv_file, journal=journal).students
+            self.assertEqual(len(students), 1 + 4 * 25)
+            shared = next(s for s in students if s.email_address == "shared@x.com")
+            self.assertIn(shared.marks, range(4))
+
+
+class TestServer(unittest.TestCase):
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp(prefix='test_server_')
+        self.addCleanup(shutil.rmtree, self.data_dir, ignore_errors=True)
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.app = CheckMyGradeApp(data_dir=self.data_dir)
+        self.server = CheckMyGradeServer(self.app)
+        self.loop = asyncio.new_event_loop()
+        listener = self.loop.run_until_complete(
+            asyncio.start_server(self.server.handle_connection, '127.0.0.1', 0))
+        self.port = listener.sockets[0].getsockname()[1]
+        thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        thread.start()
+
+        async def shutdown():
+            # stop accepting, then cancel the connections still being served
+            listener.close()
+            tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await listener.wait_closed()
+
+        def stop():
+            # asyncio objects belong to the loop's thread
+            asyncio.run_coroutine_threadsafe(shutdown(), self.loop).result()
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            thread.join()
+            self.loop.close()
+            self.server.worker.shutdown()
+        self.addCleanup(stop)
+
+    def call(self, method, path, body=None):
+        connection = http.client.HTTPConnection('127.0.0.1', self.port)
+        connection.request(method, path, json.dumps(body) if body is not None else None)
+        response = connection.getresponse()
+        result = response.status, json.loads(response.read())
+        connection.close()
+        return result
+
+    def test_student_crud_and_statistics(self):
+        status, student = self.call('POST', '/students', {'email_address': 'api@x.com', 'first_name': 'A',
+                                                          'last_name': 'Pi', 'course_id': 'DATA200', 'marks': 91})
+        self.assertEqual((status, student['grade']), (201, 'A-'))
+        status, reply = self.call('POST', '/students', {'email_address': 'api@x.com', 'first_name': 'A',
+                                                        'last_name': 'Pi', 'marks': 91})
+        self.assertEqual(status, 400)
+        self.assertIn('already exists', reply['error'])
+
+        self.assertEqual(self.call('PATCH', '/students/api@x.com', {'marks': 75})[1]['grade'], 'C')
+        self.assertEqual(self.call('GET', '/statistics?course=DATA200')[1]['median'], 75)
+        self.assertEqual(self.call('GET', '/students')[1]['total'], 1)
+        self.assertEqual(self.call('DELETE', '/students/api@x.com')[0], 200)
+        self.assertEqual(self.call('GET', '/students/api@x.com')[0], 404)
+        self.assertEqual(self.call('PUT', '/students/api@x.com', {})[0], 405)
+
+    def test_bad_numbers_are_rejected(self):
+        status, reply = self.call('POST', '/students', {'email_address': 'f@x.com', 'first_name': 'F',
+                                                        'last_name': 'Loat', 'marks': 85.9})
+        self.assertEqual((status, reply['error']), (400, "marks must be an integer"))
+        self.assertEqual(self.call('GET', '/students/f@x.com')[0], 404)
+        for query in ('offset=-1', 'limit=-5', 'offset=1.5'):
+            self.assertEqual(self.call('GET', f'/students?{query}')[0], 400, query)
+        self.assertEqual(self.call('GET', '/students?offset=0&limit=5')[0], 200)
+
+    def test_concurrent_requests_get_their_own_errors(self):
+        self.call('POST', '/students', {'email_address': 'dup@x.com', 'first_name': 'D',
+                                        'last_name': 'Up', 'course_id': 'DATA200', 'marks': 80})
+        requests = [('POST', '/students', {'email_address': 'dup@x.com', 'first_name': 'D',
+                                           'last_name': 'Up', 'marks': 80}),
+                    ('DELETE', '/students/nobody@x.com', None),
+                    ('GET', '/students/dup@x.com', None)] * 10
+        with ThreadPoolExecutor(max_workers=6) as pool:
+            replies = list(pool.map(lambda request: self.call(*request), requests))
+        for (method, _, _), (status, reply) in zip(requests, replies):
+            if method == 'POST':
+                self.assertEqual(status, 400)
+                self.assertIn('already exists', reply['error'])
+            elif method == 'DELETE':
+                self.assertEqual(status, 404)
+                self.assertIn('nobody@x.com not found', reply['error'])
+            else:
+                self.assertEqual((status, reply['email_address']), (200, 'dup@x.com'))
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file